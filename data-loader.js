@@ -8,11 +8,26 @@
     loadedStates: new Set(),
     loading: new Set(),
     loadedCampsiteIds: new Set(),  // Track loaded campsite IDs to prevent duplicates
+    artifacts: null,               // data/dist/manifest.json: content-hashed copies of the data files
     index: null,
+    loadedCells: new Set(),        // "ST:geohash" cells fetched by byte range (index.json "spatial")
+    tiles: null,                   // data/tiles/manifest.json when pre-built tiles exist
+    loadedTiles: new Set(),
+    loadingTiles: new Set(),
+    clusters: null,                // data/clusters/manifest.json when a cluster pyramid exists
+    clusterLevels: {},             // zoom -> Promise of that level's features
+    pyramidSites: new Map(),       // id -> unclustered site drawn from the pyramid
+    pyramidLayer: null,
     clusterGroup: null,
     config: {}
   };
 
+  const ARTIFACTS_MANIFEST = 'data/dist/manifest.json';
+  const TILES_BASE = 'data/tiles/';
+  const PUBLISHED_BASE = 'data/published/';  // Minified merged files (scripts/publish.py)
+  const CLUSTERS_BASE = 'data/clusters/';
+  const SERVICE_LABELS = { dump: '🚽 Dump', water: '💧 Water', propane: '🔥 Propane' };
+
   const STATE_BOUNDS = {
     'AL': { s: 30.2, w: -88.5, n: 35.0, e: -84.9 },
     'AK': { s: 51.2, w: -179.1, n: 71.4, e: -129.9 },
@@ -82,17 +97,35 @@
     return !(b1.e < b2.w || b1.w > b2.e || b1.n < b2.s || b1.s > b2.n);
   }
 
-  function getVisibleStates(map) {
+  function getViewport(map) {
     const bounds = map.getBounds();
-    const viewport = {
+    return {
       s: bounds.getSouth(),
       w: bounds.getWest(),
       n: bounds.getNorth(),
       e: bounds.getEast()
     };
+  }
+
+  // True data bounds from index.json when the spatial index exists, else the rough STATE_BOUNDS
+  function getStateBounds() {
+    const spatial = state.index && state.index.spatial;
+    if (!spatial) return STATE_BOUNDS;
+    const bounds = {};
+    for (const [stateCode, entry] of Object.entries(spatial.states)) {
+      if (entry.bbox) {
+        const [w, s, e, n] = entry.bbox;
+        bounds[stateCode] = { s, w, n, e };
+      }
+    }
+    return bounds;
+  }
+
+  function getVisibleStates(map) {
+    const viewport = getViewport(map);
 
     const visible = [];
-    for (const [stateCode, bbox] of Object.entries(STATE_BOUNDS)) {
+    for (const [stateCode, bbox] of Object.entries(getStateBounds())) {
       if (boundsIntersect(viewport, bbox)) {
         visible.push(stateCode);
       }
@@ -104,9 +137,29 @@
     return visible;
   }
 
+  async function loadArtifactManifest() {
+    try {
+      const response = await fetch(ARTIFACTS_MANIFEST, { cache: 'no-cache' });
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      state.artifacts = await response.json();
+      console.log(`🔒 Loaded artifact manifest: ${Object.keys(state.artifacts.files).length} content-hashed files`);
+    } catch (err) {
+      console.warn('⚠️ No artifact manifest, fetching data files by name:', err.message);
+    }
+  }
+
+  // The content-hashed copy of a data file (scripts/build_artifacts.py), or the file itself:
+  // data/published/CA_merged.geojson -> data/dist/published/CA_merged.{hash}.geojson
+  function dataUrl(path) {
+    const digest = state.artifacts && state.artifacts.files && state.artifacts.files[path];
+    if (!digest) return path;
+    const dot = path.lastIndexOf('.');
+    return state.artifacts.base + path.slice('data/'.length, dot) + '.' + digest + path.slice(dot);
+  }
+
   async function loadIndex() {
     try {
-      const response = await fetch('data/campsites/index.json');
+      const response = await fetch(dataUrl('data/campsites/index.json'));
       if (!response.ok) throw new Error('Index not found');
       state.index = await response.json();
       console.log('📊 Loaded campsite index:', state.index.total_sites, 'sites');
@@ -117,6 +170,275 @@
     }
   }
 
+  const GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz';
+
+  function geohashBounds(hash) {
+    let s = -90, n = 90, w = -180, e = 180;
+    let even = true;
+    for (const ch of hash) {
+      const bits = GEOHASH_BASE32.indexOf(ch);
+      for (let b = 4; b >= 0; b--) {
+        const bit = (bits >> b) & 1;
+        if (even) {
+          const mid = (w + e) / 2;
+          if (bit) w = mid; else e = mid;
+        } else {
+          const mid = (s + n) / 2;
+          if (bit) s = mid; else n = mid;
+        }
+        even = !even;
+      }
+    }
+    return { s, w, n, e };
+  }
+
+  function spatialEntry(stateCode) {
+    const spatial = state.index && state.index.spatial;
+    return (spatial && spatial.states[stateCode]) || null;
+  }
+
+  // Byte ranges of the state's unloaded cells in view; cells are contiguous in
+  // the file (joined by one comma), so neighbours merge into a single range
+  function getVisibleRanges(stateCode, entry, viewport) {
+    const ranges = [];
+    entry.cells.forEach(([cell, offset, length]) => {
+      const key = `${stateCode}:${cell}`;
+      if (state.loadedCells.has(key) || !boundsIntersect(viewport, geohashBounds(cell))) return;
+      const last = ranges[ranges.length - 1];
+      if (last && last.end + 1 === offset) {
+        last.end = offset + length;
+        last.cells.push(key);
+      } else {
+        ranges.push({ start: offset, end: offset + length, cells: [key] });
+      }
+    });
+    return ranges;
+  }
+
+  // Features in one byte range, or null if the server ignored the Range header
+  // or the file no longer matches the index
+  async function fetchRange(url, range, totalBytes) {
+    try {
+      const response = await fetch(url, { headers: { Range: `bytes=${range.start}-${range.end - 1}` } });
+      const contentRange = response.headers.get('Content-Range') || '';
+      if (response.status !== 206 || !contentRange.endsWith(`/${totalBytes}`)) return null;
+      return JSON.parse(`[${await response.text()}]`);
+    } catch (err) {
+      console.warn(`⚠️ Range request failed for ${url}:`, err.message);
+      return null;
+    }
+  }
+
+  // Load just the visible cells of a state's merged file; true if anything was fetched
+  async function loadStateCells(stateCode, viewport) {
+    if (state.loadedStates.has(stateCode) || state.loading.has(stateCode)) return false;
+
+    const entry = spatialEntry(stateCode);
+    const ranges = getVisibleRanges(stateCode, entry, viewport);
+    if (ranges.length === 0) return false;
+    ranges.forEach(range => range.cells.forEach(key => state.loadedCells.add(key)));
+
+    const url = dataUrl(`${PUBLISHED_BASE}${entry.file}`);
+    const results = await Promise.all(ranges.map(range => fetchRange(url, range, entry.bytes)));
+    if (results.includes(null)) {
+      console.warn(`⚠️ Byte ranges unavailable for ${stateCode}, loading the whole file`);
+      await loadStateData(stateCode);
+      return true;
+    }
+
+    const uniqueSites = addSites(results.flat());
+    const cellCount = ranges.reduce((sum, range) => sum + range.cells.length, 0);
+    console.log(`✅ Added ${uniqueSites.length} sites for ${stateCode} from ${cellCount} cell(s) in ${ranges.length} range request(s) (Total: ${state.allCampsites.length})`);
+    return true;
+  }
+
+  // Per-cell loading needs the spatial index and plain GeoJSON
+  function useCells(stateCode) {
+    return Boolean(spatialEntry(stateCode)) && !state.config.columnar;
+  }
+
+  // GeoJSON, or KTC1 columnar binary decoded by ktc-reader.js
+  async function fetchFeatures(url, columnar) {
+    if (columnar && window.KampTrailKTC) {
+      return window.KampTrailKTC.load(url);
+    }
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status} for ${url}`);
+    }
+    return response.json();
+  }
+
+  async function loadTileManifest() {
+    try {
+      const response = await fetch(dataUrl(`${TILES_BASE}manifest.json`));
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      const manifest = await response.json();
+      if (!manifest.layers || !manifest.layers.campsites) throw new Error('No campsites layer');
+      if (manifest.format === 'ktc' && !window.KampTrailKTC) throw new Error('ktc-reader.js not loaded');
+      state.tiles = manifest;
+      console.log(`🧩 Loaded tile manifest: ${Object.keys(manifest.layers.campsites.tiles).length} campsite tiles at zoom ${manifest.zoom}`);
+      return manifest;
+    } catch (err) {
+      console.warn('⚠️ No tile manifest, loading whole state files:', err.message);
+      return null;
+    }
+  }
+
+  async function loadClusterManifest() {
+    try {
+      const response = await fetch(dataUrl(`${CLUSTERS_BASE}manifest.json`));
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      state.clusters = await response.json();
+      console.log(`🧩 Loaded cluster pyramid: zoom ${state.clusters.min_zoom}-${state.clusters.max_zoom}, ${state.clusters.total} sites`);
+      return state.clusters;
+    } catch (err) {
+      console.warn('⚠️ No cluster pyramid, clustering in the browser:', err.message);
+      return null;
+    }
+  }
+
+  function loadClusterLevel(zoom) {
+    if (!state.clusterLevels[zoom]) {
+      const url = dataUrl(CLUSTERS_BASE + state.clusters.url.replace('{z}', zoom));
+      state.clusterLevels[zoom] = fetchFeatures(url, false)
+        .then(data => (data && data.features) || [])
+        .catch(err => {
+          console.error(`💥 Error loading cluster level ${zoom}:`, err.message);
+          delete state.clusterLevels[zoom];
+          return null;
+        });
+    }
+    return state.clusterLevels[zoom];
+  }
+
+  function hasActiveFilters(filters) {
+    if (!filters) return false;
+    return filters.cost !== 'all' || filters.type !== 'all' || filters.rigSize !== 'all' ||
+      filters.roadDifficulty !== 'all' || (filters.amenities && filters.amenities.length > 0) ||
+      (filters.minRating && filters.minRating > 0);
+  }
+
+  // Precomputed clusters are unfiltered, so they are only used while no filter is set
+  function usePyramid(map, filters) {
+    return Boolean(state.clusters) && map.getZoom() <= state.clusters.max_zoom && !hasActiveFilters(filters);
+  }
+
+  function lngLatToTile(lng, lat, zoom) {
+    const n = Math.pow(2, zoom);
+    const clampedLat = Math.max(-85.0511287798, Math.min(85.0511287798, lat));
+    const latRad = clampedLat * Math.PI / 180;
+    const x = Math.floor((lng + 180) / 360 * n);
+    const y = Math.floor((1 - Math.asinh(Math.tan(latRad)) / Math.PI) / 2 * n);
+    return [Math.min(Math.max(x, 0), n - 1), Math.min(Math.max(y, 0), n - 1)];
+  }
+
+  // { s, w, n, e } of a "z/x/y" tile
+  function tileBounds(key) {
+    const [z, x, y] = key.split('/').map(Number);
+    const n = Math.pow(2, z);
+    const lat = row => Math.atan(Math.sinh(Math.PI * (1 - 2 * row / n))) * 180 / Math.PI;
+    return { s: lat(y + 1), w: x / n * 360 - 180, n: lat(y), e: (x + 1) / n * 360 - 180 };
+  }
+
+  // Keys ("z/x/y") of the non-empty campsite tiles covering the viewport
+  function getVisibleTiles(map) {
+    const layer = state.tiles.layers.campsites;
+    const zoom = state.tiles.zoom;
+    const bounds = map.getBounds();
+    const [x0, y0] = lngLatToTile(Math.max(bounds.getWest(), -180), bounds.getNorth(), zoom);
+    const [x1, y1] = lngLatToTile(Math.min(bounds.getEast(), 180), bounds.getSouth(), zoom);
+
+    const visible = [];
+    for (let x = x0; x <= x1; x++) {
+      for (let y = y0; y <= y1; y++) {
+        const key = `${zoom}/${x}/${y}`;
+        if (layer.tiles[key]) visible.push(key);
+      }
+    }
+    return visible;
+  }
+
+  // Published sites always carry an id (scripts/publish.py); older files may not,
+  // so those fall back to their point, as publish.py does
+  function siteKey(site) {
+    const siteId = site.properties && site.properties.id;
+    if (siteId) return siteId;
+    const coords = (site.geometry && site.geometry.coordinates) || [];
+    return `pt:${Number(coords[0]).toFixed(5)},${Number(coords[1]).toFixed(5)}`;
+  }
+
+  // Add sites to the map data, skipping sites that are already loaded
+  // (tiles, index cells and whole-file fallbacks can overlap)
+  function addSites(sites) {
+    const uniqueSites = sites.filter(site => {
+      const key = siteKey(site);
+      if (state.loadedCampsiteIds.has(key)) return false;
+      state.loadedCampsiteIds.add(key);
+      return true;
+    });
+    state.allCampsites.push(...uniqueSites);
+    return uniqueSites;
+  }
+
+  // True if the tile loaded; false if it failed (or was already requested)
+  async function loadTile(key) {
+    if (state.loadedTiles.has(key) || state.loadingTiles.has(key)) {
+      return true;
+    }
+
+    state.loadingTiles.add(key);
+    const [z, x, y] = key.split('/');
+    const url = dataUrl(TILES_BASE + state.tiles.layers.campsites.url
+      .replace('{z}', z).replace('{x}', x).replace('{y}', y));
+
+    try {
+      const data = await fetchFeatures(url, state.tiles.format === 'ktc');
+      addSites((data && data.features) || []);
+      return true;
+    } catch (err) {
+      console.error(`💥 Error loading tile ${key}:`, err.message);
+      return false;
+    } finally {
+      // Mark as loaded even if failed to prevent constant retry
+      state.loadedTiles.add(key);
+      state.loadingTiles.delete(key);
+    }
+  }
+
+  async function loadVisibleTiles(map) {
+    const newTiles = getVisibleTiles(map).filter(k => !state.loadedTiles.has(k) && !state.loadingTiles.has(k));
+    if (newTiles.length === 0) return false;
+
+    console.log(`🧩 Loading ${newTiles.length} tile(s)...`);
+    const loaded = await Promise.all(newTiles.map(k => loadTile(k)));
+    const failed = newTiles.filter((k, i) => !loaded[i]);
+    if (failed.length > 0) {
+      await loadTileCells(failed);
+    }
+    console.log(`✅ Tiles loaded (Total: ${state.allCampsites.length} sites)`);
+    return true;
+  }
+
+  // Fallback for tiles that failed to load: fetch the same area as byte ranges
+  // of the merged state files when the spatial index is available
+  async function loadTileCells(keys) {
+    const stateBounds = getStateBounds();
+    const requests = [];
+    keys.forEach(key => {
+      const bounds = tileBounds(key);
+      Object.entries(stateBounds).forEach(([stateCode, bbox]) => {
+        if (useCells(stateCode) && boundsIntersect(bounds, bbox)) {
+          requests.push(loadStateCells(stateCode, bounds));
+        }
+      });
+    });
+    if (requests.length === 0) return;
+
+    console.warn(`⚠️ ${keys.length} tile(s) failed, loading their spatial index cells instead`);
+    await Promise.all(requests);
+  }
+
   async function loadStateData(stateCode) {
     if (state.loadedStates.has(stateCode) || state.loading.has(stateCode)) {
       return;
@@ -126,15 +448,12 @@
     console.log(`📥 Loading ${stateCode} campsites from all sources...`);
 
     try {
-      // Load the merged, deduplicated file that combines Recreation.gov + OSM data
-      const url = `data/campsites/${stateCode}_merged.geojson`;
+      // Load the published copy of the merged, deduplicated file that combines Recreation.gov + OSM data
+      // (config.columnar: the .ktc export from scripts/export_columnar.py)
+      const columnar = Boolean(state.config.columnar && window.KampTrailKTC);
+      const url = dataUrl(`${PUBLISHED_BASE}${stateCode}_merged.${columnar ? 'ktc' : 'geojson'}`);
 
-      const response = await fetch(url);
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status} for ${url}`);
-      }
-
-      const data = await response.json();
+      const data = await fetchFeatures(url, columnar);
       let allNewSites = [];
 
       // Process merged data
@@ -158,23 +477,7 @@
 
       if (allNewSites.length > 0) {
         // Filter out duplicates by checking if ID already exists
-        const uniqueSites = allNewSites.filter(site => {
-          const siteId = site.properties.id;
-          if (!siteId) return true; // Keep sites without IDs (edge case)
-          if (state.loadedCampsiteIds.has(siteId)) {
-            return false; // Skip duplicate
-          }
-          return true; // Keep unique site
-        });
-
-        // Add unique sites to the map and track their IDs
-        uniqueSites.forEach(site => {
-          const siteId = site.properties.id;
-          if (siteId) {
-            state.loadedCampsiteIds.add(siteId);
-          }
-        });
-        state.allCampsites.push(...uniqueSites);
+        const uniqueSites = addSites(allNewSites);
         state.loadedStates.add(stateCode);
 
         const duplicateCount = allNewSites.length - uniqueSites.length;
@@ -271,6 +574,13 @@
     const rigFriendly = Array.isArray(p.rig_friendly) && p.rig_friendly.length ? p.rig_friendly : [];
     const rigText = rigFriendly.length > 0 ? rigFriendly.map(r => esc(r)).join(', ') : '';
 
+    // Closest dump/water/propane, precomputed by scripts/nearest_services.py ([km, lon, lat, name])
+    const services = p.nearby_services || {};
+    const servicesText = Object.entries(SERVICE_LABELS)
+      .filter(([type]) => Array.isArray(services[type]) && services[type].length > 0)
+      .map(([type, label]) => `${label} ${Number(services[type][0][0]).toFixed(1)} km`)
+      .join(' • ');
+
     const lat = (site.geometry && site.geometry.coordinates && site.geometry.coordinates[1]) || 0;
     const lng = (site.geometry && site.geometry.coordinates && site.geometry.coordinates[0]) || 0;
 
@@ -283,6 +593,7 @@
           ${safeRoadDiff ? `<div><strong>Road:</strong> ${safeRoadDiff}</div>` : ''}
           ${rigText ? `<div><strong>Suitable for:</strong> ${rigText}</div>` : ''}
           <div><strong>Rating:</strong> ${ratingText}</div>
+          ${servicesText ? `<div><strong>Nearest:</strong> ${servicesText}</div>` : ''}
         </div>
         ${safeAmenities ? `
           <div style="font-size:11px;color:#888;margin-bottom:8px;">
@@ -332,13 +643,90 @@
     }
   }
 
+  function createClusterIcon(count) {
+    let size = 'small';
+    if (count > 50) size = 'large';
+    else if (count > 10) size = 'medium';
+
+    return L.divIcon({
+      html: `<div style="background:#FF6B6B;color:#fff;border-radius:50%;width:40px;height:40px;display:grid;place-items:center;font-weight:bold;border:3px solid #fff;box-shadow:0 2px 8px rgba(0,0,0,.3);">${count}</div>`,
+      className: `kt-cluster kt-cluster-${size}`,
+      iconSize: [40, 40]
+    });
+  }
+
+  // Draw the precomputed cluster level for the current zoom (in place of the cluster group)
+  async function showPyramid(map, config) {
+    const zoom = Math.max(state.clusters.min_zoom, Math.min(Math.round(map.getZoom()), state.clusters.max_zoom));
+    const features = await loadClusterLevel(zoom);
+    if (!features) return false;
+
+    if (map.hasLayer(state.clusterGroup)) map.removeLayer(state.clusterGroup);
+    if (!map.hasLayer(state.pyramidLayer)) map.addLayer(state.pyramidLayer);
+    state.pyramidLayer.clearLayers();
+
+    const bounds = map.getBounds().pad(0.2);
+    let shown = 0;
+    features.forEach(feature => {
+      const [lng, lat] = feature.geometry.coordinates;
+      if (!bounds.contains([lat, lng])) return;
+      const p = feature.properties;
+
+      let marker;
+      if (p.cluster) {
+        marker = L.marker([lat, lng], { icon: createClusterIcon(p.point_count) });
+        marker.on('click', () => map.setView([lat, lng], p.expansion_zoom));
+      } else {
+        marker = L.marker([lat, lng], { icon: createMarkerIcon(feature) });
+        marker.bindPopup(createPopup(feature));
+        if (p.id) state.pyramidSites.set(p.id, feature);
+      }
+      state.pyramidLayer.addLayer(marker);
+      shown++;
+    });
+    console.log(`🧩 Cluster level ${zoom}: ${shown} markers in view`);
+
+    if (config.onFilterUpdate) {
+      config.onFilterUpdate(state.clusters.total, state.clusters.total);
+    }
+    return true;
+  }
+
+  // Swap the pyramid back out for the browser-side cluster group; true if it was showing
+  function hidePyramid(map) {
+    if (!state.pyramidLayer || !map.hasLayer(state.pyramidLayer)) return false;
+    map.removeLayer(state.pyramidLayer);
+    map.addLayer(state.clusterGroup);
+    return true;
+  }
+
   async function refreshData(map, filters, config) {
+    if (usePyramid(map, filters) && await showPyramid(map, config)) {
+      return;
+    }
+    const switched = hidePyramid(map);
+
+    if (state.tiles) {
+      if (await loadVisibleTiles(map) || switched) {
+        updateMarkers(map, filters, config);
+      }
+      return;
+    }
+
     const visibleStates = getVisibleStates(map);
-    const newStates = visibleStates.filter(s => !state.loadedStates.has(s) && !state.loading.has(s));
-    
+    const viewport = getViewport(map);
+    const cellStates = visibleStates.filter(s => useCells(s));
+    const newStates = visibleStates.filter(s => !useCells(s) && !state.loadedStates.has(s) && !state.loading.has(s));
+
     if (newStates.length > 0) {
       console.log('🔄 Loading new states:', newStates.join(', '));
-      await Promise.all(newStates.map(s => loadStateData(s)));
+    }
+    const results = await Promise.all([
+      ...cellStates.map(s => loadStateCells(s, viewport)),
+      ...newStates.map(s => loadStateData(s))
+    ]);
+
+    if (newStates.length > 0 || results.some(loaded => loaded === true) || switched) {
       updateMarkers(map, filters, config);
     }
   }
@@ -354,41 +742,50 @@
         showCoverageOnHover: false,
         zoomToBoundsOnClick: true,
         iconCreateFunction: function(cluster) {
-          const count = cluster.getChildCount();
-          let size = 'small';
-          if (count > 50) size = 'large';
-          else if (count > 10) size = 'medium';
-          
-          return L.divIcon({
-            html: `<div style="background:#FF6B6B;color:#fff;border-radius:50%;width:40px;height:40px;display:grid;place-items:center;font-weight:bold;border:3px solid #fff;box-shadow:0 2px 8px rgba(0,0,0,.3);">${count}</div>`,
-            className: `kt-cluster kt-cluster-${size}`,
-            iconSize: [40, 40]
-          });
+          return createClusterIcon(cluster.getChildCount());
         }
       });
+      state.pyramidLayer = L.layerGroup();
       map.addLayer(state.clusterGroup);
 
-      await loadIndex();
+      await loadArtifactManifest();
+      await Promise.all([loadIndex(), loadTileManifest(), loadClusterManifest()]);
 
-      // Get visible states
-      let initialStates = getVisibleStates(map);
-      
-      // FALLBACK: If no states detected, force load popular camping states
-      if (initialStates.length === 0) {
-        console.warn('⚠️ No states detected in viewport, loading popular states as fallback...');
-        initialStates = ['CA', 'CO', 'UT', 'AZ', 'WA', 'OR', 'MT', 'WY'];
-      }
-      
-      console.log('🚀 Loading initial states:', initialStates.join(', '));
-      
-      // Load states one at a time with progress logging
-      for (const stateCode of initialStates) {
-        await loadStateData(stateCode);
+      if (usePyramid(map, this.getCurrentFilters()) && await showPyramid(map, state.config)) {
+        // Zoomed out: the precomputed cluster level is all that needs drawing
+      } else if (state.tiles) {
+        // Pre-built tiles: fetch only what is in view
+        await loadVisibleTiles(map);
+      } else {
+        // Get visible states
+        let initialStates = getVisibleStates(map);
+
+        // FALLBACK: If no states detected, force load popular camping states
+        const fallback = initialStates.length === 0;
+        if (fallback) {
+          console.warn('⚠️ No states detected in viewport, loading popular states as fallback...');
+          initialStates = ['CA', 'CO', 'UT', 'AZ', 'WA', 'OR', 'MT', 'WY'];
+        }
+
+        console.log('🚀 Loading initial states:', initialStates.join(', '));
+
+        // Load states one at a time with progress logging
+        // (only the cells in view when the spatial index is available)
+        const viewport = getViewport(map);
+        for (const stateCode of initialStates) {
+          if (!fallback && useCells(stateCode)) {
+            await loadStateCells(stateCode, viewport);
+          } else {
+            await loadStateData(stateCode);
+          }
+        }
       }
       
       console.log(`✅ Initial load complete: ${state.allCampsites.length} total sites`);
 
-      updateMarkers(map, this.getDefaultFilters(), state.config);
+      if (!map.hasLayer(state.pyramidLayer)) {
+        updateMarkers(map, this.getDefaultFilters(), state.config);
+      }
 
       map.on('moveend', debounce(() => {
         refreshData(map, this.getCurrentFilters(), state.config);
@@ -417,6 +814,13 @@
 
     updateFilters(filters, map) {
       window.kamptrailFilters = filters;
+      if (state.clusters) {
+        // Filters may switch between the cluster pyramid and browser clustering
+        refreshData(map, filters, state.config).then(() => {
+          if (!map.hasLayer(state.pyramidLayer)) updateMarkers(map, filters, state.config);
+        });
+        return;
+      }
       updateMarkers(map, filters, state.config);
     },
 
@@ -425,7 +829,7 @@
     },
 
     getCampsiteById(id) {
-      return state.allCampsites.find(s => s.properties.id === id);
+      return state.allCampsites.find(s => s.properties.id === id) || state.pyramidSites.get(id);
     },
 
     getLoadedStates() {
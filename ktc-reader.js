@@ -0,0 +1,103 @@
+/* ktc-reader.js - Decoder for KTC1 columnar campsite/POI files (see scripts/columnar.py) */
+
+(function() {
+  'use strict';
+
+  const NULL_U32 = 0xFFFFFFFF;
+  const NULL_U16 = 0xFFFF;
+  const LITTLE_ENDIAN = new Uint8Array(new Uint16Array([1]).buffer)[0] === 1;
+
+  // Undo float32 noise (12.34 is stored as 12.340000152...)
+  function roundF32(value) {
+    return Number.isInteger(value) ? value : parseFloat(value.toPrecision(7));
+  }
+
+  // Decode an ArrayBuffer holding a KTC1 file into an array of GeoJSON point features
+  function decode(buffer) {
+    const bytes = new Uint8Array(buffer);
+    if (String.fromCharCode(bytes[0], bytes[1], bytes[2], bytes[3]) !== 'KTC1') {
+      throw new Error('Not a KTC1 file');
+    }
+
+    const view = new DataView(buffer);
+    const headerLength = view.getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(bytes.subarray(8, 8 + headerLength)));
+    if (header.version !== 1) throw new Error(`Unsupported KTC version ${header.version}`);
+    if (!LITTLE_ENDIAN) throw new Error('KTC1 decoding needs a little-endian platform');
+
+    // Sections are 4-byte aligned, so columns map straight onto typed arrays
+    const base = 8 + headerLength;
+    const count = header.count;
+    const decoder = new TextDecoder();
+    const u32 = (offset, length) => new Uint32Array(buffer, base + offset, length);
+    const align4 = (n) => Math.ceil(n / 4) * 4;
+
+    const table = header.strings;
+    const stringOffsets = u32(table.offset, table.count + 1);
+    const blobStart = base + table.offset + 4 * (table.count + 1);
+    const strings = new Array(table.count);
+    for (let i = 0; i < table.count; i++) {
+      strings[i] = decoder.decode(bytes.subarray(blobStart + stringOffsets[i], blobStart + stringOffsets[i + 1]));
+    }
+
+    const lon = new Int32Array(buffer, base + header.columns.find(c => c.name === 'lon').offset, count);
+    const lat = new Int32Array(buffer, base + header.columns.find(c => c.name === 'lat').offset, count);
+    const features = new Array(count);
+    for (let i = 0; i < count; i++) {
+      features[i] = {
+        type: 'Feature',
+        geometry: { type: 'Point', coordinates: [lon[i] / header.scale, lat[i] / header.scale] },
+        properties: {}
+      };
+    }
+
+    header.columns.forEach(column => {
+      const { name, kind, offset, present } = column;
+      if (kind === 'coord') return;
+
+      let values;
+      if (kind === 'str') {
+        const codes = u32(offset, count);
+        values = (i) => (codes[i] === NULL_U32 ? null : strings[codes[i]]);
+      } else if (kind === 'enum') {
+        const codes = new Uint16Array(buffer, base + offset, count);
+        values = (i) => (codes[i] === NULL_U16 ? null : column.values[codes[i]]);
+      } else if (kind === 'enum_list') {
+        const listOffsets = u32(offset, count + 1);
+        const codes = new Uint16Array(buffer, base + offset + align4(4 * (count + 1)), listOffsets[count]);
+        values = (i) => {
+          const list = [];
+          for (let j = listOffsets[i]; j < listOffsets[i + 1]; j++) list.push(column.values[codes[j]]);
+          return list;
+        };
+      } else if (kind === 'f32') {
+        const numbers = new Float32Array(buffer, base + offset, count);
+        values = (i) => (Number.isNaN(numbers[i]) ? null : roundF32(numbers[i]));
+      } else if (kind === 'u32') {
+        const numbers = u32(offset, count);
+        values = (i) => (numbers[i] === NULL_U32 ? null : numbers[i]);
+      } else {
+        throw new Error(`Unknown column kind ${kind}`);
+      }
+
+      if (present === null) {
+        for (let i = 0; i < count; i++) features[i].properties[name] = values(i);
+      } else {
+        for (let i = 0; i < count; i++) {
+          if (bytes[base + present + (i >> 3)] & (1 << (i & 7))) features[i].properties[name] = values(i);
+        }
+      }
+    });
+
+    return features;
+  }
+
+  // Fetch a .ktc URL and return a GeoJSON FeatureCollection
+  async function load(url) {
+    const response = await fetch(url);
+    if (!response.ok) throw new Error(`HTTP ${response.status} for ${url}`);
+    return { type: 'FeatureCollection', features: decode(await response.arrayBuffer()) };
+  }
+
+  window.KampTrailKTC = { decode, load };
+})();
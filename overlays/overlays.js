@@ -7,6 +7,13 @@
   function loadGeoJSON(url) {
     return fetch(url).then(r => { if (!r.ok) throw new Error('Load failed: ' + url); return r.json(); });
   }
+  function lngLatToTile(lng, lat, zoom) {
+    const n = Math.pow(2, zoom);
+    const latRad = Math.max(-85.0511287798, Math.min(85.0511287798, lat)) * Math.PI / 180;
+    const x = Math.floor((lng + 180) / 360 * n);
+    const y = Math.floor((1 - Math.asinh(Math.tan(latRad)) / Math.PI) / 2 * n);
+    return [Math.min(Math.max(x, 0), n - 1), Math.min(Math.max(y, 0), n - 1)];
+  }
   function withinBounds(feature, bounds) {
     const [lng, lat] = feature.geometry.type === 'Point'
       ? feature.geometry.coordinates
@@ -32,6 +39,7 @@
         publicLandsUrl: '',
         openCelliDKey: '',
         poiUrl: 'data/poi_dump_water_propane.geojson',
+        poiTilesUrl: 'data/poi/manifest.json',
         placesUrl: 'data/sample_places.geojson',
         maxPoiCount: 10000,
         maxTowerCount: 500
@@ -198,10 +206,10 @@
       });
       const poiCluster = L.markerClusterGroup({ chunkedLoading: true, spiderfyOnMaxZoom: false });
       let poiAdded = false;
-      function addPoisOnce(features) {
-        if (poiAdded) return;
+      let poiCount = 0;
+      function addPois(features) {
         const esc = window.escapeHtml || ((t) => t);
-        features.slice(0, cfg.maxPoiCount).forEach(f => {
+        features.slice(0, Math.max(cfg.maxPoiCount - poiCount, 0)).forEach(f => {
           const [lng, lat] = f.geometry.coordinates;
           const type = (f.properties.type || '').toLowerCase();
           const label = f.properties.name || type.toUpperCase();
@@ -210,11 +218,47 @@
           const m = L.marker([lat, lng], { icon: poiIcon[type] || icon('#0984e3','•'), title: safeLabel });
           m.bindPopup(`<strong>${safeLabel}</strong><br>${safeType}`);
           poiCluster.addLayer(m);
+          poiCount++;
         });
+      }
+      function addPoisOnce(features) {
+        if (poiAdded) return;
+        addPois(features);
         map.addLayer(poiCluster);
         poiAdded = true;
       }
-      loadGeoJSON(cfg.poiUrl).then(gj => addPoisOnce(gj.features)).catch(()=>{});
+      // POI shards (scripts/poi_shards.py): fetch only the shards in view, falling back to the whole file
+      let poiTiles = null;
+      const poiTilesLoaded = new Set();
+      function loadPoiTiles() {
+        if (!poiTiles) return;
+        const layer = poiTiles.layers.poi;
+        const zoom = poiTiles.zoom;
+        const base = cfg.poiTilesUrl.replace(/[^/]*$/, '');
+        const b = map.getBounds();
+        const [x0, y0] = lngLatToTile(Math.max(b.getWest(), -180), b.getNorth(), zoom);
+        const [x1, y1] = lngLatToTile(Math.min(b.getEast(), 180), b.getSouth(), zoom);
+        for (let x = x0; x <= x1; x++) {
+          for (let y = y0; y <= y1; y++) {
+            const key = `${zoom}/${x}/${y}`;
+            if (!layer.tiles[key] || poiTilesLoaded.has(key)) continue;
+            poiTilesLoaded.add(key);
+            const url = base + layer.url.replace('{z}', zoom).replace('{x}', x).replace('{y}', y);
+            const load = poiTiles.format === 'ktc' ? window.KampTrailKTC.load(url) : loadGeoJSON(url);
+            load.then(gj => addPois(gj.features)).catch(()=>{});
+          }
+        }
+      }
+      loadGeoJSON(cfg.poiTilesUrl)
+        .then(manifest => {
+          if (!manifest.layers || !manifest.layers.poi) throw new Error('No POI tiles');
+          if (manifest.format === 'ktc' && !window.KampTrailKTC) throw new Error('ktc-reader.js not loaded');
+          poiTiles = manifest;
+          map.addLayer(poiCluster);
+          poiAdded = true;
+          loadPoiTiles();
+        })
+        .catch(() => loadGeoJSON(cfg.poiUrl).then(gj => addPoisOnce(gj.features)).catch(()=>{}));
       poiToggle.addEventListener('change', () => {
         if (poiToggle.checked) map.addLayer(poiCluster); else map.removeLayer(poiCluster);
       });
@@ -259,6 +303,8 @@
       }
       loadGeoJSON(cfg.placesUrl).then(gj => { placesAll = gj; refreshPlaces(); }).catch(()=>{});
       map.on('moveend', () => {
+        clearTimeout(map._ktPoiTimer);
+        map._ktPoiTimer = setTimeout(loadPoiTiles, 200);
         clearTimeout(map._ktPlaceTimer);
         map._ktPlaceTimer = setTimeout(refreshPlaces, 200);
         clearTimeout(map._ktTowerTimer);
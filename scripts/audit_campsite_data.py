@@ -6,13 +6,45 @@ Checks for:
 - Placeholder or test data
 - Data quality issues
 - Missing or empty files
+
+Every feature of every file is checked. Each file's coordinates are loaded
+into NumPy arrays once, so the range, null-island, state-bounds and
+duplicate-point checks are a handful of vectorized operations per file; names
+and descriptions go through one precompiled keyword matcher. Files are
+audited in parallel worker processes (--jobs).
+
+Issues (bad coordinates, placeholders, unreadable/empty files) fail the
+audit. Sites outside their state's rough bounding box and duplicate points
+are reported as warnings.
+
+--json writes the full report (per-state counts, bytes, sources, issues,
+warnings and phase timings). Each run also appends one compact line to
+data/audit_history.jsonl, which keeps only the last HISTORY_LENGTH runs;
+the next run compares with the last line and flags files whose site count
+dropped by more than COUNT_DROP_RATIO or whose size grew by more than
+SIZE_JUMP_RATIO.
+
+Usage:
+    python3 scripts/audit_campsite_data.py
+    python3 scripts/audit_campsite_data.py --jobs 1
+    python3 scripts/audit_campsite_data.py --json audit.json
+    python3 scripts/audit_campsite_data.py --json - --no-history
 """
 
+import argparse
+import contextlib
 import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from collections import defaultdict
+
+import numpy as np
+
+import geoio
+from fetch_osm_data import STATE_BOUNDS
+from matchers import KeywordMatcher
 
 # All 50 US states
 ALL_STATES = [
@@ -29,149 +61,305 @@ PLACEHOLDER_KEYWORDS = [
     'lorem ipsum', 'todo', 'tbd', 'xxx', 'zzz'
 ]
 
-def check_file_for_placeholders(filepath):
-    """Check if a file contains placeholder data"""
-    issues = []
+# Whole words only, so "Greatest" or "Contest" are not test data
+PLACEHOLDER_MATCHER = KeywordMatcher(PLACEHOLDER_KEYWORDS, whole_words=True)
 
+# Real descriptions say "for example" or "a place to test your rig", so
+# descriptions are only checked for phrases that never occur in real text
+DESCRIPTION_PLACEHOLDERS = [
+    'lorem ipsum', 'placeholder text', 'test data', 'sample data', 'dummy data',
+    'test description', 'sample description', 'description goes here'
+]
+DESCRIPTION_MATCHER = KeywordMatcher(DESCRIPTION_PLACEHOLDERS, whole_words=True)
+
+BOUNDS_MARGIN = 0.25       # Degrees around STATE_BOUNDS, which are rough boxes
+NULL_ISLAND_DEGREES = 1.0  # Anything this close to (0, 0) is a missing coordinate, not a US campsite
+DUPLICATE_DECIMALS = 5     # Points equal to ~1 m count as duplicates
+MAX_LISTED = 5             # Features listed per check and file; the rest are counted
+
+SOURCES = ['recgov', 'osm']  # data/campsites and data/opencampingmap
+
+# Run history (one compact JSON line per audit) and what counts as a regression
+HISTORY_PATH = Path('data') / 'audit_history.jsonl'
+HISTORY_LENGTH = 1         # Runs kept; compare() only looks at the previous one
+COUNT_DROP_RATIO = 0.2     # A file losing more than 20% of its sites
+SIZE_JUMP_RATIO = 0.5      # A file growing by more than 50%
+
+
+def coordinate_arrays(features):
+    """(lons, lats, valid): float arrays of the point coordinates, and where
+    the feature has exactly two numeric coordinates."""
+    lons = np.full(len(features), np.nan)
+    lats = np.full(len(features), np.nan)
+    for idx, feature in enumerate(features):
+        coords = (feature.get('geometry') or {}).get('coordinates')
+        if isinstance(coords, list) and len(coords) == 2:
+            lon, lat = coords
+            if isinstance(lon, (int, float)) and isinstance(lat, (int, float)) \
+                    and not isinstance(lon, bool) and not isinstance(lat, bool):
+                lons[idx] = lon
+                lats[idx] = lat
+    return lons, lats, np.isfinite(lons) & np.isfinite(lats)
+
+
+def duplicate_mask(lons, lats, valid, decimals=DUPLICATE_DECIMALS):
+    """True for every valid point equal (at ``decimals``) to an earlier one."""
+    mask = np.zeros(len(lons), dtype=bool)
+    idx = np.flatnonzero(valid)
+    if len(idx) < 2:
+        return mask
+    keys = np.stack([np.round(lons[idx] * 10 ** decimals), np.round(lats[idx] * 10 ** decimals)], axis=1)
+    _, first = np.unique(keys, axis=0, return_index=True)
+    mask[idx] = True
+    mask[idx[first]] = False
+    return mask
+
+
+def state_bbox(state):
+    if state not in STATE_BOUNDS:
+        return None
+    south, west, north, east = map(float, STATE_BOUNDS[state].split(','))
+    return west, south, east, north
+
+
+def _listed(label, filepath, indices, describe):
+    """One line per flagged feature, up to MAX_LISTED, then a count of the rest."""
+    lines = [f"{label} in {filepath}, feature {int(idx)}{describe(int(idx))}" for idx in indices[:MAX_LISTED]]
+    if len(indices) > MAX_LISTED:
+        lines.append(f"{label} in {filepath}: {len(indices) - MAX_LISTED} more features")
+    return lines
+
+
+def check_features(data, filepath, state=None):
+    """Check every feature of already-loaded GeoJSON; returns (issues, warnings)."""
+    issues = []
+    warnings = []
+
+    if not isinstance(data, dict) or 'features' not in data:
+        issues.append(f"Invalid GeoJSON structure in {filepath}")
+        return issues, warnings
+
+    features = data.get('features', [])
+
+    # Check for empty files
+    if len(features) == 0:
+        issues.append(f"EMPTY FILE: {filepath} has 0 features")
+        return issues, warnings
+
+    # Placeholder names/descriptions, one compiled regex pass per field
+    placeholders = {}
+    for idx, feature in enumerate(features):
+        props = feature.get('properties') or {}
+        keyword = PLACEHOLDER_MATCHER.find(str(props.get('name') or '').lower()) or \
+            DESCRIPTION_MATCHER.find(str(props.get('description') or '').lower())
+        if keyword:
+            placeholders[idx] = keyword
+    issues += _listed('PLACEHOLDER DETECTED', filepath, list(placeholders),
+                      lambda i: f": name='{(features[i].get('properties') or {}).get('name')}' "
+                                f"(matched '{placeholders[i]}')")
+
+    # Coordinate checks over whole arrays
+    lons, lats, valid = coordinate_arrays(features)
+    in_range = valid & (np.abs(lons) <= 180) & (np.abs(lats) <= 90)
+    coords_of = lambda i: f": {(features[i].get('geometry') or {}).get('coordinates')}"
+
+    issues += _listed('INVALID COORDINATES', filepath, np.flatnonzero(~valid), lambda i: '')
+    issues += _listed('OUT OF RANGE COORDINATES', filepath, np.flatnonzero(valid & ~in_range), coords_of)
+    null_island = in_range & (np.abs(lons) < NULL_ISLAND_DEGREES) & (np.abs(lats) < NULL_ISLAND_DEGREES)
+    issues += _listed('NULL ISLAND COORDINATES', filepath, np.flatnonzero(null_island), coords_of)
+
+    bbox = state_bbox(state)
+    if bbox is not None:
+        west, south, east, north = bbox
+        inside = (lons >= west - BOUNDS_MARGIN) & (lons <= east + BOUNDS_MARGIN) & \
+                 (lats >= south - BOUNDS_MARGIN) & (lats <= north + BOUNDS_MARGIN)
+        warnings += _listed(f'OUTSIDE {state} BOUNDS', filepath,
+                            np.flatnonzero(in_range & ~null_island & ~inside), coords_of)
+    warnings += _listed('DUPLICATE POINT', filepath, np.flatnonzero(duplicate_mask(lons, lats, in_range)), coords_of)
+
+    return issues, warnings
+
+def load_file(filepath, load=geoio.read):
+    """Load a GeoJSON file, returning (data, None) or (None, issue)"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        if not isinstance(data, dict) or 'features' not in data:
-            issues.append(f"Invalid GeoJSON structure in {filepath}")
-            return issues
-
-        features = data.get('features', [])
-
-        # Check for empty files
-        if len(features) == 0:
-            issues.append(f"EMPTY FILE: {filepath} has 0 features")
-            return issues
-
-        # Check for placeholder content
-        for idx, feature in enumerate(features[:5]):  # Check first 5 features
-            props = feature.get('properties', {})
-            name = props.get('name', '').lower()
-            desc = str(props.get('description', '')).lower()
-
-            for keyword in PLACEHOLDER_KEYWORDS:
-                if keyword in name or keyword in desc:
-                    issues.append(f"PLACEHOLDER DETECTED in {filepath}, feature {idx}: name='{props.get('name')}'")
-
-        # Check for valid coordinates
-        for idx, feature in enumerate(features[:10]):
-            coords = feature.get('geometry', {}).get('coordinates', [])
-            if not coords or len(coords) != 2:
-                issues.append(f"INVALID COORDINATES in {filepath}, feature {idx}")
-            elif not (-180 <= coords[0] <= 180 and -90 <= coords[1] <= 90):
-                issues.append(f"OUT OF RANGE COORDINATES in {filepath}, feature {idx}: {coords}")
-
+        return load(filepath), None
     except json.JSONDecodeError as e:
-        issues.append(f"JSON PARSE ERROR in {filepath}: {e}")
+        return None, f"JSON PARSE ERROR in {filepath}: {e}"
     except Exception as e:
-        issues.append(f"ERROR reading {filepath}: {e}")
+        return None, f"ERROR reading {filepath}: {e}"
 
-    return issues
+def check_file_for_placeholders(filepath, data=None, state=None):
+    """Check if a file contains placeholder data or bad coordinates; returns (issues, warnings)"""
+    if data is None:
+        data, error = load_file(filepath)
+        if error:
+            return [error], []
+    return check_features(data, filepath, state)
 
-def get_file_stats(filepath):
+def get_file_stats(filepath, data=None):
     """Get statistics about a GeoJSON file"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if data is None:
+            data = geoio.read(filepath)
 
         features = data.get('features', [])
-        sources = set()
-
-        for feature in features:
-            source = feature.get('properties', {}).get('source', 'unknown')
-            sources.add(source)
+        sources = {(feature.get('properties') or {}).get('source', 'unknown') for feature in features}
+        size = os.path.getsize(filepath)
 
         return {
             'count': len(features),
-            'sources': list(sources),
-            'size_kb': os.path.getsize(filepath) / 1024
+            'sources': sorted(str(source) for source in sources),
+            'bytes': size,
+            'size_kb': size / 1024
         }
     except:
-        return {'count': 0, 'sources': [], 'size_kb': 0}
+        return {'count': 0, 'sources': [], 'bytes': 0, 'size_kb': 0}
+
+def audit_file(filepath, state, load=geoio.read):
+    """Stats, issues, warnings and timings for one file (runs in a worker process with --jobs)"""
+    started = time.perf_counter()
+    data, error = load_file(filepath, load)
+    loaded = time.perf_counter()
+    stats = get_file_stats(filepath, data or {})
+    if error:
+        stats['issues'], stats['warnings'] = [error], []
+    else:
+        stats['issues'], stats['warnings'] = check_features(data, filepath, state)
+    stats['load_seconds'] = loaded - started
+    stats['check_seconds'] = time.perf_counter() - loaded
+    return stats
+
+def audit_all(tasks, load=geoio.read, jobs=1):
+    """{filepath: audit_file result} for [(filepath, state)] ``tasks``.
+
+    Worker processes read the files themselves, so a custom ``load`` (the
+    pipeline's in-memory documents) always runs in this process.
+    """
+    paths = [path for path, _ in tasks]
+    states = [state for _, state in tasks]
+    if jobs > 1 and load is geoio.read and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(audit_file, paths, states, chunksize=4))
+    else:
+        results = [audit_file(path, state, load) for path, state in tasks]
+    return dict(zip(paths, results))
 
-def main():
-    base_dir = Path(__file__).parent.parent
+def build_report(base_dir, load=geoio.read, jobs=1):
+    """Audit the data and return the machine-readable report (see --json)."""
+    started = time.perf_counter()
     campsites_dir = base_dir / 'data' / 'campsites'
     osm_dir = base_dir / 'data' / 'opencampingmap'
 
+    # Pick each state's files first, then audit them all in one parallel pass
+    files = {}
+    for state in ALL_STATES:
+        # Check for files with various naming patterns; use the first found
+        for pattern in [f"{state}.geojson", f"{state}(1).geojson", f"{state}_merged.geojson"]:
+            filepath = campsites_dir / pattern
+            if filepath.exists():
+                files[(state, 'recgov')] = filepath
+                break
+        filepath = osm_dir / f"{state}.geojson"
+        if filepath.exists():
+            files[(state, 'osm')] = filepath
+    discovered = time.perf_counter()
+
+    results = audit_all([(path, state) for (state, _), path in files.items()], load, jobs)
+    audited = time.perf_counter()
+
+    states = {}
+    for state in ALL_STATES:
+        states[state] = {}
+        for source in SOURCES:
+            filepath = files.get((state, source))
+            if filepath is None:
+                states[state][source] = None
+                continue
+            result = results[filepath]
+            states[state][source] = {
+                'file': os.path.relpath(filepath, base_dir),
+                'count': result['count'],
+                'bytes': result['bytes'],
+                'sources': result['sources'],
+                'issues': result['issues'],
+                'warnings': result['warnings'],
+            }
+
+    entries = [entry for by_source in states.values() for entry in by_source.values() if entry]
+    return {
+        'generated': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'states': states,
+        'totals': {
+            **{source: sum(by_source[source]['count'] for by_source in states.values() if by_source[source])
+               for source in SOURCES},
+            'files': len(entries),
+            'features': sum(entry['count'] for entry in entries),
+            'bytes': sum(entry['bytes'] for entry in entries),
+            'issues': sum(len(entry['issues']) for entry in entries),
+            'warnings': sum(len(entry['warnings']) for entry in entries),
+        },
+        'missing': {source: [state for state in ALL_STATES if not states[state][source]] for source in SOURCES},
+        'timings': {
+            'discover': round(discovered - started, 4),
+            # load/check are summed over files, so with --jobs they can exceed the wall time of 'audit'
+            'load': round(sum(r['load_seconds'] for r in results.values()), 4),
+            'check': round(sum(r['check_seconds'] for r in results.values()), 4),
+            'audit': round(audited - discovered, 4),
+            'total': round(time.perf_counter() - started, 4),
+        },
+    }
+
+def print_report(report):
+    """Print the text report and return the exit code."""
+    states = report['states']
+
     print("=" * 80)
     print("KAMPTRAIL CAMPSITE DATABASE AUDIT")
     print("=" * 80)
 
     # Track state coverage
-    rec_gov_states = set()
-    osm_states = set()
+    rec_gov_states = {state for state in ALL_STATES if states[state]['recgov']}
+    osm_states = {state for state in ALL_STATES if states[state]['osm']}
 
     print("\n1. RECREATION.GOV DATA AUDIT")
     print("-" * 80)
 
-    rec_gov_total = 0
-    rec_gov_issues = []
-
     for state in ALL_STATES:
-        # Check for files with various naming patterns
-        found = False
-        for pattern in [f"{state}.geojson", f"{state}(1).geojson", f"{state}_merged.geojson"]:
-            filepath = campsites_dir / pattern
-            if filepath.exists():
-                found = True
-                rec_gov_states.add(state)
-                stats = get_file_stats(filepath)
-                rec_gov_total += stats['count']
-
-                print(f"  ✓ {state:2s}: {stats['count']:4d} sites ({stats['size_kb']:7.1f} KB) - {', '.join(stats['sources'])}")
-
-                # Check for issues
-                issues = check_file_for_placeholders(filepath)
-                if issues:
-                    rec_gov_issues.extend(issues)
-
-                break  # Use first found file
-
-        if not found:
+        entry = states[state]['recgov']
+        if entry:
+            print(f"  ✓ {state:2s}: {entry['count']:4d} sites ({entry['bytes'] / 1024:7.1f} KB) - {', '.join(entry['sources'])}")
+        else:
             print(f"  ✗ {state:2s}: MISSING")
 
     print(f"\nRecreation.gov Summary:")
     print(f"  States with data: {len(rec_gov_states)}/50")
-    print(f"  Total campsites: {rec_gov_total:,}")
-    print(f"  Missing states: {', '.join(sorted(set(ALL_STATES) - rec_gov_states))}")
+    print(f"  Total campsites: {report['totals']['recgov']:,}")
+    print(f"  Missing states: {', '.join(report['missing']['recgov'])}")
 
     print("\n2. OPENSTREETMAP DATA AUDIT")
     print("-" * 80)
 
-    osm_total = 0
-    osm_issues = []
-
     for state in ALL_STATES:
-        filepath = osm_dir / f"{state}.geojson"
-        if filepath.exists():
-            osm_states.add(state)
-            stats = get_file_stats(filepath)
-            osm_total += stats['count']
-
-            print(f"  ✓ {state:2s}: {stats['count']:4d} sites ({stats['size_kb']:7.1f} KB)")
-
-            # Check for issues
-            issues = check_file_for_placeholders(filepath)
-            if issues:
-                osm_issues.extend(issues)
+        entry = states[state]['osm']
+        if entry:
+            print(f"  ✓ {state:2s}: {entry['count']:4d} sites ({entry['bytes'] / 1024:7.1f} KB)")
         else:
             print(f"  ✗ {state:2s}: MISSING")
 
     print(f"\nOpenStreetMap Summary:")
     print(f"  States with data: {len(osm_states)}/50")
-    print(f"  Total campsites: {osm_total:,}")
-    print(f"  Missing states: {', '.join(sorted(set(ALL_STATES) - osm_states))}")
+    print(f"  Total campsites: {report['totals']['osm']:,}")
+    print(f"  Missing states: {', '.join(report['missing']['osm'])}")
 
     print("\n3. DATA QUALITY ISSUES")
     print("-" * 80)
+    print(f"  Checked all {report['totals']['features']:,} features in {report['totals']['files']} files "
+          f"in {report['timings']['audit']:.2f}s")
 
-    all_issues = rec_gov_issues + osm_issues
+    # Recreation.gov files first, then OSM, as the sections above
+    entries = [states[state][source] for source in SOURCES for state in ALL_STATES if states[state][source]]
+    all_issues = [issue for entry in entries for issue in entry['issues']]
+    all_warnings = [warning for entry in entries for warning in entry['warnings']]
 
     if all_issues:
         print(f"Found {len(all_issues)} issues:")
@@ -180,6 +368,11 @@ def main():
     else:
         print("  ✓ No placeholder or quality issues detected!")
 
+    if all_warnings:
+        print(f"\n{len(all_warnings)} warnings (not counted as failures):")
+        for warning in all_warnings:
+            print(f"  · {warning}")
+
     print("\n4. COVERAGE ANALYSIS")
     print("-" * 80)
 
@@ -221,13 +414,149 @@ def main():
         print("  ✓ Database is complete with all 50 states and no issues!")
         print("  ✓ Ready for 100% deployment!")
 
+    trend = report.get('trend')
+    if trend:
+        print("\n6. TREND")
+        print("-" * 80)
+        if trend['previous'] is None:
+            print("  No earlier run in the history to compare with")
+        else:
+            totals = trend['totals']
+            print(f"  Since {trend['previous']}: {totals['features']:+,} features, "
+                  f"{totals['bytes'] / 1024:+,.1f} KB, audit {totals['seconds']:+.2f}s")
+            for flag in trend['flags']:
+                print(f"  ⚠ {flag}")
+            if not trend['flags']:
+                print("  ✓ No large count drops or size jumps")
+
     print("\n" + "=" * 80)
 
     # Exit code based on completeness
     if missing_rec_gov or missing_osm or all_issues:
-        sys.exit(1)
-    else:
-        sys.exit(0)
+        return 1
+    return 0
+
+def run_audit(base_dir, load=geoio.read, jobs=1):
+    """Print the full audit report and return the exit code.
+
+    ``load`` reads a file path into GeoJSON; the pipeline runner passes one
+    that serves its already-loaded documents so nothing is parsed twice.
+    With the default loader, ``jobs`` worker processes audit the files.
+    """
+    return print_report(build_report(base_dir, load, jobs))
+
+def history_entry(report):
+    """The compact form of a report kept in the history file: per-state [count, bytes] by source."""
+    return {
+        'generated': report['generated'],
+        'features': report['totals']['features'],
+        'bytes': report['totals']['bytes'],
+        'issues': report['totals']['issues'],
+        'seconds': report['timings']['total'],
+        'states': {
+            state: {source: [entry['count'], entry['bytes']] for source, entry in by_source.items() if entry}
+            for state, by_source in report['states'].items()
+        },
+    }
+
+def history_tail(path, count):
+    """The last ``count`` lines of the history file, read from the end so old runs are never parsed."""
+    if count < 1:
+        return []
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            chunk = b''
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                chunk = f.read(end - start) + chunk
+                end = start
+                lines = [line for line in chunk.split(b'\n') if line.strip()]
+                # The first line may be cut off until the read reaches the start of the file
+                if len(lines) > count or end == 0:
+                    return lines[-count:]
+    except OSError:
+        pass
+    return []
+
+def last_history_entry(path):
+    """The previous run's history entry, or None."""
+    lines = history_tail(path, 1)
+    try:
+        return geoio.loads(lines[-1]) if lines else None
+    except ValueError:
+        return None
+
+def append_history(path, entry, keep=HISTORY_LENGTH):
+    """Add ``entry`` to the history file, dropping all but the last ``keep`` runs."""
+    lines = history_tail(path, keep - 1) + [geoio.dumps(entry)]
+    with geoio.atomic_open(path) as f:
+        f.write(b''.join(line + b'\n' for line in lines))
+
+def compare(previous, current):
+    """Changes between two history entries, with flags for large count drops and size jumps."""
+    trend = {'previous': previous['generated'] if previous else None, 'flags': []}
+    if not previous:
+        return trend
+    trend['totals'] = {
+        'features': current['features'] - previous['features'],
+        'bytes': current['bytes'] - previous['bytes'],
+        'seconds': round(current['seconds'] - previous['seconds'], 4),
+    }
+
+    def check(label, before, after):
+        before_count, before_bytes = before
+        after_count, after_bytes = after
+        if before_count and (before_count - after_count) / before_count > COUNT_DROP_RATIO:
+            trend['flags'].append(f"{label}: sites dropped {before_count:,} → {after_count:,}")
+        if before_bytes and (after_bytes - before_bytes) / before_bytes > SIZE_JUMP_RATIO:
+            trend['flags'].append(f"{label}: size jumped {before_bytes / 1024:,.1f} KB → {after_bytes / 1024:,.1f} KB")
+
+    for state in ALL_STATES:
+        before = previous['states'].get(state, {})
+        after = current['states'].get(state, {})
+        for source in SOURCES:
+            if source in before and source not in after:
+                trend['flags'].append(f"{state} {source}: file disappeared ({before[source][0]:,} sites)")
+            elif source in before:
+                check(f"{state} {source}", before[source], after[source])
+    check('total', [previous['features'], previous['bytes']], [current['features'], current['bytes']])
+    return trend
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit the campsite data for coverage and quality issues.')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Audit files in this many worker processes (default: one per CPU).')
+    parser.add_argument('--json', metavar='PATH',
+                        help='Also write the full report as JSON to PATH ("-" for stdout, text report to stderr).')
+    parser.add_argument('--history', default=str(HISTORY_PATH),
+                        help=f'History file to compare with and append to (default: {HISTORY_PATH}).')
+    parser.add_argument('--no-history', action='store_true',
+                        help='Do not read or append the history file.')
+    args = parser.parse_args()
+
+    base_dir = Path(__file__).parent.parent
+    report = build_report(base_dir, jobs=args.jobs)
+
+    if not args.no_history:
+        history_path = base_dir / args.history
+        entry = history_entry(report)
+        report['trend'] = compare(last_history_entry(history_path), entry)
+        append_history(history_path, entry)
+
+    # With --json - stdout carries only the JSON
+    with contextlib.redirect_stdout(sys.stderr if args.json == '-' else sys.stdout):
+        code = print_report(report)
+    report['exit_code'] = code
+
+    if args.json == '-':
+        sys.stdout.write(geoio.dumps(report, pretty=True).decode('utf-8') + '\n')
+    elif args.json:
+        geoio.write(args.json, report, pretty=True)
+
+    sys.exit(code)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pipeline's Python hot paths on seeded synthetic data.
+
+Each stage runs on generated input of every requested size:
+
+    osm_to_geojson   fetch_osm_data.osm_to_geojson on Overpass elements
+    ridb_convert     RIDBFetcher.convert_to_geojson on RIDB facility records
+    low_quality      clean_low_quality.is_low_quality over every feature
+    placeholder      clean_placeholders.is_placeholder over every feature
+    water            update_poi_data.water_features (the per-file work of
+                     extract_water_stations)
+    audit            audit_campsite_data.audit_file: read and check one file
+
+The generators are seeded (--seed), so a size always produces the same
+input. Each stage is timed --repeat times (the best run counts) and run
+once more under tracemalloc for its peak memory; generating the input is
+not measured. Results are compared with data/benchmark_baseline.json and
+a stage more than REGRESSION_RATIO slower than its baseline fails the
+run (exit 1); runs shorter than MIN_COMPARE_SECONDS are too noisy to fail
+it. Baselines are only comparable on the machine that wrote them, so
+re-save after changing hardware.
+
+Sizes take k/m suffixes. 10m features needs tens of GB of memory; the
+default sizes stop at 100k.
+
+Usage:
+    python3 scripts/benchmark.py
+    python3 scripts/benchmark.py --sizes 1k,10k,100k,1m --stages osm_to_geojson,audit
+    python3 scripts/benchmark.py --save-baseline
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import geoio
+from audit_campsite_data import audit_file
+from clean_low_quality import is_low_quality
+from clean_placeholders import is_placeholder
+from fetch_osm_data import STATE_BOUNDS, osm_to_geojson
+from fetch_recreation_gov_data import RIDBFetcher
+from update_poi_data import water_features
+
+BASELINE_PATH = Path('data/benchmark_baseline.json')
+DEFAULT_SIZES = '1k,10k,100k'
+DEFAULT_REPEAT = 3
+DEFAULT_SEED = 42
+DEFAULT_STATE = 'CO'
+REGRESSION_RATIO = 0.25  # Fail when a stage's throughput drops by more than 25%
+MIN_COMPARE_SECONDS = 0.05  # Faster runs are mostly timer noise and never fail the run
+
+WORDS = ['Aspen', 'Bear', 'Cedar', 'Creek', 'Eagle', 'Elk', 'Falls', 'Forest', 'Lake', 'Lost',
+         'Meadow', 'Mesa', 'Pine', 'Ridge', 'River', 'Rock', 'Spring', 'Valley', 'Willow', 'Wolf']
+KINDS = ['Campground', 'Camp', 'Recreation Area', 'RV Park', 'Group Site', 'Trailhead Camp']
+# Names the cleaners should drop, mixed in at a low rate
+BAD_NAMES = ['Unnamed Site', 'Campsite', 'Test Site 3', 'Sample Meadow', 'Staff Row', '']
+AMENITIES = ['toilets', 'water', 'showers', 'fire_rings', 'picnic_tables', 'trash']
+DESCRIPTION_WORDS = ['tent', 'RV', 'trailer', 'toilet', 'potable water', 'shower', 'fire ring',
+                     'picnic table', 'trash', 'gravel road', 'dirt road', 'paved', 'shade',
+                     'views', 'hiking', 'fishing', 'quiet', 'reservations', 'first come']
+FEE_DESCRIPTIONS = ['', 'Free', '$12 per night', '$25/night, $5 per extra vehicle', 'Fees vary by season']
+FACILITY_TYPES = ['Campground', 'Facility', 'Dispersed Camping', 'Primitive Site', 'Backcountry Site']
+
+
+def parse_size(text):
+    """'1k' -> 1000, '10m' -> 10000000"""
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def format_size(n):
+    for suffix, scale in (('m', 1_000_000), ('k', 1_000)):
+        if n >= scale and n % scale == 0:
+            return f'{n // scale}{suffix}'
+    return str(n)
+
+
+def state_box(state):
+    south, west, north, east = map(float, STATE_BOUNDS[state].split(','))
+    return west, south, east, north
+
+
+def site_name(rng):
+    if rng.random() < 0.03:
+        return rng.choice(BAD_NAMES)
+    return f'{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(KINDS)}'
+
+
+def description(rng, words=12):
+    return ' '.join(rng.choice(DESCRIPTION_WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def generate_osm_elements(n, seed=DEFAULT_SEED, state=DEFAULT_STATE):
+    """Overpass ``elements``: ~75% nodes, ~20% ways with a center, ~5% relations without one."""
+    rng = random.Random(seed)
+    west, south, east, north = state_box(state)
+    elements = []
+    for i in range(n):
+        lon, lat = round(rng.uniform(west, east), 7), round(rng.uniform(south, north), 7)
+        tags = {'tourism': rng.choice(['camp_site', 'camp_site', 'caravan_site']), 'name': site_name(rng)}
+        if rng.random() < 0.5:
+            tags['fee'] = rng.choice(['yes', 'no'])
+        if rng.random() < 0.3:
+            tags['drinking_water'] = 'yes'
+        if rng.random() < 0.2:
+            tags['website'] = f'https://example.org/camp/{i}'
+        roll = rng.random()
+        if roll < 0.75:
+            element = {'type': 'node', 'id': 1_000_000 + i, 'lat': lat, 'lon': lon, 'tags': tags}
+        elif roll < 0.95:
+            element = {'type': 'way', 'id': 1_000_000 + i, 'center': {'lat': lat, 'lon': lon}, 'tags': tags}
+        else:
+            element = {'type': 'relation', 'id': 1_000_000 + i, 'tags': tags}
+        elements.append(element)
+    return elements
+
+
+def generate_ridb_facilities(n, seed=DEFAULT_SEED, state=DEFAULT_STATE):
+    """RIDB RECDATA records, in shuffled FacilityID order; ~2% have no coordinates."""
+    rng = random.Random(seed)
+    west, south, east, north = state_box(state)
+    facilities = []
+    for i in range(n):
+        located = rng.random() >= 0.02
+        facilities.append({
+            'FacilityID': str(200_000 + i),
+            'FacilityName': site_name(rng).upper(),
+            'FacilityLatitude': round(rng.uniform(south, north), 6) if located else 0,
+            'FacilityLongitude': round(rng.uniform(west, east), 6) if located else 0,
+            'FacilityTypeDescription': rng.choice(FACILITY_TYPES),
+            'FacilityUseFeeDescription': rng.choice(FEE_DESCRIPTIONS),
+            'FacilityDescription': f'<p>{description(rng, 30)}</p>',
+        })
+    rng.shuffle(facilities)
+    return facilities
+
+
+def generate_feature_collection(n, seed=DEFAULT_SEED, state=DEFAULT_STATE):
+    """A campsite FeatureCollection shaped like the merged state files."""
+    rng = random.Random(seed)
+    west, south, east, north = state_box(state)
+    features = []
+    for i in range(n):
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point',
+                         'coordinates': [round(rng.uniform(west, east), 6), round(rng.uniform(south, north), 6)]},
+            'properties': {
+                'id': f'{state}-{i + 1:03d}',
+                'name': site_name(rng),
+                'type': rng.choice(['established', 'established', 'dispersed', 'backcountry', 'unknown']),
+                'cost': rng.choice([0, 0, 12, 15, 25]),
+                'amenities': rng.sample(AMENITIES, rng.randint(0, 4)),
+                'rig_friendly': rng.sample(['tent', 'RV', 'trailer'], rng.randint(0, 3)),
+                'road_difficulty': rng.choice(['paved', 'gravel', 'dirt']),
+                'state': state,
+                'source': rng.choice(['recreation.gov', 'openstreetmap']),
+                'description': description(rng),
+            }
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def _osm_stage(n, seed, workdir):
+    osm_data = {'elements': generate_osm_elements(n, seed)}
+    return lambda: len(osm_to_geojson(osm_data)['features'])
+
+
+def _ridb_stage(n, seed, workdir):
+    facilities = generate_ridb_facilities(n, seed)
+    fetcher = RIDBFetcher('benchmark')
+    return lambda: len(fetcher.convert_to_geojson(facilities, DEFAULT_STATE)['features'])
+
+
+def _low_quality_stage(n, seed, workdir):
+    features = generate_feature_collection(n, seed)['features']
+    return lambda: sum(map(is_low_quality, features))
+
+
+def _placeholder_stage(n, seed, workdir):
+    features = generate_feature_collection(n, seed)['features']
+    return lambda: sum(map(is_placeholder, features))
+
+
+def _water_stage(n, seed, workdir):
+    doc = generate_feature_collection(n, seed)
+    return lambda: len(water_features(doc, DEFAULT_STATE))
+
+
+def _audit_stage(n, seed, workdir):
+    path = Path(workdir) / f'{DEFAULT_STATE}_{n}.geojson'
+    geoio.write(path, generate_feature_collection(n, seed))
+    return lambda: audit_file(path, DEFAULT_STATE)['count']
+
+
+# name: setup(n, seed, workdir) -> run() returning a count, so the result stays in use
+STAGES = {
+    'osm_to_geojson': _osm_stage,
+    'ridb_convert': _ridb_stage,
+    'low_quality': _low_quality_stage,
+    'placeholder': _placeholder_stage,
+    'water': _water_stage,
+    'audit': _audit_stage,
+}
+
+
+def measure(run, repeat=DEFAULT_REPEAT, memory=True):
+    """(best seconds, peak traced bytes or None) of ``run``."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(stages, sizes, seed=DEFAULT_SEED, repeat=DEFAULT_REPEAT, memory=True):
+    """[{stage, size, seconds, per_second, peak_bytes}] for every stage and size."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix='kamptrail-bench-') as workdir:
+        for name in stages:
+            for n in sizes:
+                run = STAGES[name](n, seed, workdir)
+                seconds, peak = measure(run, repeat, memory)
+                results.append({
+                    'stage': name,
+                    'size': n,
+                    'seconds': round(seconds, 6),
+                    'per_second': round(n / seconds) if seconds else None,
+                    'peak_bytes': peak,
+                })
+                del run
+                print_result(results[-1])
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    """{(stage, size): result} from the baseline file, or {}."""
+    try:
+        data = geoio.read(path)
+    except (OSError, ValueError):
+        return {}
+    return {(r['stage'], r['size']): r for r in data.get('results', [])}
+
+
+def save_baseline(results, seed, path=BASELINE_PATH):
+    """Merge ``results`` into the baseline file (other stages/sizes are kept)."""
+    merged = load_baseline(path)
+    merged.update({(r['stage'], r['size']): r for r in results})
+    geoio.write(path, {
+        'generated': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'seed': seed,
+        'python': sys.version.split()[0],
+        'results': [merged[key] for key in sorted(merged)],
+    }, pretty=True)
+
+
+def compare(results, baseline, ratio=REGRESSION_RATIO):
+    """[(result, baseline result, change)] and the regressions among them."""
+    rows, regressions = [], []
+    for result in results:
+        before = baseline.get((result['stage'], result['size']))
+        if not before or not before.get('per_second') or not result['per_second']:
+            continue
+        change = result['per_second'] / before['per_second'] - 1
+        rows.append((result, before, change))
+        if change < -ratio and result['seconds'] >= MIN_COMPARE_SECONDS:
+            regressions.append((result, before, change))
+    return rows, regressions
+
+
+def print_result(result):
+    peak = f"{result['peak_bytes'] / 1024 / 1024:9.1f} MB" if result['peak_bytes'] is not None else '        -'
+    print(f"  {result['stage']:16s} {format_size(result['size']):>6s} {result['seconds']:10.4f}s "
+          f"{result['per_second']:>12,}/s {peak}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the data pipeline hot paths on synthetic data.')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Comma-separated feature counts, k/m suffixes allowed (default: {DEFAULT_SIZES}).')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma-separated stages (default: all of {', '.join(STAGES)}).")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'Timed runs per stage and size; the best counts (default: {DEFAULT_REPEAT}).')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f'Seed for the generators (default: {DEFAULT_SEED}).')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc run that measures peak memory.')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH),
+                        help=f'Baseline file to compare with (default: {BASELINE_PATH}).')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Write these results into the baseline file instead of failing on regressions.')
+    parser.add_argument('--json', metavar='PATH', help='Also write the results as JSON to PATH.')
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+
+    print('=' * 70)
+    print(f"BENCHMARK ({', '.join(format_size(n) for n in sizes)} features, seed {args.seed}, "
+          f"best of {args.repeat})")
+    print('=' * 70)
+    print(f"  {'stage':16s} {'size':>6s} {'time':>11s} {'throughput':>14s} {'peak mem':>12s}")
+
+    results = run_benchmarks(stages, sizes, args.seed, args.repeat, not args.no_memory)
+
+    if args.json:
+        geoio.write(args.json, {'seed': args.seed, 'results': results}, pretty=True)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        save_baseline(results, args.seed, baseline_path)
+        print()
+        print(f"✅ Saved {len(results)} results to {baseline_path}")
+        return 0
+
+    rows, regressions = compare(results, load_baseline(baseline_path))
+    print()
+    if not rows:
+        print(f"  No baseline for these stages and sizes in {baseline_path} (run with --save-baseline)")
+        return 0
+    print(f"vs. {baseline_path}:")
+    for result, before, change in rows:
+        flag = '❌' if (result, before, change) in regressions else '✓'
+        print(f"  {flag} {result['stage']:16s} {format_size(result['size']):>6s} "
+              f"{before['per_second']:>12,}/s → {result['per_second']:>12,}/s ({change * 100:+.0f}%)")
+    print()
+    if regressions:
+        print(f"❌ {len(regressions)} stage(s) more than {REGRESSION_RATIO * 100:.0f}% slower than the baseline")
+        return 1
+    print(f"✅ No stage more than {REGRESSION_RATIO * 100:.0f}% slower than the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Write content-hashed, precompressed copies of the data files the map fetches.
+
+Every file data-loader.js reads (index.json, the published state files and
+their .ktc exports, the tiles and the cluster pyramid) is copied under
+data/dist/ with a hash of its content in the name, next to gzip and (when
+the brotli module is installed) brotli versions for servers that serve
+precompressed files (nginx gzip_static/brotli_static and the like):
+
+    data/dist/manifest.json
+    data/dist/published/CA_merged.1a2b3c4d5e6f.geojson
+    data/dist/published/CA_merged.1a2b3c4d5e6f.geojson.gz
+    data/dist/published/CA_merged.1a2b3c4d5e6f.geojson.br
+
+The manifest maps each original path to its hash:
+
+    {"version": 1, "base": "data/dist/", "files": {"data/published/CA_merged.geojson": "1a2b3c4d5e6f", ...}}
+
+and the hashed URL is base + the path without "data/", with ".{hash}"
+before the extension. data-loader.js fetches through the manifest and
+service-worker.js caches hashed files forever, so unchanged data is never
+downloaded again and changed data is fetched once. Files of the previous
+build are kept for clients still holding the old manifest; older ones are
+removed.
+
+Usage:
+    python3 scripts/build_artifacts.py
+"""
+
+import argparse
+import gzip
+import hashlib
+import time
+from pathlib import Path
+
+import geoio
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+DATA_DIR = Path('data')
+DIST_DIR = DATA_DIR / 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+MIN_COMPRESS_BYTES = 1024  # Smaller files gain little and servers skip them anyway
+
+
+def artifact_files():
+    """Every data file data-loader.js may fetch, sorted."""
+    published = DATA_DIR / 'published'
+    paths = [DATA_DIR / 'campsites' / 'index.json']
+    paths += sorted(published.glob('*_merged.geojson')) + sorted(published.glob('*_merged.ktc'))
+    for name in ('tiles', 'clusters'):
+        paths += sorted(p for p in (DATA_DIR / name).rglob('*') if p.is_file())
+    return [p for p in paths if p.is_file()]
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_path(path, digest, dist_dir=DIST_DIR):
+    """data/published/CA_merged.geojson -> data/dist/published/CA_merged.{digest}.geojson"""
+    relative = path.relative_to(DATA_DIR)
+    return dist_dir / relative.parent / f'{relative.stem}.{digest}{relative.suffix}'
+
+
+def compressed_versions(data):
+    """{suffix: bytes} of the precompressed copies worth writing for ``data``."""
+    if len(data) < MIN_COMPRESS_BYTES:
+        return {}
+    versions = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        versions['.br'] = brotli.compress(data, quality=11)
+    return versions
+
+
+def write_artifact(path, dist_dir=DIST_DIR):
+    """Write the hashed copy of ``path`` and its compressed versions.
+
+    Returns (digest, written paths, {'raw'|'.gz'|'.br': bytes}). Hashed files
+    that already exist have the same content, so they are not rewritten.
+    """
+    data = path.read_bytes()
+    digest = content_hash(data)
+    target = hashed_path(path, digest, dist_dir)
+    sizes = {'raw': len(data)}
+    written = []
+    if not target.exists():
+        with geoio.atomic_open(target) as f:
+            f.write(data)
+        written.append(target)
+    for suffix, compressed in compressed_versions(data).items():
+        sizes[suffix] = len(compressed)
+        variant = target.with_name(target.name + suffix)
+        if not variant.exists():
+            with geoio.atomic_open(variant) as f:
+                f.write(compressed)
+            written.append(variant)
+    return digest, written, sizes
+
+
+def files_of(manifest, dist_dir=DIST_DIR):
+    """Every hashed path (with compressed versions) a manifest may reference."""
+    paths = set()
+    for name, digest in manifest.get('files', {}).items():
+        target = hashed_path(Path(name), digest, dist_dir)
+        paths.update({target, target.with_name(target.name + '.gz'), target.with_name(target.name + '.br')})
+    return paths
+
+
+def prune(keep, dist_dir=DIST_DIR):
+    """Delete hashed files not in ``keep``; returns how many were removed."""
+    removed = 0
+    for path in dist_dir.rglob('*'):
+        if path.is_file() and path.name != MANIFEST_NAME and path not in keep:
+            path.unlink()
+            removed += 1
+    for directory in sorted((p for p in dist_dir.rglob('*') if p.is_dir()), reverse=True):
+        if not any(directory.iterdir()):
+            directory.rmdir()
+    return removed
+
+
+def build_artifacts(dist_dir=DIST_DIR):
+    """Write the hashed files and manifest; returns (manifest, stats)."""
+    manifest_path = dist_dir / MANIFEST_NAME
+    try:
+        previous = geoio.read(manifest_path)
+    except (OSError, ValueError):
+        previous = {}
+
+    files = {}
+    stats = {'written': 0, 'raw': 0, '.gz': 0, '.br': 0}
+    for path in artifact_files():
+        digest, written, sizes = write_artifact(path, dist_dir)
+        files[path.as_posix()] = digest
+        stats['written'] += len(written)
+        for key, size in sizes.items():
+            stats[key] += size
+
+    manifest = {
+        'version': 1,
+        'generated': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'base': f'{dist_dir.as_posix()}/',
+        'files': files
+    }
+    geoio.write(manifest_path, geoio.stable_timestamp(previous, manifest))
+    stats['removed'] = prune(files_of(manifest, dist_dir) | files_of(previous, dist_dir), dist_dir)
+    return manifest, stats
+
+
+def main():
+    argparse.ArgumentParser(description='Write content-hashed, precompressed copies of the map data.').parse_args()
+
+    print('=' * 70)
+    print(f"BUILDING HASHED ARTIFACTS (gzip{', brotli' if brotli is not None else ''})")
+    print('=' * 70)
+    if brotli is None:
+        print('  ⚠️  brotli module not installed, writing gzip only (pip install brotli)')
+
+    manifest, stats = build_artifacts()
+
+    print(f"  ✓ {len(manifest['files']):,} files: {stats['raw'] / 1024:,.1f} KB raw")
+    print(f"  ✓ gzip: {stats['.gz'] / 1024:,.1f} KB")
+    if brotli is not None:
+        print(f"  ✓ brotli: {stats['.br'] / 1024:,.1f} KB")
+    print(f"  ✓ {stats['written']:,} new files written, {stats['removed']:,} stale files removed")
+    print()
+    print(f"✅ Wrote {DIST_DIR / MANIFEST_NAME}")
+    print(f"💾 {geoio.write_summary()}")
+
+
+if __name__ == '__main__':
+    main()
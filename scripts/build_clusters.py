@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Precompute a supercluster-style cluster pyramid for the published campsite data.
+
+For every zoom level from --max-zoom down to 0, points (or the clusters of
+the level above) closer than RADIUS_PX screen pixels are folded into one
+cluster at their weighted centre, using a grid index sized to the cluster
+radius. Each level is written as one GeoJSON file:
+
+    data/clusters/manifest.json
+    data/clusters/{z}.geojson
+
+Cluster features carry point_count, free_count, per-source counts, the zoom
+at which they split (expansion_zoom) and a representative site (the member
+nearest the cluster centre). Unclustered sites are written as plain points
+with the properties the map popup needs. The map draws these levels
+directly at low zooms instead of clustering every site in the browser.
+
+Usage:
+    python3 scripts/build_clusters.py
+    python3 scripts/build_clusters.py --max-zoom 9 --radius 60
+"""
+
+import argparse
+import math
+from pathlib import Path
+
+import geoio
+from build_tiles import LAYER_SOURCES, feature_point, load_layer_features
+
+CLUSTERS_DIR = Path('data/clusters')
+DEFAULT_MAX_ZOOM = 7   # From zoom 8 the map loads viewport tiles and clusters the few sites in view itself
+RADIUS_PX = 50         # Same as the client's markercluster maxClusterRadius
+TILE_EXTENT = 256      # Leaflet tile size in pixels
+
+# Properties kept on unclustered sites (what the marker and popup use)
+POINT_PROPERTIES = ['id', 'name', 'type', 'cost', 'rating', 'reviews_count',
+                    'amenities', 'rig_friendly', 'road_difficulty', 'sources']
+
+
+def project(lon, lat):
+    """Lon/lat -> Web Mercator x/y in [0, 1]."""
+    sin = math.sin(math.radians(max(-85.0511287798, min(85.0511287798, lat))))
+    y = 0.5 - 0.25 * math.log((1 + sin) / (1 - sin)) / math.pi
+    return lon / 360.0 + 0.5, min(max(y, 0.0), 1.0)
+
+
+def unproject(x, y):
+    lon = (x - 0.5) * 360.0
+    lat = math.degrees(2 * math.atan(math.exp((1 - 2 * y) * math.pi)) - math.pi / 2)
+    return lon, lat
+
+
+def is_free(props):
+    cost = props.get('cost')
+    return cost is None or cost == 0
+
+
+class Node:
+    """A site or cluster at one level of the pyramid."""
+
+    __slots__ = ('x', 'y', 'count', 'free', 'sources', 'rep', 'children', 'zoom', 'cluster_id', 'created')
+
+    def __init__(self, x, y, count, free, sources, rep, children=None):
+        self.x = x
+        self.y = y
+        self.count = count
+        self.free = free
+        self.sources = sources
+        self.rep = rep            # (x, y, feature) of the representative site
+        self.children = children  # None for single sites
+        self.zoom = math.inf      # Last zoom this node was processed at
+        self.cluster_id = None
+        self.created = None       # Zoom the cluster was formed at; it splits one zoom above
+
+
+def leaf(feature):
+    lon, lat = feature_point(feature)
+    x, y = project(lon, lat)
+    props = feature.get('properties') or {}
+    sources = {}
+    for source in props.get('sources') or [props.get('source') or 'unknown']:
+        sources[source] = sources.get(source, 0) + 1
+    return Node(x, y, 1, int(is_free(props)), sources, (x, y, feature))
+
+
+def merge(nodes):
+    """Fold nodes into one cluster at their weighted centre."""
+    count = sum(n.count for n in nodes)
+    x = sum(n.x * n.count for n in nodes) / count
+    y = sum(n.y * n.count for n in nodes) / count
+    sources = {}
+    for n in nodes:
+        for source, c in n.sources.items():
+            sources[source] = sources.get(source, 0) + c
+    rep = min((n.rep for n in nodes), key=lambda r: (r[0] - x) ** 2 + (r[1] - y) ** 2)
+    return Node(x, y, count, sum(n.free for n in nodes), sources, rep, nodes)
+
+
+class GridIndex:
+    """Nodes bucketed into cells of the search radius."""
+
+    def __init__(self, nodes, radius):
+        self.radius = radius
+        self.cells = {}
+        for node in nodes:
+            self.cells.setdefault(self._cell(node.x, node.y), []).append(node)
+
+    def _cell(self, x, y):
+        return int(x // self.radius), int(y // self.radius)
+
+    def within(self, x, y):
+        cx, cy = self._cell(x, y)
+        r2 = self.radius * self.radius
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for node in self.cells.get((cx + dx, cy + dy), ()):
+                    if (node.x - x) ** 2 + (node.y - y) ** 2 <= r2:
+                        yield node
+
+
+def cluster_level(nodes, zoom, radius_px=RADIUS_PX):
+    """One pyramid step: cluster the nodes of zoom + 1 for display at ``zoom``."""
+    radius = radius_px / (TILE_EXTENT * 2 ** zoom)
+    index = GridIndex(nodes, radius)
+    level = []
+    for node in nodes:
+        if node.zoom <= zoom:
+            continue
+        node.zoom = zoom
+        neighbours = [n for n in index.within(node.x, node.y) if n.zoom > zoom]
+        for n in neighbours:
+            n.zoom = zoom
+        level.append(merge([node] + neighbours) if neighbours else node)
+    return level
+
+
+def build_pyramid(features, max_zoom=DEFAULT_MAX_ZOOM, radius_px=RADIUS_PX):
+    """Return {zoom: [nodes]} for zooms 0..max_zoom."""
+    nodes = [leaf(f) for f in features if feature_point(f) is not None]
+    # Deterministic: process west-to-east, north-to-south
+    nodes.sort(key=lambda n: (n.x, n.y))
+
+    levels = {}
+    next_id = 0
+    for zoom in range(max_zoom, -1, -1):
+        nodes = cluster_level(nodes, zoom, radius_px)
+        for node in nodes:
+            if node.children is not None and node.cluster_id is None:
+                node.cluster_id = next_id
+                node.created = zoom
+                next_id += 1
+        levels[zoom] = nodes
+    return levels
+
+
+def to_feature(node):
+    if node.children is None:
+        feature = node.rep[2]
+        props = feature.get('properties') or {}
+        return {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': list(feature_point(feature))},
+            'properties': {k: props[k] for k in POINT_PROPERTIES if k in props}
+        }
+
+    lon, lat = unproject(node.x, node.y)
+    rep_props = node.rep[2].get('properties') or {}
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [round(lon, 6), round(lat, 6)]},
+        'properties': {
+            'cluster': True,
+            'cluster_id': node.cluster_id,
+            'point_count': node.count,
+            'free_count': node.free,
+            'sources': dict(sorted(node.sources.items())),
+            'expansion_zoom': node.created + 1,
+            'representative': {
+                'id': rep_props.get('id'),
+                'name': rep_props.get('name'),
+                'coordinates': list(feature_point(node.rep[2]))
+            }
+        }
+    }
+
+
+def write_pyramid(levels, out_dir=CLUSTERS_DIR, max_zoom=DEFAULT_MAX_ZOOM, radius_px=RADIUS_PX):
+    manifest = {
+        'min_zoom': 0,
+        'max_zoom': max_zoom,
+        'radius': radius_px,
+        'extent': TILE_EXTENT,
+        'url': '{z}.geojson',
+        'total': sum(n.count for n in levels[0]),
+        'levels': {}
+    }
+    written = set()
+    for zoom in sorted(levels):
+        path = out_dir / f'{zoom}.geojson'
+        features = [to_feature(node) for node in levels[zoom]]
+        geoio.write_features(path, features)
+        written.add(path)
+        manifest['levels'][str(zoom)] = {
+            'features': len(features),
+            'clusters': sum(1 for node in levels[zoom] if node.children is not None)
+        }
+
+    # Drop levels from a previous build with a higher max zoom
+    for path in out_dir.glob('*.geojson'):
+        if path not in written:
+            path.unlink()
+
+    geoio.write(out_dir / 'manifest.json', manifest)
+    return manifest
+
+
+def build_clusters(out_dir=CLUSTERS_DIR, max_zoom=DEFAULT_MAX_ZOOM, radius_px=RADIUS_PX, load=geoio.read):
+    """Cluster the published campsite files and write the pyramid; returns the manifest."""
+    features = load_layer_features(LAYER_SOURCES['campsites'](), load)
+    levels = build_pyramid(features, max_zoom, radius_px)
+    manifest = write_pyramid(levels, out_dir, max_zoom, radius_px)
+    print(f"  ✓ clusters: {manifest['total']:,} sites in {len(manifest['levels'])} zoom levels")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute cluster levels for the published campsite data.')
+    parser.add_argument('--max-zoom', type=int, default=DEFAULT_MAX_ZOOM,
+                        help=f'Highest zoom with precomputed clusters (default: {DEFAULT_MAX_ZOOM}).')
+    parser.add_argument('--radius', type=int, default=RADIUS_PX,
+                        help=f'Cluster radius in screen pixels (default: {RADIUS_PX}).')
+    parser.add_argument('--out-dir', default=str(CLUSTERS_DIR),
+                        help=f'Output directory (default: {CLUSTERS_DIR}).')
+    args = parser.parse_args()
+
+    print('=' * 70)
+    print(f'BUILDING CLUSTER PYRAMID (zoom 0-{args.max_zoom}, {args.radius}px radius)')
+    print('=' * 70)
+
+    features = load_layer_features(LAYER_SOURCES['campsites']())
+    levels = build_pyramid(features, args.max_zoom, args.radius)
+    manifest = write_pyramid(levels, Path(args.out_dir), args.max_zoom, args.radius)
+
+    for zoom, level in manifest['levels'].items():
+        print(f"  z{zoom:<2s} {level['features']:6,} markers ({level['clusters']:,} clusters)")
+
+    print()
+    print(f"✅ Clustered {manifest['total']:,} sites into {args.max_zoom + 1} levels in {args.out_dir}")
+    print(f"💾 {geoio.write_summary()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Add a per-state spatial index to data/campsites/index.json.
+
+Each data/published/{ST}_merged.geojson written by publish.py is rewritten
+with its features ordered by geohash, so every geohash cell is one
+contiguous run of bytes in the file. index.json then gets a "spatial"
+member with, for every state, the true bbox of its data and the byte range
+of each cell:
+
+    "spatial": {
+      "precision": 3,
+      "states": {
+        "CA": {"file": "CA_merged.geojson", "bytes": 812345, "count": 1234,
+               "bbox": [west, south, east, north],
+               "cells": [["9m", offset, length, count], ...]},
+        ...
+      }
+    }
+
+Cells are listed in file order. A cell's bytes are its features separated
+by commas, so the client can fetch one or more neighbouring cells with a
+single Range request and parse "[" + body + "]". Features without usable
+coordinates go after the last cell and are only read with the whole file.
+
+Run this after anything that rewrites the published files (publish.py);
+the client checks "bytes" against the Content-Range total and falls back to
+the whole file when they differ.
+
+Usage:
+    python3 scripts/build_spatial_index.py
+    python3 scripts/build_spatial_index.py --precision 4
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import geoio
+import publish
+
+CAMPSITES_DIR = Path('data/campsites')
+INDEX_PATH = CAMPSITES_DIR / 'index.json'
+DEFAULT_PRECISION = 3  # ~156 x 156 km cells: a few dozen per state
+
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash(lon, lat, precision):
+    west, east, south, north = -180.0, 180.0, -90.0, 90.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (west + east) / 2
+            value = value * 2 + (lon >= mid)
+            if lon >= mid:
+                west = mid
+            else:
+                east = mid
+        else:
+            mid = (south + north) / 2
+            value = value * 2 + (lat >= mid)
+            if lat >= mid:
+                south = mid
+            else:
+                north = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def feature_point(feature):
+    coords = (feature.get('geometry') or {}).get('coordinates')
+    if not isinstance(coords, list) or len(coords) < 2:
+        return None
+    lon, lat = coords[0], coords[1]
+    if isinstance(lon, bool) or isinstance(lat, bool) or not isinstance(lon, (int, float)) \
+            or not isinstance(lat, (int, float)):
+        return None
+    if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        return None
+    return lon, lat
+
+
+def encode(doc, precision=DEFAULT_PRECISION):
+    """Geohash-ordered FeatureCollection bytes plus the state's index entry.
+
+    ``doc['features']`` is reordered in place to match. The layout is the
+    same as geoio.write_features: other top-level members first, then the
+    features array.
+    """
+    keyed = []
+    for i, feature in enumerate(doc.get('features', [])):
+        point = feature_point(feature)
+        cell = geohash(point[0], point[1], precision) if point else None
+        # Unlocated features sort last, everything else by cell; ties keep file order
+        keyed.append((cell is None, cell or '', i, feature, point))
+    keyed.sort(key=lambda k: k[:3])
+    doc['features'] = [k[3] for k in keyed]
+
+    head = b'{"type":"FeatureCollection",'
+    for name, value in doc.items():
+        if name not in ('type', 'features'):
+            head += geoio.dumps(name) + b':' + geoio.dumps(value) + b','
+    head += b'"features":['
+
+    parts = [head]
+    size = len(head)
+    cells = []
+    points = []
+    for n, (_, cell, _, feature, point) in enumerate(keyed):
+        if n:
+            parts.append(b',')
+            size += 1
+        data = geoio.dumps(feature)
+        if cell:
+            points.append(point)
+            if cells and cells[-1][0] == cell:
+                cells[-1][2] = size + len(data) - cells[-1][1]
+                cells[-1][3] += 1
+            else:
+                cells.append([cell, size, len(data), 1])
+        parts.append(data)
+        size += len(data)
+    parts.append(b']}')
+    payload = b''.join(parts)
+
+    bbox = None
+    if points:
+        bbox = [min(p[0] for p in points), min(p[1] for p in points),
+                max(p[0] for p in points), max(p[1] for p in points)]
+    entry = {'bytes': len(payload), 'count': len(keyed), 'bbox': bbox, 'cells': cells}
+    return payload, entry
+
+
+def state_of(path):
+    return path.name[:-len('_merged.geojson')]
+
+
+def build_index(precision=DEFAULT_PRECISION, load=geoio.read, paths=None):
+    """Reorder the published files and return the "spatial" index member."""
+    paths = publish.published_files() if paths is None else paths
+    states = {}
+    for path in paths:
+        try:
+            doc = load(path)
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  Skipping {path}: {e}")
+            continue
+        payload, entry = encode(doc, precision)
+        with geoio.atomic_open(path) as f:
+            f.write(payload)
+        states[state_of(path)] = {'file': path.name, **entry}
+    return {
+        'generated': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'precision': precision,
+        'states': states
+    }
+
+
+def write_index(spatial, index_path=INDEX_PATH):
+    """Store ``spatial`` in index.json, keeping the rest of the index as is."""
+    try:
+        index = geoio.read(index_path)
+    except (OSError, ValueError):
+        index = {'states': []}
+    index['spatial'] = geoio.stable_timestamp(index.get('spatial'), spatial)
+    geoio.write(index_path, index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Order published files by geohash and index their byte ranges.')
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                        help=f'Geohash length of the index cells (default: {DEFAULT_PRECISION}).')
+    args = parser.parse_args()
+
+    print('=' * 70)
+    print(f'BUILDING SPATIAL INDEX (geohash precision {args.precision})')
+    print('=' * 70)
+
+    spatial = build_index(args.precision)
+    write_index(spatial)
+
+    for code, entry in spatial['states'].items():
+        print(f"  ✓ {code}: {entry['count']:,} sites in {len(entry['cells'])} cells")
+
+    total_cells = sum(len(entry['cells']) for entry in spatial['states'].values())
+    print()
+    print(f"✅ Indexed {len(spatial['states'])} states ({total_cells} cells) in {INDEX_PATH}")
+    print(f"💾 {geoio.write_summary()}")
+
+
+if __name__ == '__main__':
+    main()
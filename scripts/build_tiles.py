@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Slice the published campsite data into z/x/y map tiles.
+
+The web map fetches only the tiles covering the viewport instead of whole
+state files, so first paint no longer depends on how big a state is.
+Tiles use the standard slippy-map (Web Mercator) scheme at a single zoom:
+
+    data/tiles/manifest.json
+    data/tiles/campsites/{z}/{x}/{y}.ktc
+
+By default the tiles are KTC1 columnar binary (see columnar.py); with
+--format geojson they are GeoJSON, named {y}.geojson. The manifest's
+"format" tells the client which.
+
+The manifest lists every non-empty tile with its feature count, so the
+client never requests tiles that don't exist. Sites that appear in more
+than one state's published file are written once (first state wins), and
+tiles left over from a previous build are removed.
+
+Usage:
+    python3 scripts/build_tiles.py
+    python3 scripts/build_tiles.py --zoom 7
+    python3 scripts/build_tiles.py --format geojson
+"""
+
+import argparse
+import math
+import os
+import shutil
+from pathlib import Path
+
+import columnar
+import geoio
+import publish
+
+TILES_DIR = Path('data/tiles')
+DEFAULT_ZOOM = 8  # ~150 km tiles: a few hundred sites each in dense areas
+DEFAULT_FORMAT = 'ktc'  # What the workflow and pipeline.py publish
+MAX_LAT = 85.0511287798  # Web Mercator limit
+
+FORMATS = {
+    'geojson': ('.geojson', geoio.write_features),
+    'ktc': ('.ktc', columnar.write),
+}
+
+LAYER_SOURCES = {
+    'campsites': publish.published_files,
+}
+
+
+def lonlat_to_tile(lon, lat, zoom):
+    """Slippy-map tile (x, y) containing a point."""
+    n = 2 ** zoom
+    lat = max(-MAX_LAT, min(MAX_LAT, lat))
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(zoom, x, y):
+    """[west, south, east, north] of a tile in degrees."""
+    n = 2 ** zoom
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return [x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)]
+
+
+def feature_point(feature):
+    coords = (feature.get('geometry') or {}).get('coordinates')
+    if not isinstance(coords, list) or len(coords) < 2:
+        return None
+    if not isinstance(coords[0], (int, float)) or not isinstance(coords[1], (int, float)):
+        return None
+    return coords[0], coords[1]
+
+
+def load_layer_features(paths, load=geoio.read):
+    """Features from ``paths`` in order, dropping repeated ids."""
+    features = []
+    seen_ids = set()
+    for path in paths:
+        try:
+            data = load(path)
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  Skipping {path}: {e}")
+            continue
+        for feature in data.get('features', []):
+            site_id = (feature.get('properties') or {}).get('id')
+            if site_id:
+                if site_id in seen_ids:
+                    continue
+                seen_ids.add(site_id)
+            features.append(feature)
+    return features
+
+
+def slice_features(features, zoom):
+    """Group point features by tile; returns ({(x, y): [features]}, skipped count)."""
+    tiles = {}
+    skipped = 0
+    for feature in features:
+        point = feature_point(feature)
+        if point is None:
+            skipped += 1
+            continue
+        tiles.setdefault(lonlat_to_tile(point[0], point[1], zoom), []).append(feature)
+    return tiles, skipped
+
+
+def write_layer(name, features, out_dir, zoom, fmt=DEFAULT_FORMAT):
+    """Write one layer's tiles, remove stale ones, and return its manifest entry."""
+    suffix, write_tile = FORMATS[fmt]
+    tiles, skipped = slice_features(features, zoom)
+    layer_dir = out_dir / name
+
+    written = set()
+    counts = {}
+    for (x, y), tile_features in sorted(tiles.items()):
+        path = layer_dir / str(zoom) / str(x) / f'{y}{suffix}'
+        write_tile(path, tile_features)
+        written.add(path)
+        counts[f'{zoom}/{x}/{y}'] = len(tile_features)
+
+    # Drop tiles from earlier builds (other zooms, or areas that are now empty)
+    for root, _, files in os.walk(layer_dir, topdown=False):
+        for filename in files:
+            path = Path(root) / filename
+            if path.suffix in ('.geojson', '.ktc') and path not in written:
+                path.unlink()
+        if not os.listdir(root):
+            os.rmdir(root)
+
+    points = [feature_point(f) for f in features]
+    points = [p for p in points if p is not None]
+    bounds = None
+    if points:
+        bounds = [min(p[0] for p in points), min(p[1] for p in points),
+                  max(p[0] for p in points), max(p[1] for p in points)]
+
+    return {
+        'url': f'{name}/{{z}}/{{x}}/{{y}}{suffix}',
+        'features': sum(counts.values()),
+        'skipped': skipped,
+        'bounds': bounds,
+        'tiles': counts
+    }
+
+
+def build_tiles(out_dir=TILES_DIR, zoom=DEFAULT_ZOOM, layers=None, load=geoio.read, fmt=DEFAULT_FORMAT):
+    """Build every layer's tiles plus manifest.json; returns the manifest."""
+    layers = layers or LAYER_SOURCES
+    manifest = {'format': fmt, 'scheme': 'xyz', 'zoom': zoom, 'layers': {}}
+
+    for name, sources in layers.items():
+        paths = sources() if callable(sources) else sources
+        features = load_layer_features(paths, load)
+        entry = write_layer(name, features, out_dir, zoom, fmt)
+        manifest['layers'][name] = entry
+        print(f"  ✓ {name}: {entry['features']:,} features in {len(entry['tiles'])} tiles"
+              + (f" ({entry['skipped']} without coordinates skipped)" if entry['skipped'] else ''))
+
+    # Drop layers that are no longer built here (POIs are sharded by poi_shards.py now)
+    for child in out_dir.iterdir():
+        if child.is_dir() and child.name not in layers:
+            shutil.rmtree(child)
+
+    geoio.write(out_dir / 'manifest.json', manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Slice campsite GeoJSON into z/x/y tiles.')
+    parser.add_argument('--zoom', type=int, default=DEFAULT_ZOOM,
+                        help=f'Tile zoom level (default: {DEFAULT_ZOOM}).')
+    parser.add_argument('--format', choices=sorted(FORMATS), default=DEFAULT_FORMAT,
+                        help=f'Tile encoding: GeoJSON or KTC1 columnar binary (default: {DEFAULT_FORMAT}).')
+    parser.add_argument('--out-dir', default=str(TILES_DIR),
+                        help=f'Output directory (default: {TILES_DIR}).')
+    args = parser.parse_args()
+
+    print('=' * 70)
+    print(f'BUILDING MAP TILES (zoom {args.zoom})')
+    print('=' * 70)
+
+    manifest = build_tiles(Path(args.out_dir), args.zoom, fmt=args.format)
+
+    total_tiles = sum(len(layer['tiles']) for layer in manifest['layers'].values())
+    print()
+    print(f"✅ Wrote {total_tiles} tiles and {Path(args.out_dir) / 'manifest.json'}")
+    print(f"💾 {geoio.write_summary()}")
+
+
+if __name__ == '__main__':
+    main()
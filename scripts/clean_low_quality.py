@@ -8,9 +8,13 @@ Removes entries that are not useful to users:
 - Test/placeholder data
 """
 
-import json
-import glob
+import argparse
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import geoio
+import metrics
+from matchers import KeywordMatcher
 
 # Placeholder keywords (case-insensitive)
 PLACEHOLDER_KEYWORDS = [
@@ -19,8 +23,10 @@ PLACEHOLDER_KEYWORDS = [
     'placeholder', 'example', 'dummy', 'fake'
 ]
 
+KEYWORD_MATCHER = KeywordMatcher(PLACEHOLDER_KEYWORDS)
+
 # Generic/unhelpful names
-GENERIC_NAMES = [
+GENERIC_NAMES = {
     'unnamed site',
     'unnamed site (osm)',
     'unnamed campsite',
@@ -30,10 +36,10 @@ GENERIC_NAMES = [
     'site',
     'campsite',
     'camping'
-]
+}
 
 # Unhelpful types
-BAD_TYPES = ['unknown', 'undefined', None, '']
+BAD_TYPES = {'unknown', 'undefined', None, ''}
 
 def is_low_quality(feature):
     """Check if a feature is low-quality and should be removed."""
@@ -42,7 +48,7 @@ def is_low_quality(feature):
     site_type = str(props.get('type', '')).lower().strip()
 
     # Check for placeholder keywords
-    if any(keyword in name for keyword in PLACEHOLDER_KEYWORDS):
+    if KEYWORD_MATCHER.search(name):
         return True
 
     # Check for generic/unhelpful names
@@ -56,10 +62,15 @@ def is_low_quality(feature):
     return False
 
 def clean_file(filepath):
-    """Remove low-quality data from a GeoJSON file."""
+    """Remove low-quality data from a GeoJSON file.
+
+    Returns (result, writes): ``result`` is None when nothing was removed, and
+    ``writes`` is this call's geoio write tally, since --jobs runs it in worker
+    processes.
+    """
+    before = geoio.write_tally()
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = geoio.read(filepath)
 
         original_count = len(data.get('features', []))
 
@@ -70,18 +81,22 @@ def clean_file(filepath):
 
         if removed_count > 0:
             data['features'] = cleaned_features
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f)
+            geoio.write(filepath, data)
 
-            return (os.path.basename(filepath), removed_count, original_count)
+            return (os.path.basename(filepath), removed_count, original_count), geoio.tally_since(before)
 
-        return None
+        return None, geoio.tally_since(before)
 
     except Exception as e:
         print(f"Error processing {filepath}: {e}")
-        return None
+        return None, geoio.tally_since(before)
 
 def main():
+    parser = argparse.ArgumentParser(description='Remove low-quality campsite entries from all GeoJSON files.')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Clean files in this many worker processes (default: 1).')
+    args = parser.parse_args()
+
     print('=' * 70)
     print('REMOVING LOW-QUALITY CAMPSITE DATA')
     print('=' * 70)
@@ -95,9 +110,16 @@ def main():
     files_cleaned = []
     total_removed = 0
 
-    # Scan all geojson files recursively
-    for filepath in glob.glob('data/**/*.geojson', recursive=True):
-        result = clean_file(filepath)
+    # Scan all source geojson files recursively; sorted so the report is the same for any --jobs
+    filepaths = geoio.source_files()
+    with metrics.timer('clean', step='low_quality'):
+        if args.jobs > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                results = list(executor.map(clean_file, filepaths, chunksize=4))
+        else:
+            results = list(map(clean_file, filepaths))
+
+    for filepath, (result, _) in zip(filepaths, results):
         if result:
             filename, removed, original = result
             files_cleaned.append((filepath, removed, original))
@@ -109,6 +131,8 @@ def main():
     print('SUMMARY')
     print('=' * 70)
     print(f'Files cleaned: {len(files_cleaned)}')
+    writes = {key: sum(w[key] for _, w in results) for key in ('written', 'skipped')}
+    print(f'Files: {geoio.write_summary(writes)}')
     print(f'Total low-quality entries removed: {total_removed}')
 
     if files_cleaned:
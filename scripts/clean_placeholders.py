@@ -5,9 +5,13 @@ Clean placeholder/test data from OpenStreetMap files.
 Removes entries with suspicious names that appear to be test data.
 """
 
-import json
-import glob
+import argparse
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import geoio
+import metrics
+from matchers import CoordinateGrid, KeywordMatcher
 
 # Placeholder keywords to detect (case-insensitive)
 PLACEHOLDER_KEYWORDS = [
@@ -33,28 +37,35 @@ PLACEHOLDER_COORDS = [
     [-91.2815206, 44.057368],   # Staff Row (WI/MN)
 ]
 
+# Compiled once so per-feature cost doesn't grow with the blocklists
+KEYWORD_MATCHER = KeywordMatcher(PLACEHOLDER_KEYWORDS)
+COORD_GRID = CoordinateGrid(PLACEHOLDER_COORDS, tolerance=0.0001)
+
 def is_placeholder(feature):
     """Check if a feature is placeholder data."""
     name = str(feature.get('properties', {}).get('name', '')).lower()
     coords = feature.get('geometry', {}).get('coordinates', [])
 
     # Check by name (case-insensitive)
-    if any(keyword in name for keyword in PLACEHOLDER_KEYWORDS):
+    if KEYWORD_MATCHER.search(name):
         return True
 
     # Check by coordinates
-    if coords and len(coords) == 2:
-        for p_coords in PLACEHOLDER_COORDS:
-            if abs(coords[0] - p_coords[0]) < 0.0001 and abs(coords[1] - p_coords[1]) < 0.0001:
-                return True
+    if coords and len(coords) == 2 and COORD_GRID.contains(coords[0], coords[1]):
+        return True
 
     return False
 
 def clean_file(filepath):
-    """Remove placeholder data from a GeoJSON file."""
+    """Remove placeholder data from a GeoJSON file.
+
+    Returns (result, writes): ``result`` is None when nothing was removed, and
+    ``writes`` is this call's geoio write tally, since --jobs runs it in worker
+    processes.
+    """
+    before = geoio.write_tally()
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = geoio.read(filepath)
 
         original_count = len(data.get('features', []))
 
@@ -65,18 +76,22 @@ def clean_file(filepath):
 
         if removed_count > 0:
             data['features'] = cleaned_features
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f)
+            geoio.write(filepath, data)
 
-            return (os.path.basename(filepath), removed_count)
+            return (os.path.basename(filepath), removed_count), geoio.tally_since(before)
 
-        return None
+        return None, geoio.tally_since(before)
 
     except Exception as e:
         print(f"Error processing {filepath}: {e}")
-        return None
+        return None, geoio.tally_since(before)
 
 def main():
+    parser = argparse.ArgumentParser(description='Remove placeholder/test entries from all GeoJSON files.')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Clean files in this many worker processes (default: 1).')
+    args = parser.parse_args()
+
     print('=' * 70)
     print('CLEANING PLACEHOLDER DATA FROM ALL GEOJSON FILES')
     print('=' * 70)
@@ -85,9 +100,16 @@ def main():
     files_cleaned = []
     total_removed = 0
 
-    # Scan all geojson files recursively
-    for filepath in glob.glob('data/**/*.geojson', recursive=True):
-        result = clean_file(filepath)
+    # Scan all source geojson files recursively; sorted so the report is the same for any --jobs
+    filepaths = geoio.source_files()
+    with metrics.timer('clean', step='placeholders'):
+        if args.jobs > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                results = list(executor.map(clean_file, filepaths, chunksize=4))
+        else:
+            results = list(map(clean_file, filepaths))
+
+    for filepath, (result, _) in zip(filepaths, results):
         if result:
             filename, count = result
             files_cleaned.append((filepath, count))
@@ -99,6 +121,8 @@ def main():
     print('SUMMARY')
     print('=' * 70)
     print(f'Files cleaned: {len(files_cleaned)}')
+    writes = {key: sum(w[key] for _, w in results) for key in ('written', 'skipped')}
+    print(f'Files: {geoio.write_summary(writes)}')
     print(f'Total placeholder entries removed: {total_removed}')
 
     if files_cleaned:
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+KTC1: compact columnar binary format for campsite and POI points.
+
+GeoJSON repeats every property key per feature and spells coordinates out
+as decimal text. KTC1 stores one typed array per property instead, with a
+single deduplicated string table and enum codes for low-cardinality values,
+so browsers can map the columns straight onto TypedArrays.
+
+Layout (all integers little-endian, every section starts on a 4-byte boundary):
+
+    offset  size  contents
+    0       4     magic b'KTC1'
+    4       4     u32 header length H
+    8       H     UTF-8 JSON header, space-padded to a multiple of 4
+    8+H     ...   sections; header offsets count from here (the data area)
+
+Header:
+
+    {"version": 1, "count": N, "scale": 1000000,
+     "strings": {"offset": o, "count": K},
+     "columns": [{"name": ..., "kind": ..., "offset": o, "present": o|null,
+                  "values": [...]  (enum/enum_list only)}, ...]}
+
+String table: u32 offsets[K + 1] (into the blob), then the UTF-8 blob.
+
+Column kinds, N entries each:
+
+    coord      i32 degrees * scale ("lon" and "lat" columns; always present)
+    str        u32 index into the string table, 0xFFFFFFFF = null
+    enum       u16 index into "values", 0xFFFF = null
+    enum_list  u32 offsets[N + 1] into a u16 code array that follows
+               (padded to 4 bytes); a null list is stored as empty
+    f32        float32, NaN = null (readers round to 7 significant digits)
+    u32        uint32, 0xFFFFFFFF = null
+
+"present" is the offset of a bitmap (bit i of byte i // 8 = feature i has the
+property), or null when every feature has it. Properties outside COLUMNS are
+not exported, descriptions are optional and stored as plain text, and
+non-numeric values in numeric columns are written as null.
+"""
+
+import array
+import html
+import math
+import re
+import sys
+
+import geoio
+
+MAGIC = b'KTC1'
+VERSION = 1
+SCALE = 1_000_000  # ~0.1 m at the equator
+
+NULL_U32 = 0xFFFFFFFF
+NULL_U16 = 0xFFFF
+
+# (property, kind) for every exported property, in file order
+COLUMNS = [
+    ('id', 'str'),
+    ('name', 'str'),
+    ('type', 'enum'),
+    ('road_difficulty', 'enum'),
+    ('state', 'enum'),
+    ('source', 'enum'),
+    ('cost', 'f32'),
+    ('rating', 'f32'),
+    ('reviews_count', 'u32'),
+    ('amenities', 'enum_list'),
+    ('rig_friendly', 'enum_list'),
+    ('sources', 'enum_list'),
+]
+DESCRIPTION_COLUMN = ('description', 'str')
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def plain_text(value):
+    """HTML description -> collapsed plain text."""
+    return _SPACE_RE.sub(' ', html.unescape(_TAG_RE.sub(' ', str(value)))).strip()
+
+
+def _le_bytes(values):
+    if sys.byteorder != 'little':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode, data):
+    values = array.array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def _pad(data):
+    return data + b'\0' * (-len(data) % 4)
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+class _Sections:
+    """Collects 4-byte aligned sections, tracking each one's offset in the data area."""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def add(self, data):
+        offset = self.size
+        data = _pad(data)
+        self.parts.append(data)
+        self.size += len(data)
+        return offset
+
+
+def encode(features, descriptions=False):
+    """Encode point features as KTC1 bytes."""
+    features = [f for f in features if feature_point(f) is not None]
+    count = len(features)
+    columns = COLUMNS + ([DESCRIPTION_COLUMN] if descriptions else [])
+
+    strings = {}
+
+    def string_index(value):
+        if value is None:
+            return NULL_U32
+        return strings.setdefault(str(value), len(strings))
+
+    sections = _Sections()
+    header_columns = []
+
+    lons = array.array('i')
+    lats = array.array('i')
+    for feature in features:
+        lon, lat = feature_point(feature)
+        lons.append(round(lon * SCALE))
+        lats.append(round(lat * SCALE))
+    header_columns.append({'name': 'lon', 'kind': 'coord', 'offset': sections.add(_le_bytes(lons)), 'present': None})
+    header_columns.append({'name': 'lat', 'kind': 'coord', 'offset': sections.add(_le_bytes(lats)), 'present': None})
+
+    for name, kind in columns:
+        props = [f.get('properties') or {} for f in features]
+        present = bytearray((count + 7) // 8)
+        all_present = True
+        for i, p in enumerate(props):
+            if name in p:
+                present[i // 8] |= 1 << (i % 8)
+            else:
+                all_present = False
+        values = [p.get(name) for p in props]
+        column = {'name': name, 'kind': kind}
+
+        if kind == 'str':
+            if name == 'description':
+                values = [plain_text(v) if v is not None else None for v in values]
+            data = _le_bytes(array.array('I', (string_index(v) for v in values)))
+        elif kind == 'enum':
+            vocabulary = sorted({str(v) for v in values if v is not None})
+            codes = {v: i for i, v in enumerate(vocabulary)}
+            column['values'] = vocabulary
+            data = _le_bytes(array.array('H', (NULL_U16 if v is None else codes[str(v)] for v in values)))
+        elif kind == 'enum_list':
+            lists = [[str(item) for item in v] if isinstance(v, list) else [] for v in values]
+            vocabulary = sorted({item for items in lists for item in items})
+            codes = {v: i for i, v in enumerate(vocabulary)}
+            column['values'] = vocabulary
+            offsets = array.array('I', [0])
+            flat = array.array('H')
+            for items in lists:
+                flat.extend(codes[item] for item in items)
+                offsets.append(len(flat))
+            data = _pad(_le_bytes(offsets)) + _le_bytes(flat)
+        elif kind == 'f32':
+            data = _le_bytes(array.array('f', (math.nan if _number(v) is None else _number(v) for v in values)))
+        elif kind == 'u32':
+            data = _le_bytes(array.array('I', (
+                NULL_U32 if _number(v) is None or not 0 <= _number(v) < NULL_U32 else int(v) for v in values)))
+        else:
+            raise ValueError(f'Unknown column kind {kind!r}')
+
+        column['offset'] = sections.add(data)
+        column['present'] = None if all_present else sections.add(bytes(present))
+        header_columns.append(column)
+
+    encoded = [s.encode('utf-8') for s in strings]
+    string_offsets = array.array('I', [0])
+    for s in encoded:
+        string_offsets.append(string_offsets[-1] + len(s))
+    strings_offset = sections.add(_pad(_le_bytes(string_offsets)) + b''.join(encoded))
+
+    header = {
+        'version': VERSION,
+        'count': count,
+        'scale': SCALE,
+        'strings': {'offset': strings_offset, 'count': len(encoded)},
+        'columns': header_columns,
+    }
+
+    header_bytes = geoio.dumps(header)
+    header_bytes += b' ' * (-len(header_bytes) % 4)
+    return MAGIC + _le_bytes(array.array('I', [len(header_bytes)])) + header_bytes + b''.join(sections.parts)
+
+
+def feature_point(feature):
+    geometry = feature.get('geometry') or {}
+    coords = geometry.get('coordinates')
+    if geometry.get('type') != 'Point' or not isinstance(coords, list) or len(coords) < 2:
+        return None
+    if _number(coords[0]) is None or _number(coords[1]) is None:
+        return None
+    return coords[0], coords[1]
+
+
+def decode(data):
+    """Reference reader: KTC1 bytes -> list of GeoJSON point features."""
+    data = bytes(data)
+    if data[:4] != MAGIC:
+        raise ValueError('Not a KTC1 file')
+    header_length = _from_le('I', data[4:8])[0]
+    header = geoio.loads(data[8:8 + header_length])
+    data = data[8 + header_length:]
+    if header.get('version') != VERSION:
+        raise ValueError(f"Unsupported KTC version {header.get('version')}")
+    count = header['count']
+    scale = header['scale']
+
+    table = header['strings']
+    offsets_start = table['offset']
+    string_offsets = _from_le('I', data[offsets_start:offsets_start + 4 * (table['count'] + 1)])
+    blob_start = offsets_start + 4 * (table['count'] + 1)
+    strings = [data[blob_start + string_offsets[i]:blob_start + string_offsets[i + 1]].decode('utf-8')
+               for i in range(table['count'])]
+
+    coords = {}
+    properties = [{} for _ in range(count)]
+    for column in header['columns']:
+        name = column['name']
+        kind = column['kind']
+        offset = column['offset']
+
+        if kind == 'coord':
+            coords[name] = [v / scale for v in _from_le('i', data[offset:offset + 4 * count])]
+            continue
+
+        if kind == 'str':
+            values = [None if v == NULL_U32 else strings[v] for v in _from_le('I', data[offset:offset + 4 * count])]
+        elif kind == 'enum':
+            vocabulary = column['values']
+            values = [None if v == NULL_U16 else vocabulary[v] for v in _from_le('H', data[offset:offset + 2 * count])]
+        elif kind == 'enum_list':
+            vocabulary = column['values']
+            list_offsets = _from_le('I', data[offset:offset + 4 * (count + 1)])
+            codes_start = offset + 4 * (count + 1)
+            codes = _from_le('H', data[codes_start:codes_start + 2 * list_offsets[-1]])
+            values = [[vocabulary[c] for c in codes[list_offsets[i]:list_offsets[i + 1]]] for i in range(count)]
+        elif kind == 'f32':
+            values = [None if math.isnan(v) else _round_f32(v) for v in _from_le('f', data[offset:offset + 4 * count])]
+        elif kind == 'u32':
+            values = [None if v == NULL_U32 else v for v in _from_le('I', data[offset:offset + 4 * count])]
+        else:
+            raise ValueError(f'Unknown column kind {kind!r}')
+
+        present = column['present']
+        for i, value in enumerate(values):
+            if present is None or data[present + i // 8] & (1 << (i % 8)):
+                properties[i][name] = value
+
+    return [
+        {'type': 'Feature',
+         'geometry': {'type': 'Point', 'coordinates': [coords['lon'][i], coords['lat'][i]]},
+         'properties': properties[i]}
+        for i in range(count)
+    ]
+
+
+def _round_f32(value):
+    """Undo float32 noise (12.34 is stored as 12.340000152...)."""
+    value = float(f'{value:.7g}')
+    return int(value) if value.is_integer() else value
+
+
+def write(path, features, descriptions=False):
+    """Atomically write features to ``path`` as KTC1; returns the encoded size in bytes."""
+    data = encode(features, descriptions)
+    with geoio.atomic_open(path) as f:
+        f.write(data)
+    return len(data)
+
+
+def read(path):
+    """Load a KTC1 file as a FeatureCollection."""
+    with open(path, 'rb') as f:
+        return {'type': 'FeatureCollection', 'features': decode(f.read())}
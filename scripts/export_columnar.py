@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Export the published campsite and POI GeoJSON as KTC1 columnar binary files.
+
+Writes a .ktc file next to each source file (format documented in columnar.py):
+
+    data/published/{ST}_merged.geojson   -> data/published/{ST}_merged.ktc
+    data/poi_dump_water_propane.geojson  -> data/poi_dump_water_propane.ktc
+
+Every file is decoded again after writing and checked against its source,
+and a size report (raw and gzipped) is printed.
+
+Usage:
+    python3 scripts/export_columnar.py
+    python3 scripts/export_columnar.py --with-descriptions
+"""
+
+import argparse
+import gzip
+from pathlib import Path
+
+import columnar
+import geoio
+import publish
+
+
+def source_files():
+    return publish.published_files() + [Path('data/poi_dump_water_propane.geojson')]
+
+
+def check_round_trip(features, decoded):
+    """Raise ValueError if ``decoded`` lost coordinates, strings or enum values."""
+    points = [f for f in features if columnar.feature_point(f) is not None]
+    if len(points) != len(decoded):
+        raise ValueError(f'{len(points)} features in, {len(decoded)} out')
+    for source, result in zip(points, decoded):
+        for a, b in zip(source['geometry']['coordinates'], result['geometry']['coordinates']):
+            if abs(a - b) > 1.0 / columnar.SCALE:
+                raise ValueError(f'coordinate {a} decoded as {b}')
+        props = source.get('properties') or {}
+        for name, kind in columnar.COLUMNS:
+            if kind in ('str', 'enum') and props.get(name) is not None:
+                if str(props[name]) != result['properties'].get(name):
+                    raise ValueError(f"{name}: {props[name]!r} decoded as {result['properties'].get(name)!r}")
+
+
+def export_file(path, descriptions=False):
+    raw = path.read_bytes()
+    features = geoio.loads(raw).get('features', [])
+    data = columnar.encode(features, descriptions)
+
+    check_round_trip(features, columnar.decode(data))
+
+    output = path.with_suffix('.ktc')
+    with geoio.atomic_open(output) as f:
+        f.write(data)
+
+    return {
+        'path': output,
+        'features': len(features),
+        'geojson': len(raw),
+        'ktc': len(data),
+        'geojson_gz': len(gzip.compress(raw)),
+        'ktc_gz': len(gzip.compress(data)),
+    }
+
+
+def export(paths=None, descriptions=False):
+    """Export every existing file of ``paths`` (default: source_files()); returns the per-file results."""
+    results = []
+    for path in source_files() if paths is None else paths:
+        if not path.exists():
+            continue
+        try:
+            result = export_file(path, descriptions)
+        except (OSError, ValueError) as e:
+            print(f'  ❌ {path}: {e}')
+            continue
+        results.append(result)
+        print(f"  ✓ {result['path']}: {result['features']:,} features, "
+              f"{result['geojson'] / 1024:.1f} KB → {result['ktc'] / 1024:.1f} KB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export campsite/POI GeoJSON as KTC1 columnar binary.')
+    parser.add_argument('--with-descriptions', action='store_true',
+                        help='Include descriptions (as plain text); omitted by default to keep files small.')
+    args = parser.parse_args()
+
+    print('=' * 70)
+    print('EXPORTING COLUMNAR (KTC1) DATA')
+    print('=' * 70)
+
+    results = export(descriptions=args.with_descriptions)
+
+    if not results:
+        print('\n⚠️  No files exported')
+        return
+
+    totals = {key: sum(r[key] for r in results) for key in ('geojson', 'ktc', 'geojson_gz', 'ktc_gz')}
+    print()
+    print('=' * 70)
+    print('SUMMARY')
+    print('=' * 70)
+    print(f'Files exported: {len(results)}')
+    print(f"Raw:     {totals['geojson'] / 1024:,.1f} KB GeoJSON → {totals['ktc'] / 1024:,.1f} KB KTC1 "
+          f"({totals['geojson'] / totals['ktc']:.1f}x smaller)")
+    print(f"Gzipped: {totals['geojson_gz'] / 1024:,.1f} KB GeoJSON → {totals['ktc_gz'] / 1024:,.1f} KB KTC1 "
+          f"({totals['geojson_gz'] / totals['ktc_gz']:.1f}x smaller)")
+    print(f"Written: {geoio.write_summary()}")
+    print('=' * 70)
+
+
+if __name__ == '__main__':
+    main()
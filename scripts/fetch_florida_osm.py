@@ -1,112 +1,54 @@
 #!/usr/bin/env python3
 """
-Targeted script to fetch Florida OSM data with extended timeout.
-Florida is a large state and requires more time than the standard 60s timeout.
+Targeted script to fetch Florida OSM data.
+Florida's bbox is too heavy for a single 60s Overpass query; fetch_osm_data
+now splits it into quadrant tiles automatically, so this is kept as a thin
+wrapper for the existing workflow.
 """
 
-import requests
-import json
+import argparse
 import os
 
-def fetch_florida_osm():
-    """Fetches campsite data for Florida with extended timeout."""
-    # Florida bounds
-    bbox = '24.5,-87.6,31.0,-79.9'
+import geoio
+from fetch_osm_data import fetch_osm_stream, iter_features
+from httpcache import add_cache_arguments, cache_from_args
+from overpass import MirrorPool, add_mirror_arguments
 
-    # Extended timeout for large state
-    query = f"""
-        [out:json][timeout:180];
-        (
-          node["tourism"~"camp_site|caravan_site"]({bbox});
-          way["tourism"~"camp_site|caravan_site"]({bbox});
-          relation["tourism"~"camp_site|caravan_site"]({bbox});
-        );
-        out center;
-    """
-
-    # Try multiple Overpass API mirrors
-    mirrors = [
-        "https://overpass-api.de/api/interpreter",
-        "https://overpass.kumi.systems/api/interpreter",
-        "https://overpass.openstreetmap.ru/api/interpreter"
-    ]
-
-    for mirror in mirrors:
-        print(f"Trying {mirror}...")
-        try:
-            response = requests.get(mirror, params={'data': query}, timeout=200)
-            response.raise_for_status()
-            osm_data = response.json()
-            print(f"✅ Successfully fetched data from {mirror}")
-            return osm_data
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️ Failed with {mirror}: {e}")
-            continue
-
-    print("❌ All mirrors failed")
-    return None
-
-def osm_to_geojson(osm_data):
-    """Converts OSM JSON data to GeoJSON format."""
-    features = []
-    for element in osm_data.get('elements', []):
-        if 'type' not in element:
-            continue
-
-        geom_type = None
-        coords = []
-
-        if element['type'] == 'node':
-            geom_type = 'Point'
-            coords = [element.get('lon', 0), element.get('lat', 0)]
-        elif element['type'] in ['way', 'relation'] and 'center' in element:
-            geom_type = 'Point'
-            coords = [element['center'].get('lon', 0), element['center'].get('lat', 0)]
+def fetch_florida_osm(cache=None, mirrors=None):
+    """Fetches campsite data for Florida, splitting the bbox as needed.
 
-        if not geom_type or not all(coords):
-            continue
-
-        feature = {
-            'type': 'Feature',
-            'geometry': {
-                'type': geom_type,
-                'coordinates': coords
-            },
-            'properties': element.get('tags', {})
-        }
-        feature['properties']['osm_id'] = element.get('id')
-        features.append(feature)
-
-    return {
-        'type': 'FeatureCollection',
-        'features': features
-    }
+    Returns a stream over the response elements, or None.
+    """
+    pool = MirrorPool(mirrors, cache=cache)
+    stream = fetch_osm_stream('FL', pool)
+    if stream is not None:
+        print("✅ Successfully fetched Florida data")
+    return stream
 
 def main():
+    parser = argparse.ArgumentParser(description='Fetch Florida OSM campsite data.')
+    add_cache_arguments(parser)
+    add_mirror_arguments(parser)
+    args = parser.parse_args()
+
     print("=" * 60)
-    print("Fetching Florida OSM campsite data with extended timeout")
+    print("Fetching Florida OSM campsite data")
     print("=" * 60)
 
     # Fetch data
-    osm_data = fetch_florida_osm()
-    if not osm_data:
+    stream = fetch_florida_osm(cache_from_args(args), args.overpass_url)
+    if stream is None:
         print("❌ Failed to fetch Florida data")
         exit(1)
 
-    # Convert to GeoJSON
-    geojson_data = osm_to_geojson(osm_data)
-
-    # Create directory and save file
-    output_dir = os.path.join('data', 'opencampingmap')
-    os.makedirs(output_dir, exist_ok=True)
-
-    output_path = os.path.join(output_dir, 'FL.geojson')
-    with open(output_path, 'w') as f:
-        json.dump(geojson_data, f)
+    # Convert to GeoJSON while parsing; the stream is in Overpass order, so unchanged data is not rewritten
+    output_path = os.path.join('data', 'opencampingmap', 'FL.geojson')
+    with stream:
+        campsite_count = geoio.write_features(output_path, iter_features(stream))
 
-    campsite_count = len(geojson_data['features'])
     print(f"✅ Successfully saved {campsite_count} campsites to {output_path}")
     print(f"📊 Florida campsite count: {campsite_count}")
+    print(f"💾 {geoio.write_summary()}")
 
     return 0
 
@@ -1,9 +1,13 @@
 
-import requests
-import json
 import os
 import argparse
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import geoio
+import metrics
+from httpcache import add_cache_arguments, cache_from_args
+from overpass import (MirrorPool, DEFAULT_MAX_DEPTH, DEFAULT_PER_MIRROR, ELEMENT_TYPES, add_mirror_arguments,
+                      element_order)
 
 STATE_BOUNDS = {
     'AL': '30.2,-88.5,35.0,-84.9', 'AK': '51.2,-179.1,71.4,-129.9', 'AZ': '31.3,-114.8,37.0,-109.0',
@@ -25,14 +29,21 @@ STATE_BOUNDS = {
     'WI': '42.5,-92.9,47.1,-86.2', 'WY': '41.0,-111.1,45.0,-104.1'
 }
 
-def fetch_osm_data(state_code):
-    """Fetches campsite data for a state from the Overpass API."""
-    if state_code.upper() not in STATE_BOUNDS:
-        print(f"Error: State code '{state_code}' not found.")
-        return None
+OUTPUT_DIR = os.path.join('data', 'opencampingmap')
 
-    bbox = STATE_BOUNDS[state_code.upper()]
-    query = f"""
+# Per-state OSM data timestamps of the last successful fetch
+WATERMARKS_PATH = os.path.join(OUTPUT_DIR, 'watermarks.json')
+
+def build_query(bbox, since=None):
+    """Builds the Overpass query for a bbox, optionally limited to changes since a timestamp.
+
+    The incremental form returns full bodies only for elements modified after
+    ``since``, followed by the bare ids of every element that still matches,
+    so deletions (and retagged elements) can be detected without downloading
+    the whole state again.
+    """
+    if since is None:
+        return f"""
         [out:json][timeout:60];
         (
           node["tourism"~"camp_site|caravan_site"]({bbox});
@@ -42,20 +53,82 @@ def fetch_osm_data(state_code):
         out center;
     """
 
-    url = "https://overpass-api.de/api/interpreter"
-    print(f"Fetching data for {state_code.upper()}...")
-    try:
-        response = requests.get(url, params={'data': query})
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data for {state_code.upper()}: {e}")
+    return f"""
+        [out:json][timeout:60];
+        (
+          node["tourism"~"camp_site|caravan_site"]({bbox});
+          way["tourism"~"camp_site|caravan_site"]({bbox});
+          relation["tourism"~"camp_site|caravan_site"]({bbox});
+        )->.current;
+        nwr.current(newer:"{since}");
+        out center;
+        .current out ids;
+    """
+
+def fetch_region_stream(name, bbox, pool=None, since=None, max_depth=DEFAULT_MAX_DEPTH):
+    """Fetches campsite data for any "south,west,north,east" bbox.
+
+    Returns a stream over the response elements (the bodies themselves are on
+    disk), or None on failure. If Overpass times out or runs out of memory,
+    the bbox is split into quadrants and the tiles are fetched in parallel,
+    recursively, with straddling ways and relations deduplicated. With
+    ``since``, only elements changed after that timestamp are returned in
+    full (see build_query).
+    """
+    if pool is None:
+        pool = MirrorPool()
+
+    if since:
+        print(f"Fetching changes for {name} since {since}...")
+    else:
+        print(f"Fetching data for {name}...")
+    # The incremental query has two out statements, so its tiles aren't one sorted run
+    stream = pool.iter_tiled_elements(lambda tile: build_query(tile, since), bbox,
+                                      label=name, max_depth=max_depth, ordered=not since)
+    if stream is None:
+        print(f"Error fetching data for {name}")
+    return stream
+
+def fetch_osm_stream(state_code, pool=None, since=None, max_depth=DEFAULT_MAX_DEPTH):
+    """Fetches campsite data for a state from the Overpass API (see fetch_region_stream)."""
+    if state_code.upper() not in STATE_BOUNDS:
+        print(f"Error: State code '{state_code}' not found.")
         return None
 
-def osm_to_geojson(osm_data):
-    """Converts OSM JSON data to GeoJSON format."""
-    features = []
-    for element in osm_data.get('elements', []):
+    bbox = STATE_BOUNDS[state_code.upper()]
+    return fetch_region_stream(state_code.upper(), bbox, pool, since, max_depth)
+
+def fetch_osm_data(state_code, pool=None, since=None):
+    """Fetches campsite data for a state and returns the decoded Overpass response."""
+    stream = fetch_osm_stream(state_code, pool, since)
+    if stream is None:
+        return None
+    with stream:
+        elements = list(stream)
+    return dict(stream.extra, elements=elements)
+
+def fetch_states(regions, pool, since=None, max_depth=DEFAULT_MAX_DEPTH):
+    """Fetches several regions concurrently, yielding (name, stream) as each finishes.
+
+    ``regions`` maps output names (state codes) to bboxes; ``since``
+    optionally maps the same names to incremental watermarks.
+    """
+    since = since or {}
+    with ThreadPoolExecutor(max_workers=pool.capacity) as executor:
+        futures = {
+            executor.submit(_timed_fetch, name, bbox, pool, since.get(name), max_depth): name
+            for name, bbox in regions.items()
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def _timed_fetch(name, bbox, pool, since, max_depth):
+    with metrics.timer('fetch', source='osm'):
+        return fetch_region_stream(name, bbox, pool, since, max_depth)
+
+def iter_features(elements):
+    """Converts OSM elements to GeoJSON features one at a time."""
+    for element in elements:
         if 'type' not in element: continue
 
         geom_type = None
@@ -80,37 +153,159 @@ def osm_to_geojson(osm_data):
             'properties': element.get('tags', {})
         }
         feature['properties']['osm_id'] = element.get('id')
-        features.append(feature)
+        feature['properties']['osm_type'] = element['type']
+        yield feature
 
+def osm_to_geojson(osm_data):
+    """Converts OSM JSON data to GeoJSON format."""
     return {
         'type': 'FeatureCollection',
-        'features': features
+        'features': list(iter_features(osm_data.get('elements', [])))
     }
 
+def merge_changes(existing, osm_data):
+    """Applies an incremental Overpass response to an existing FeatureCollection.
+
+    Features are matched by (``osm_type``, ``osm_id``), since nodes, ways and
+    relations share id spaces: changed elements replace (or are appended
+    after) existing ones, and features whose element no longer matches the
+    query are dropped. Features written before ``osm_type`` was recorded match
+    an element of any type with their id. The result is in element_order, like
+    a full fetch. Returns (geojson, upserted, removed).
+    """
+    elements = osm_data.get('elements', [])
+    current = {(element.get('type'), element.get('id')) for element in elements}
+    changed = osm_to_geojson({'elements': [e for e in elements if 'tags' in e]})['features']
+    changed_by_key = {(f['properties']['osm_type'], f['properties']['osm_id']): f for f in changed}
+
+    features = []
+    removed = 0
+    for feature in existing.get('features', []):
+        props = feature.get('properties', {})
+        osm_type, osm_id = props.get('osm_type'), props.get('osm_id')
+        if osm_type is None:
+            keys = [(t, osm_id) for t in ELEMENT_TYPES if (t, osm_id) in current]
+            key = next((k for k in keys if k in changed_by_key), keys[0] if keys else None)
+        else:
+            key = (osm_type, osm_id) if (osm_type, osm_id) in current else None
+        if key is None:
+            removed += 1
+            continue
+        features.append((key, changed_by_key.pop(key, feature)))
+
+    # Whatever is left in changed_by_key is new since the last fetch
+    features.extend(changed_by_key.items())
+    features.sort(key=lambda item: element_order({'type': item[0][0], 'id': item[0][1]}))
+
+    return {'type': 'FeatureCollection', 'features': [f for _, f in features]}, len(changed), removed
+
+def output_path_for(state_code):
+    return os.path.join(OUTPUT_DIR, f'{state_code}.geojson')
+
+def load_watermarks():
+    try:
+        return geoio.read(WATERMARKS_PATH)
+    except (OSError, ValueError):
+        return {}
+
+def save_watermarks(watermarks):
+    geoio.write(WATERMARKS_PATH, dict(sorted(watermarks.items())), pretty=True)
+
+def save_geojson(state_code, features):
+    """Streams a state's features to data/opencampingmap/{ST}.geojson.
+
+    ``features`` must be in element_order: a full fetch's stream already is
+    (tiled fetches are merged in that order) and merge_changes sorts its
+    result. Full and incremental fetches of the same data therefore give the
+    same bytes, so an unchanged state is not rewritten.
+    """
+    output_path = output_path_for(state_code)
+    count = geoio.write_features(output_path, features)
+
+    print(f"✅ Successfully saved {count} campsites to {output_path}")
+
 def main():
     parser = argparse.ArgumentParser(description='Fetch OpenStreetMap campsite data.')
-    parser.add_argument('--state', required=True, help='State code (e.g., CA, CO, WY).')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--state', help='State code (e.g., CA, CO, WY).')
+    target.add_argument('--states', help='Space- or comma-separated state codes to fetch concurrently.')
+    target.add_argument('--all', action='store_true', help='Fetch every state in STATE_BOUNDS concurrently.')
+    target.add_argument('--bbox', help='Any region as "south,west,north,east" (use with --name).')
+    parser.add_argument('--name', help='Output name for --bbox, written to data/opencampingmap/{NAME}.geojson.')
+    parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH,
+                        help=f'How many times a timed-out bbox may be split into quadrants (default: {DEFAULT_MAX_DEPTH}).')
+    parser.add_argument('--per-mirror', type=int, default=DEFAULT_PER_MIRROR,
+                        help=f'Max concurrent queries per Overpass mirror (default: {DEFAULT_PER_MIRROR}).')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fetch elements changed since the last run and merge them into the existing files.')
+    add_cache_arguments(parser)
+    add_mirror_arguments(parser)
     args = parser.parse_args()
 
-    state_code = args.state.upper()
+    if args.bbox:
+        if not args.name:
+            parser.error('--bbox requires --name')
+        regions = {args.name: args.bbox}
+    else:
+        if args.all:
+            state_codes = list(STATE_BOUNDS)
+        elif args.states:
+            state_codes = [code.upper() for code in args.states.replace(',', ' ').split()]
+        else:
+            state_codes = [args.state.upper()]
+
+        unknown = [code for code in state_codes if code not in STATE_BOUNDS]
+        if unknown:
+            print(f"Error: State code(s) not found: {', '.join(unknown)}")
+            return 1
+        regions = {code: STATE_BOUNDS[code] for code in state_codes}
 
-    # Fetch data
-    osm_data = fetch_osm_data(state_code)
-    if not osm_data:
-        return
+    pool = MirrorPool(args.overpass_url, per_mirror=args.per_mirror, cache=cache_from_args(args))
+    failed = []
 
-    # Convert to GeoJSON
-    geojson_data = osm_to_geojson(osm_data)
+    # Incremental mode needs both a watermark and the file it applies to
+    watermarks = load_watermarks()
+    since = {}
+    if args.incremental:
+        since = {
+            code: watermarks[code] for code in regions
+            if code in watermarks and os.path.exists(output_path_for(code))
+        }
+
+    for state_code, stream in fetch_states(regions, pool, since, args.max_depth):
+        if stream is None:
+            failed.append(state_code)
+            continue
 
-    # Create directory and save file
-    output_dir = os.path.join('data', 'opencampingmap')
-    os.makedirs(output_dir, exist_ok=True)
+        with stream, metrics.timer('convert', source='osm'):
+            if state_code in since:
+                # Incremental responses are small: changed elements plus bare ids
+                osm_data = {'elements': list(stream)}
+                existing = geoio.read(output_path_for(state_code))
+                if not osm_data['elements'] and existing.get('features'):
+                    # An empty id list would wipe the state; far more likely a bad response
+                    print(f"⚠️ {state_code}: incremental response matched nothing, keeping existing file")
+                    failed.append(state_code)
+                    continue
+                geojson_data, upserted, removed = merge_changes(existing, osm_data)
+                print(f"🔄 {state_code}: {upserted} changed, {removed} removed")
+                save_geojson(state_code, geojson_data['features'])
+            else:
+                # Convert elements to features as they are parsed
+                save_geojson(state_code, iter_features(stream))
 
-    output_path = os.path.join(output_dir, f'{state_code}.geojson')
-    with open(output_path, 'w') as f:
-        json.dump(geojson_data, f)
+        timestamp = stream.extra.get('osm3s', {}).get('timestamp_osm_base')
+        if timestamp:
+            watermarks[state_code] = timestamp
+            save_watermarks(watermarks)
 
-    print(f"✅ Successfully saved {len(geojson_data['features'])} campsites to {output_path}")
+    if len(regions) > 1:
+        print(f"📊 Fetched {len(regions) - len(failed)}/{len(regions)} states")
+    print(f"💾 {geoio.write_summary()}")
+    if failed:
+        print(f"❌ Failed: {', '.join(sorted(failed))}")
+        return 1
+    return 0
 
 if __name__ == '__main__':
-    main()
+    exit(main())
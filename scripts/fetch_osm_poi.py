@@ -4,36 +4,45 @@ Fetch dump stations and propane fill locations from OpenStreetMap via Overpass A
 Merge with existing water station data from Recreation.gov campsites
 """
 
-import json
-import requests
+import argparse
 import time
 from pathlib import Path
 
-def fetch_overpass_data(query, description):
-    """Fetch data from Overpass API with timeout and retry"""
-    overpass_url = "https://overpass-api.de/api/interpreter"
+import geoio
+from httpcache import add_cache_arguments, cache_from_args
+from overpass import MirrorPool, add_mirror_arguments
+from poi_shards import SHARDS_DIR, write_poi
+
+def fetch_overpass_data(query, description, pool=None):
+    """Fetch data from Overpass API with timeout and retry.
+
+    Yields elements as they are parsed from the response on disk, so the
+    nationwide payloads never have to fit in memory as one document.
+    """
+    if pool is None:
+        pool = MirrorPool(timeout=200)
 
     print(f"Fetching {description} from OpenStreetMap...")
 
     for attempt in range(3):
-        try:
-            response = requests.post(overpass_url, data={'data': query}, timeout=120)
-            response.raise_for_status()
-            data = response.json()
-            print(f"✓ Found {len(data.get('elements', []))} {description}")
-            return data.get('elements', [])
-        except requests.exceptions.Timeout:
-            print(f"  Timeout on attempt {attempt + 1}/3, retrying...")
+        stream = pool.iter_elements(query, label=description)
+        if stream is not None:
+            count = 0
+            with stream:
+                for element in stream:
+                    count += 1
+                    yield element
+            print(f"✓ Found {count} {description}")
+            return
+        if pool.cache.offline:
+            break
+        print(f"  Attempt {attempt + 1}/3 failed, retrying...")
+        if attempt < 2:
             time.sleep(5)
-        except Exception as e:
-            print(f"  Error: {e}")
-            if attempt < 2:
-                time.sleep(5)
 
     print(f"✗ Failed to fetch {description}")
-    return []
 
-def fetch_dump_stations():
+def fetch_dump_stations(pool=None):
     """
     Fetch RV dump stations from OSM
     Includes:
@@ -56,9 +65,9 @@ def fetch_dump_stations():
     out body center;
     """
 
-    return fetch_overpass_data(query, "dump stations")
+    return fetch_overpass_data(query, "dump stations", pool)
 
-def fetch_propane_stations():
+def fetch_propane_stations(pool=None):
     """Fetch propane fill stations from OSM"""
     query = """
     [out:json][timeout:120];
@@ -70,7 +79,7 @@ def fetch_propane_stations():
     out body center;
     """
 
-    return fetch_overpass_data(query, "propane stations")
+    return fetch_overpass_data(query, "propane stations", pool)
 
 def extract_water_stations():
     """Extract water stations from existing Recreation.gov campsite data"""
@@ -85,8 +94,7 @@ def extract_water_stations():
     for state_file in state_files:
         state_code = state_file.stem.upper().replace('(1)', '').strip()
 
-        with open(state_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = geoio.read(state_file)
 
         for feature in data.get('features', []):
             coords = feature.get('geometry', {}).get('coordinates', [])
@@ -183,6 +191,13 @@ def osm_element_to_geojson(element, poi_type, source='openstreetmap'):
     }
 
 def main():
+    parser = argparse.ArgumentParser(description='Fetch dump station, propane and water POIs.')
+    add_cache_arguments(parser)
+    add_mirror_arguments(parser)
+    args = parser.parse_args()
+
+    pool = MirrorPool(args.overpass_url, timeout=200, cache=cache_from_args(args))
+
     print("=" * 60)
     print("  KampTrail POI Data Updater")
     print("  Fetching from Recreation.gov + OpenStreetMap")
@@ -196,31 +211,24 @@ def main():
     all_features.extend(water_stations)
 
     # 2. Fetch dump stations from OSM
-    dump_elements = fetch_dump_stations()
+    dump_elements = fetch_dump_stations(pool)
     for element in dump_elements:
         feature = osm_element_to_geojson(element, 'dump')
         if feature:
             all_features.append(feature)
 
     # 3. Fetch propane stations from OSM
-    propane_elements = fetch_propane_stations()
+    propane_elements = fetch_propane_stations(pool)
     for element in propane_elements:
         feature = osm_element_to_geojson(element, 'propane')
         if feature:
             all_features.append(feature)
 
-    # 4. Create GeoJSON output
-    output = {
-        'type': 'FeatureCollection',
-        'features': all_features
-    }
-
-    # 5. Save to file
+    # 4. Save GeoJSON output (compact, ~1 m coordinates) plus the viewport shards
     output_file = Path('data/poi_dump_water_propane.geojson')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2)
+    shards = write_poi(all_features, output_file)
 
-    # 6. Print summary
+    # 5. Print summary
     print()
     print("=" * 60)
     print("  SUMMARY")
@@ -236,6 +244,8 @@ def main():
     print(f"TOTAL POIs:       {len(all_features):5}")
     print()
     print(f"✓ Saved to {output_file}")
+    print(f"✓ {len(shards['layers']['poi']['tiles'])} viewport shards in {SHARDS_DIR}")
+    print(f"💾 {geoio.write_summary()}")
     print()
 
 if __name__ == '__main__':
@@ -5,15 +5,26 @@ Fetch real campsite data from Recreation.gov RIDB API and convert to KampTrail f
 Usage:
     python3 scripts/fetch_recreation_gov_data.py --api-key YOUR_API_KEY [--state CA]
 
+Set RIDB_BASE_URL or pass --base-url to use another endpoint (e.g. a local
+mock_api_server.py).
+
 Get your free API key at: https://ridb.recreation.gov/docs
 """
 
 import requests
-import json
 import argparse
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Tuple, Any
+
+from requests.adapters import HTTPAdapter
+
+import geoio
+import metrics
+from httpcache import CacheMiss, add_cache_arguments, cache_from_args, make_key
+from ratelimit import TokenBucket
 
 # State codes and names
 US_STATES = {
@@ -32,23 +43,65 @@ US_STATES = {
     'WI': 'Wisconsin', 'WY': 'Wyoming'
 }
 
-BASE_URL = "https://ridb.recreation.gov/api/v1"
+BASE_URL = os.environ.get('RIDB_BASE_URL', "https://ridb.recreation.gov/api/v1")
+
+# RIDB allows 50 requests/minute per API key
+REQUESTS_PER_MINUTE = 50
 
 class RIDBFetcher:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, workers: int = 4, requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 cache=None, base_url: str = BASE_URL):
         self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
         self.headers = {'apikey': api_key}
-        self.rate_limit_delay = 1.2  # 50 requests/min = 1.2s between requests
+        self.workers = workers
+        self.cache = cache
+
+        # One limiter shared by every worker thread keeps the whole run under quota
+        self.limiter = TokenBucket.per_minute(requests_per_minute)
+
+        # Pooled keep-alive session, sized so each worker can hold a connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _get_page(self, url: str, params: Dict) -> Dict:
+        """GET one RIDB page, through the HTTP cache when one is configured.
+
+        Only requests that actually reach the network take a rate-limit token.
+        """
+        if self.cache:
+            # The API key travels in a header, so it never becomes part of the cache key
+            key = make_key('GET', url, params)
+            cached = self.cache.get_fresh(key)
+            if cached:
+                return geoio.read(cached)
+            self.limiter.acquire()
+            return geoio.read(self.cache.fetch(self.session, url, key=key, params=params, timeout=30))
+
+        self.limiter.acquire()
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, timeout=30)
+        except requests.exceptions.RequestException:
+            metrics.record_request(url, None, time.perf_counter() - started)
+            raise
+        metrics.record_request(url, response.status_code, time.perf_counter() - started, len(response.content))
+        response.raise_for_status()
+        return response.json()
 
     def fetch_facilities_by_state(self, state_code: str, limit: int = 50) -> List[Dict]:
         """Fetch camping facilities for a given state."""
         facilities = []
         offset = 0
+        rate_limited = 0
 
         print(f"Fetching facilities for {state_code}...")
 
         while True:
-            url = f"{BASE_URL}/facilities"
+            url = f"{self.base_url}/facilities"
             params = {
                 'state': state_code,
                 'activity': 9,  # Camping activity ID
@@ -58,22 +111,36 @@ class RIDBFetcher:
             }
 
             try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
+                data = self._get_page(url, params)
 
                 if 'RECDATA' not in data or not data['RECDATA']:
                     break
 
                 batch = data['RECDATA']
                 facilities.extend(batch)
-                print(f"  Fetched {len(batch)} facilities (total: {len(facilities)})")
+                print(f"  {state_code}: fetched {len(batch)} facilities (total: {len(facilities)})")
 
                 if len(batch) < limit:
                     break
 
                 offset += limit
-                time.sleep(self.rate_limit_delay)
+
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 429 and rate_limited < 5:
+                    # Over quota anyway (e.g. another client on this key): back off and retry the page
+                    rate_limited += 1
+                    retry_after = e.response.headers.get('Retry-After', '')
+                    retry_after = float(retry_after) if retry_after.isdigit() else 60.0
+                    print(f"  Rate limited on {state_code}, waiting {retry_after:.0f}s...")
+                    metrics.count('retries', endpoint=metrics.endpoint(url), reason='429')
+                    self.limiter.penalize(retry_after)
+                    continue
+                print(f"  Error fetching facilities: {e}")
+                break
+
+            except CacheMiss:
+                print(f"  {state_code}: page at offset {offset} not in the HTTP cache (offline)")
+                break
 
             except Exception as e:
                 print(f"  Error fetching facilities: {e}")
@@ -81,12 +148,30 @@ class RIDBFetcher:
 
         return facilities
 
+    def fetch_states(self, state_codes: List[str], limit: int = 50) -> Iterator[Tuple[str, List[Dict]]]:
+        """Fetch several states on worker threads, yielding (state_code, facilities) as each finishes."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self._timed_fetch, code, limit): code
+                for code in state_codes
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _timed_fetch(self, state_code: str, limit: int) -> List[Dict]:
+        with metrics.timer('fetch', source='ridb'):
+            return self.fetch_facilities_by_state(state_code, limit)
+
     def convert_to_geojson(self, facilities: List[Dict], state_code: str) -> Dict:
-        """Convert RIDB facilities to KampTrail GeoJSON format."""
+        """Convert RIDB facilities to KampTrail GeoJSON format.
+
+        Facilities are numbered in FacilityID order, so a site keeps its id
+        however the API happens to page the results.
+        """
         features = []
         site_counter = 1
 
-        for facility in facilities:
+        for facility in sorted(facilities, key=lambda f: geoio.id_key(f.get('FacilityID'))):
             # Skip facilities without coordinates
             if not facility.get('FacilityLatitude') or not facility.get('FacilityLongitude'):
                 continue
@@ -186,43 +271,50 @@ class RIDBFetcher:
 
 def main():
     parser = argparse.ArgumentParser(description='Fetch Recreation.gov campsite data')
-    parser.add_argument('--api-key', required=True, help='RIDB API key (get from ridb.recreation.gov)')
+    parser.add_argument('--api-key', help='RIDB API key (get from ridb.recreation.gov); not needed with --offline')
     parser.add_argument('--state', help='Specific state code (e.g., CA, CO). If omitted, fetches all states.')
     parser.add_argument('--limit', type=int, default=50, help='Max sites per state (default: 50)')
     parser.add_argument('--output-dir', default='data/campsites', help='Output directory')
+    parser.add_argument('--workers', type=int, default=4, help='States fetched concurrently (default: 4)')
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help=f'RIDB API base URL (default: {BASE_URL}; set RIDB_BASE_URL to change)')
+    parser.add_argument('--requests-per-minute', type=int, default=REQUESTS_PER_MINUTE,
+                        help=f'Client-side rate limit (default: {REQUESTS_PER_MINUTE}, the RIDB quota)')
+    add_cache_arguments(parser)
 
     args = parser.parse_args()
+    if not args.api_key and not args.offline:
+        parser.error('--api-key is required unless --offline is set')
 
     # Create output directory
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    fetcher = RIDBFetcher(args.api_key)
+    fetcher = RIDBFetcher(args.api_key, workers=args.workers, requests_per_minute=args.requests_per_minute,
+                          cache=cache_from_args(args), base_url=args.base_url)
 
     # Determine which states to process
     states_to_fetch = [args.state.upper()] if args.state else list(US_STATES.keys())
-
-    total_sites = 0
-    state_counts = []
-
     for state_code in states_to_fetch:
         if state_code not in US_STATES:
             print(f"Warning: Invalid state code {state_code}, skipping...")
-            continue
+    states_to_fetch = [code for code in states_to_fetch if code in US_STATES]
+
+    total_sites = 0
+    state_counts = []
 
+    for state_code, facilities in fetcher.fetch_states(states_to_fetch, limit=args.limit):
         print(f"\n{'='*60}")
         print(f"Processing {US_STATES[state_code]} ({state_code})")
         print(f"{'='*60}")
 
-        # Fetch facilities
-        facilities = fetcher.fetch_facilities_by_state(state_code, limit=args.limit)
-
         if not facilities:
             print(f"  No facilities found for {state_code}")
             continue
 
         # Convert to GeoJSON
-        geojson = fetcher.convert_to_geojson(facilities, state_code)
+        with metrics.timer('convert', source='ridb'):
+            geojson = fetcher.convert_to_geojson(facilities, state_code)
         site_count = len(geojson['features'])
 
         if site_count == 0:
@@ -231,13 +323,15 @@ def main():
 
         # Save to file
         output_file = output_dir / f"{state_code}.geojson"
-        with open(output_file, 'w') as f:
-            json.dump(geojson, f, indent=2)
+        geoio.write(output_file, geojson)
 
         print(f"  ✅ Saved {site_count} campsites to {output_file}")
         total_sites += site_count
         state_counts.append({"state": state_code, "count": site_count})
 
+    # Keep index.json ordering stable regardless of which worker finished first
+    state_counts.sort(key=lambda entry: states_to_fetch.index(entry['state']))
+
     # Update index.json
     index_data = {
         "generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
@@ -248,12 +342,21 @@ def main():
     }
 
     index_file = output_dir / "index.json"
-    with open(index_file, 'w') as f:
-        json.dump(index_data, f, indent=2)
+
+    # The spatial index (build_spatial_index.py) describes the merged files, which this script doesn't touch
+    try:
+        previous = geoio.read(index_file)
+    except (OSError, ValueError):
+        previous = {}
+    if 'spatial' in previous:
+        index_data['spatial'] = previous['spatial']
+
+    geoio.write(index_file, geoio.stable_timestamp(previous, index_data))
 
     print(f"\n{'='*60}")
     print(f"✅ COMPLETE: Fetched {total_sites} campsites from {len(state_counts)} states")
     print(f"📊 Index updated: {index_file}")
+    print(f"💾 {geoio.write_summary()}")
     print(f"{'='*60}")
 
 
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Shared GeoJSON/JSON file I/O for the data scripts.
+
+- Fast: uses orjson when it is installed, falling back to the standard json module.
+- Compact: no indentation or spaces unless a caller asks for pretty output.
+- Atomic: every write goes to a temporary file in the same directory and is
+  renamed into place, so an interrupted run never leaves truncated GeoJSON
+  for the site to serve.
+- Write-if-changed: a write whose content hash matches the existing file is
+  dropped, leaving the file (and its mtime, git diff and CDN cache) alone.
+  write_summary() reports how many files were written and skipped.
+- Deterministic: sort_features() orders features by facility_id/osm_id so
+  the same data always serializes to the same bytes.
+- Streaming: iter_features/write_features handle one feature at a time for
+  files too large to hold comfortably in memory.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import metrics
+from jsonstream import JSONArrayStream
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+# Build outputs under data/ that are derived from the source files; never cleaned in place
+GENERATED_DIRS = {'tiles', 'clusters', 'poi', 'dist', 'published'}
+
+# Sort order of features by their upstream id (Recreation.gov first, as in the merge)
+ID_FIELDS = ('facility_id', 'osm_id')
+
+# Files written vs. skipped as unchanged by this process
+_tally = {'written': 0, 'skipped': 0}
+_tally_lock = threading.Lock()
+
+# mkstemp creates files as 0600; published files should get the usual umask-based mode
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def loads(data):
+    """Decode JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, pretty=False):
+    """Encode ``obj`` as UTF-8 JSON bytes (compact unless ``pretty``)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def file_hash(path):
+    """SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def same_content(path, other):
+    """True if both files exist and have the same content hash."""
+    try:
+        if os.path.getsize(path) != os.path.getsize(other):
+            return False
+    except OSError:
+        return False
+    return file_hash(path) == file_hash(other)
+
+
+def _count(key):
+    with _tally_lock:
+        _tally[key] += 1
+
+
+@contextmanager
+def atomic_open(path):
+    """Open a binary temp file beside ``path`` and rename it over ``path`` on success.
+
+    If the new content is identical to the existing file, the temp file is
+    discarded instead and ``path`` is left untouched.
+    """
+    directory = os.path.dirname(os.fspath(path)) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            with metrics.timer('write'):
+                yield f
+            size = f.tell()
+        if same_content(tmp_path, path):
+            os.remove(tmp_path)
+            _count('skipped')
+            metrics.count('files_skipped')
+            return
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+        _count('written')
+        metrics.count('files_written')
+        metrics.count('bytes_written', size)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def stable_timestamp(previous, current, key='generated'):
+    """Reuse ``previous[key]`` in ``current`` when nothing else differs, so an
+    unchanged document with a build timestamp is not rewritten; returns ``current``."""
+    if isinstance(previous, dict) and key in previous and \
+            {k: v for k, v in previous.items() if k != key} == {k: v for k, v in current.items() if k != key}:
+        current[key] = previous[key]
+    return current
+
+
+def write_tally():
+    """{'written': n, 'skipped': n} for every atomic write so far in this process."""
+    with _tally_lock:
+        return dict(_tally)
+
+
+def tally_since(before):
+    """Writes since an earlier write_tally() snapshot (for worker processes to report back)."""
+    now = write_tally()
+    return {key: now[key] - before.get(key, 0) for key in now}
+
+
+def write_summary(tally=None):
+    """One-line run summary of files written vs. skipped as unchanged."""
+    tally = write_tally() if tally is None else tally
+    return f"{tally.get('written', 0)} files written, {tally.get('skipped', 0)} unchanged (skipped)"
+
+
+def id_key(value):
+    """Sort key for an id that may be an int, a numeric string or any other string."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return (0, value, '')
+    if isinstance(value, str) and value:
+        return (0, int(value), '') if value.isdigit() else (1, 0, value)
+    return (2, 0, '')
+
+
+def feature_sort_key(feature):
+    props = feature.get('properties') or {}
+    for rank, name in enumerate(ID_FIELDS):
+        if props.get(name) not in (None, ''):
+            # A node and a way may share an osm_id
+            return (rank, id_key(props[name]), str(props.get('osm_type') or ''))
+    return (len(ID_FIELDS), id_key(None), '')
+
+
+def sort_features(features):
+    """Features ordered by facility_id, then osm_id; features with neither keep their order, last."""
+    return sorted(features, key=feature_sort_key)
+
+
+def read(path):
+    """Load a whole JSON/GeoJSON document."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    metrics.count('bytes_read', len(data))
+    with metrics.timer('decode'):
+        return loads(data)
+
+
+def write(path, obj, pretty=False):
+    """Atomically write ``obj`` to ``path`` unless the file already holds exactly that."""
+    with metrics.timer('encode'):
+        payload = dumps(obj, pretty)
+    with atomic_open(path) as f:
+        f.write(payload)
+
+
+def iter_features(path):
+    """Yield the features of a FeatureCollection one at a time.
+
+    Memory use is bounded by the largest single feature, not the file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from JSONArrayStream(f, 'features')
+
+
+def write_features(path, features, **members):
+    """Atomically stream an iterable of features to ``path`` as a FeatureCollection.
+
+    Extra top-level ``members`` are written ahead of the features. If the
+    iterable raises, the existing file is left untouched. Returns the number
+    of features written.
+    """
+    count = 0
+    with atomic_open(path) as f:
+        f.write(b'{"type":"FeatureCollection",')
+        for name, value in members.items():
+            f.write(dumps(name) + b':' + dumps(value) + b',')
+        f.write(b'"features":[')
+        for feature in features:
+            if count:
+                f.write(b',')
+            f.write(dumps(feature))
+            count += 1
+        f.write(b']}')
+    return count
+
+
+def source_files(root='data'):
+    """Sorted paths of every source GeoJSON file under ``root`` (generated tiles/clusters/shards/published copies excluded)."""
+    paths = glob.glob(os.path.join(root, '**', '*.geojson'), recursive=True)
+    return sorted(p for p in paths if os.path.relpath(p, root).split(os.sep)[0] not in GENERATED_DIRS)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP response cache shared by the Overpass and RIDB fetch scripts.
+
+Entries are keyed by a hash of the request (or of a caller-supplied key such
+as the Overpass query text, so every mirror shares one entry). Fresh entries
+are served without touching the network; stale ones are revalidated with
+If-None-Match / If-Modified-Since when the server sent an ETag or
+Last-Modified, so an unchanged upstream costs a 304. The cache is bounded by
+total size and evicts least recently used entries first; the directory is
+only scanned on the first write and when the running total goes over it.
+
+In offline mode the network is never used: every request is answered from
+the cache regardless of age, or fails with CacheMiss.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import metrics
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'http')
+DEFAULT_TTL = 24 * 3600               # 1 day
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a request has no cached response."""
+
+
+def make_key(*parts):
+    """Stable hash of the parts that identify a request."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class HTTPCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL,
+                 max_bytes=DEFAULT_MAX_BYTES, offline=False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._total = None  # Bytes of cached bodies; counted on the first write
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, key):
+        subdir = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(subdir, f'{key}.body'), os.path.join(subdir, f'{key}.json')
+
+    def _load_meta(self, key):
+        body_path, meta_path = self._paths(key)
+        if not os.path.exists(body_path):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_meta(self, key, meta):
+        _, meta_path = self._paths(key)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(meta_path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _touch(self, key):
+        body_path, _ = self._paths(key)
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+    def get_fresh(self, key, ttl=None):
+        """Return the cached body path if it can be used without the network, else None.
+
+        Offline, any cached entry counts as fresh and a missing one raises CacheMiss.
+        """
+        meta = self._load_meta(key)
+        ttl = self.ttl if ttl is None else ttl
+
+        if meta is None:
+            if self.offline:
+                raise CacheMiss(key)
+            return None
+
+        if self.offline or time.time() - meta['fetched_at'] < ttl:
+            self._touch(key)
+            metrics.count('cache_hits')
+            return self._paths(key)[0]
+        return None
+
+    def invalidate(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def fetch(self, session, url, method='GET', key=None, ttl=None, **kwargs):
+        """Fetch ``url`` through the cache and return the path of the response body.
+
+        ``kwargs`` are passed to ``session.request``. Non-2xx responses raise
+        requests.HTTPError and are never cached.
+        """
+        if key is None:
+            key = make_key(method, url, kwargs.get('params'), kwargs.get('data'))
+
+        fresh = self.get_fresh(key, ttl)
+        if fresh:
+            return fresh
+
+        meta = self._load_meta(key)
+        headers = dict(kwargs.pop('headers', None) or {})
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        body_path, _ = self._paths(key)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, headers=headers, stream=True, **kwargs)
+        except Exception:
+            metrics.record_request(url, None, time.perf_counter() - started)
+            raise
+        with response:
+            if response.status_code == 304 and meta:
+                meta['fetched_at'] = time.time()
+                self._save_meta(key, meta)
+                self._touch(key)
+                metrics.record_request(url, 304, time.perf_counter() - started)
+                return body_path
+
+            if not response.ok:
+                metrics.record_request(url, response.status_code, time.perf_counter() - started)
+            response.raise_for_status()
+
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(body_path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+                os.replace(tmp_path, body_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            # Latency to the last byte, since the body is streamed to disk
+            metrics.record_request(url, response.status_code, time.perf_counter() - started,
+                                   os.path.getsize(body_path))
+
+            self._save_meta(key, {
+                'url': url,
+                'fetched_at': time.time(),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'size': os.path.getsize(body_path)
+            })
+
+        replaced = meta.get('size', 0) if meta else 0
+        self._evict(keep=key, added=os.path.getsize(body_path) - replaced)
+        return body_path
+
+    def fetch_json(self, session, url, **kwargs):
+        with open(self.fetch(session, url, **kwargs), 'rb') as f:
+            return json.load(f)
+
+    def _evict(self, keep=None, added=0):
+        """Drop least recently used entries (other than ``keep``) until the cache fits in max_bytes.
+
+        ``added`` bytes were just written. The running total makes this a no-op
+        until the cache may be over the limit; only then is the directory scanned.
+        """
+        with self._lock:
+            if self._total is not None:
+                self._total += added
+                if self._total <= self.max_bytes:
+                    return
+            entries = []
+            total = 0
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith('.body'):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, name[:-len('.body')]))
+                    total += stat.st_size
+
+            for _, size, key in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                self.invalidate(key)
+                total -= size
+            self._total = total
+
+
+def add_cache_arguments(parser):
+    """Add the shared --offline / --cache-* options to an argparse parser."""
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay responses from the HTTP cache only; never touch the network.')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'HTTP cache directory (default: {DEFAULT_CACHE_DIR}).')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL / 3600,
+                        help=f'Hours before a cached response is revalidated (default: {DEFAULT_TTL // 3600}).')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Evict least recently used responses beyond this size.')
+
+
+def cache_from_args(args):
+    return HTTPCache(
+        cache_dir=args.cache_dir,
+        ttl=args.cache_ttl * 3600,
+        max_bytes=args.cache_max_mb * 1024 * 1024,
+        offline=args.offline
+    )
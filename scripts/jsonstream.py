@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON reading for large API payloads and GeoJSON files.
+
+JSONArrayStream walks a top-level JSON object and yields the items of one
+array member (e.g. Overpass ``elements`` or GeoJSON ``features``) one at a
+time, so memory use is bounded by the largest single item rather than the
+whole document. The other top-level members are collected in ``extra``.
+Streaming writes live in geoio.write_features.
+"""
+
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_VALUE_END = ',]}:' + _WHITESPACE
+
+
+class JSONArrayStream:
+    """Iterate the items of ``document[key]`` from a text file object.
+
+    After iteration finishes, ``extra`` holds every other top-level member,
+    including ones that appear after the array (Overpass puts ``remark`` there).
+    """
+
+    def __init__(self, fp, key):
+        self.fp = fp
+        self.key = key
+        self.extra = {}
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def close(self):
+        self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = self.fp.read(CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos > CHUNK_SIZE:
+            # Drop what has already been consumed so the buffer stays small
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def _skip_ws(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def _expect(self, chars):
+        self._skip_ws()
+        if self._pos >= len(self._buf):
+            raise ValueError(f"Unexpected end of JSON, expected one of {chars!r}")
+        char = self._buf[self._pos]
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _peek(self):
+        self._skip_ws()
+        return self._buf[self._pos] if self._pos < len(self._buf) else ''
+
+    def _value(self):
+        self._skip_ws()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut at the chunk edge ("1.5" of "1.5e10") decodes fine but is
+            # incomplete; only trust a value once the character after it is visible
+            if (end == len(self._buf) or self._buf[end] not in _VALUE_END) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            name = self._value()
+            self._expect(':')
+            if name == self.key:
+                self._expect('[')
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self.extra[name] = self._value()
+            if self._expect(',}') == '}':
+                return
+
+
+def iter_json_array(path, key):
+    """Yield the items of ``document[key]`` from a JSON file on disk."""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from JSONArrayStream(f, key)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Precompiled blocklist matchers for the data cleaning scripts.
+
+- KeywordMatcher folds a keyword list into a trie and compiles it into a
+  single regular expression, so a substring (or whole-word) check costs
+  roughly one pass over the text no matter how many keywords are blocklisted.
+- CoordinateGrid hashes blocklisted points into grid cells the size of the
+  match tolerance, so a lookup only inspects the 3x3 cells around a point
+  instead of scanning every entry.
+"""
+
+import math
+import re
+
+
+def _trie_pattern(node, shortest=True):
+    """Regex source for a trie node ('' key marks the end of a keyword).
+
+    With ``shortest`` a keyword that is a prefix of another ends the branch,
+    which is all a substring search needs; otherwise the longer keywords stay
+    matchable (for whole-word search).
+    """
+    ends = '' in node
+    if ends and shortest:
+        # A keyword ends here, and substring search only needs the shortest match
+        return ''
+    branches = [re.escape(char) + _trie_pattern(child, shortest)
+                for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    return f'(?:{pattern})?' if ends else pattern
+
+
+class KeywordMatcher:
+    """Case-insensitive "does the text contain any of these keywords" check.
+
+    With ``whole_words`` a keyword only matches between word boundaries, so
+    "test" finds "test site" but not "greatest".
+    """
+
+    def __init__(self, keywords, whole_words=False):
+        trie = {}
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        self.keywords = list(keywords)
+        if not trie:
+            self._regex = None
+        elif whole_words:
+            self._regex = re.compile(r'\b' + _trie_pattern(trie, shortest=False) + r'\b')
+        else:
+            self._regex = re.compile(_trie_pattern(trie))
+
+    def search(self, text):
+        """True if ``text`` (already lower-cased) contains any keyword."""
+        return self._regex is not None and self._regex.search(text) is not None
+
+    def find(self, text):
+        """The first keyword found in ``text`` (already lower-cased), or None."""
+        match = self._regex.search(text) if self._regex is not None else None
+        return match.group(0) if match else None
+
+
+class CoordinateGrid:
+    """Points that match when both |dlon| and |dlat| are below ``tolerance``."""
+
+    def __init__(self, points, tolerance):
+        self.tolerance = tolerance
+        self._cells = {}
+        for lon, lat in points:
+            self._cells.setdefault(self._cell(lon, lat), []).append((lon, lat))
+
+    def _cell(self, lon, lat):
+        return (math.floor(lon / self.tolerance), math.floor(lat / self.tolerance))
+
+    def contains(self, lon, lat):
+        """True if a blocklisted point lies within the tolerance of (lon, lat)."""
+        cx, cy = self._cell(lon, lat)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for p_lon, p_lat in self._cells.get((cx + dx, cy + dy), ()):
+                    if abs(lon - p_lon) < self.tolerance and abs(lat - p_lat) < self.tolerance:
+                        return True
+        return False
@@ -181,9 +181,9 @@ async function mergeState(stateCode, merger) {
   const campsitesDir = path.join(__dirname, '../data/campsites');
   const osmDir = path.join(__dirname, '../data/opencampingmap');
 
-  // Load Recreation.gov data
-  const recgovPath = path.join(campsitesDir, `${stateCode}.geojson`);
-  const recgovData = await merger.loadGeoJSON(recgovPath);
+  // Load Recreation.gov data ({ST}.geojson, else the {ST}(1).geojson some states were saved as)
+  const recgovData = await merger.loadGeoJSON(path.join(campsitesDir, `${stateCode}.geojson`))
+    || await merger.loadGeoJSON(path.join(campsitesDir, `${stateCode}(1).geojson`));
 
   // Load OpenStreetMap data
   const osmPath = path.join(osmDir, `${stateCode}.geojson`);
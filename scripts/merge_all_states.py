@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Merge Recreation.gov and OpenStreetMap campsite data into {ST}_merged.geojson.
+
+Python merge engine using the same rules as merge_all_states.js: two sites are
+duplicates when they are within 500 m of each other and either closer than
+100 m or their names are more than 60% similar (Levenshtein). Duplicates are
+folded into the first site seen, unioning amenities, rig types and sources.
+
+Instead of comparing every site against every kept site, kept sites are
+bucketed in a grid of ~500 m cells, so each site is only compared with the
+sites in the 3x3 cells around it. Output is deterministic: Recreation.gov
+sites first, then OSM sites, each in file order.
+
+Usage:
+    python3 scripts/merge_all_states.py               # all 50 states
+    python3 scripts/merge_all_states.py --states "CA OR WA"
+    python3 scripts/merge_all_states.py --jobs 4
+"""
+
+import argparse
+import math
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import geoio
+
+ALL_STATES = [
+    'AK', 'AL', 'AR', 'AZ', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
+    'HI', 'IA', 'ID', 'IL', 'IN', 'KS', 'KY', 'LA', 'MA', 'MD',
+    'ME', 'MI', 'MN', 'MO', 'MS', 'MT', 'NC', 'ND', 'NE', 'NH',
+    'NJ', 'NM', 'NV', 'NY', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
+    'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
+]
+
+CAMPSITES_DIR = Path('data/campsites')
+OSM_DIR = Path('data/opencampingmap')
+
+EARTH_RADIUS_M = 6371e3
+DISTANCE_THRESHOLD_METERS = 500   # Candidates must be closer than this
+SAME_SITE_METERS = 100            # ...and either closer than this
+NAME_SIMILARITY_THRESHOLD = 0.6   # ...or have names at least this similar
+
+# Degrees of latitude per grid cell, slightly over the threshold so no pair is missed
+CELL_DEGREES = math.degrees(DISTANCE_THRESHOLD_METERS / EARTH_RADIUS_M) * 1.01
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return EARTH_RADIUS_M * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def levenshtein(s1, s2):
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current = [i]
+        for j, c2 in enumerate(s2, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (c1 != c2)))
+        previous = current
+    return previous[-1]
+
+
+def name_similarity(name1, name2):
+    """0-1 similarity: 1 - edit distance / length of the longer name."""
+    if not name1 or not name2:
+        return 0
+    s1 = str(name1).lower().strip()
+    s2 = str(name2).lower().strip()
+    if s1 == s2:
+        return 1.0
+    longer = max(len(s1), len(s2))
+    if longer == 0:
+        return 1.0
+    return (longer - levenshtein(s1, s2)) / longer
+
+
+def site_name(props):
+    return props.get('name') or props.get('Name') or ''
+
+
+def point_of(feature):
+    """(lat, lon) of a Point feature, or None if it has no usable coordinates."""
+    coords = (feature.get('geometry') or {}).get('coordinates')
+    if not isinstance(coords, list) or len(coords) < 2:
+        return None
+    lon, lat = coords[0], coords[1]
+    if not isinstance(lon, (int, float)) or not isinstance(lat, (int, float)):
+        return None
+    return lat, lon
+
+
+def are_duplicates(point1, props1, point2, props2):
+    distance = haversine_m(point1[0], point1[1], point2[0], point2[1])
+    if distance >= DISTANCE_THRESHOLD_METERS:
+        return False
+    return (distance < SAME_SITE_METERS
+            or name_similarity(site_name(props1), site_name(props2)) > NAME_SIMILARITY_THRESHOLD)
+
+
+def _union(*lists):
+    """Ordered union of lists, first occurrence wins."""
+    seen = {}
+    for items in lists:
+        for item in items or []:
+            seen.setdefault(geoio.dumps(item), item)
+    return list(seen.values())
+
+
+def _sources(props):
+    sources = props.get('sources')
+    return sources if sources is not None else [props.get('source')]
+
+
+def _length(value):
+    return len(value) if isinstance(value, (str, list)) else None
+
+
+def merge_properties(primary, secondary):
+    """Combine the properties of two duplicate sites, preferring ``primary``."""
+    merged = {
+        'name': site_name(primary) or site_name(secondary),
+        'rating': primary.get('rating') or secondary.get('rating') or None,
+        'reviews_count': max(primary.get('reviews_count') or 0, secondary.get('reviews_count') or 0),
+        'cost': primary.get('cost') or secondary.get('cost') or 0,
+        'amenities': _union(primary.get('amenities'), secondary.get('amenities')),
+        'rig_friendly': _union(primary.get('rig_friendly'), secondary.get('rig_friendly')),
+        'type': primary.get('type') or secondary.get('type') or 'established',
+        'sources': [s for s in _union(_sources(primary), _sources(secondary)) if s],
+    }
+    if not merged['name']:
+        del merged['name']
+
+    # Keep the longer description
+    primary_len = _length(primary.get('description'))
+    secondary_len = _length(secondary.get('description'))
+    if primary_len is not None and secondary_len is not None and primary_len > secondary_len:
+        merged['description'] = primary['description']
+    elif 'description' in secondary:
+        merged['description'] = secondary['description']
+
+    # Keep OSM-specific fields
+    if secondary.get('tourism'):
+        merged['tourism'] = secondary['tourism']
+    if secondary.get('osm_id'):
+        merged['osm_id'] = secondary['osm_id']
+    return merged
+
+
+class SiteGrid:
+    """Kept sites bucketed by ~500 m cells for neighbour lookups."""
+
+    def __init__(self, max_abs_lat):
+        self.lat_step = CELL_DEGREES
+        # Longitude degrees shrink toward the poles; size cells for the widest case
+        self.lon_step = CELL_DEGREES / max(math.cos(math.radians(min(max_abs_lat, 89.0))), 1e-6)
+        self._cells = {}
+
+    def _cell(self, point):
+        return (math.floor(point[0] / self.lat_step), math.floor(point[1] / self.lon_step))
+
+    def add(self, point, index):
+        self._cells.setdefault(self._cell(point), []).append(index)
+
+    def candidates(self, point):
+        """Indices of kept sites that could be within the threshold, in insertion order."""
+        row, col = self._cell(point)
+        found = []
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                found.extend(self._cells.get((row + d_row, col + d_col), ()))
+        return sorted(found)
+
+
+def merge_features(features):
+    """Deduplicate ``features`` in order; returns (unique features, duplicates removed)."""
+    points = [point_of(f) for f in features]
+    max_abs_lat = max((abs(p[0]) for p in points if p), default=0.0)
+    grid = SiteGrid(max_abs_lat)
+
+    unique = []
+    unique_points = []
+    duplicates = 0
+
+    for feature, point in zip(features, points):
+        props = feature.setdefault('properties', {})
+        match = None
+        if point is not None:
+            for index in grid.candidates(point):
+                if are_duplicates(point, props, unique_points[index], unique[index]['properties']):
+                    match = index
+                    break
+
+        if match is not None:
+            duplicates += 1
+            merged = dict(unique[match])
+            merged['properties'] = merge_properties(unique[match]['properties'], props)
+            unique[match] = merged
+            continue
+
+        if props.get('sources') is None:
+            props['sources'] = [props.get('source') or 'unknown']
+        if point is not None:
+            grid.add(point, len(unique))
+        unique.append(feature)
+        unique_points.append(point)
+
+    return unique, duplicates
+
+
+def recreation_gov_path(state_code):
+    """{ST}.geojson, else the {ST}(1).geojson some states were saved as"""
+    for pattern in (f'{state_code}.geojson', f'{state_code}(1).geojson'):
+        path = CAMPSITES_DIR / pattern
+        if path.exists():
+            return path
+    return None
+
+
+def load_features(path):
+    if path is None:
+        return None
+    try:
+        return geoio.read(path).get('features')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def merge_state(state_code):
+    """Merge one state's sources and write its _merged file; None if it has no data."""
+    before = geoio.write_tally()
+    recgov = load_features(recreation_gov_path(state_code))
+    osm = load_features(OSM_DIR / f'{state_code}.geojson')
+    if recgov is None and osm is None:
+        return None
+
+    features = (recgov or []) + (osm or [])
+    unique, duplicates = merge_features(features)
+
+    output_file = CAMPSITES_DIR / f'{state_code}_merged.geojson'
+    geoio.write_features(output_file, unique)
+
+    return {
+        'state': state_code,
+        'recgov': len(recgov) if recgov is not None else None,
+        'osm': len(osm) if osm is not None else None,
+        'before': len(features),
+        'after': len(unique),
+        'duplicates': duplicates,
+        'saved': str(output_file),
+        'writes': geoio.tally_since(before)  # Counted here, since --jobs runs this in worker processes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge Recreation.gov + OpenStreetMap data into {ST}_merged.geojson.')
+    parser.add_argument('--states', help='Space-separated state codes (default: all 50).')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Merge states in this many worker processes (default: 1).')
+    args = parser.parse_args()
+
+    states = args.states.upper().split() if args.states else ALL_STATES
+
+    print('\n' + '=' * 70)
+    print('KAMPTRAIL - MERGE ALL STATES')
+    print('Merging Recreation.gov + OpenStreetMap data')
+    print('=' * 70 + '\n')
+
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            results = list(executor.map(merge_state, states))
+    else:
+        results = map(merge_state, states)
+
+    processed = []
+    for state, result in zip(states, results):
+        print(f'\n[{state}] Processing...')
+        if result is None:
+            print(f'  ⚠️  No data found for {state}')
+            continue
+        processed.append(result)
+        if result['recgov'] is not None:
+            print(f"  ✓ Recreation.gov: {result['recgov']} sites")
+        if result['osm'] is not None:
+            print(f"  ✓ OpenStreetMap: {result['osm']} sites")
+        reduction = (result['duplicates'] / result['before'] * 100) if result['before'] else 0
+        print(f"  ✅ Merged: {result['before']} → {result['after']} sites "
+              f"({result['duplicates']} duplicates removed, {reduction:.1f}% reduction)")
+
+    total_before = sum(r['before'] for r in processed)
+    total_after = sum(r['after'] for r in processed)
+    total_duplicates = sum(r['duplicates'] for r in processed)
+
+    print('\n' + '=' * 70)
+    print('SUMMARY')
+    print('=' * 70)
+    print(f'States processed: {len(processed)}/{len(states)}')
+    writes = {key: sum(r['writes'][key] for r in processed) for key in ('written', 'skipped')}
+    print(f'Merged files: {geoio.write_summary(writes)}')
+    print(f'Total campsites before: {total_before:,}')
+    print(f'Total campsites after: {total_after:,}')
+    print(f'Duplicates removed: {total_duplicates:,}')
+    if total_before:
+        print(f'Overall reduction: {total_duplicates / total_before * 100:.1f}%')
+    print('=' * 70 + '\n')
+
+    print('✅ All states merged successfully!\n')
+
+
+if __name__ == '__main__':
+    main()
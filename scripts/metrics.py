@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Lightweight run metrics for the data scripts, off unless KAMPTRAIL_METRICS is set.
+
+    KAMPTRAIL_METRICS=json          emit JSON when the script exits
+    KAMPTRAIL_METRICS=prometheus    emit Prometheus text exposition format
+    KAMPTRAIL_METRICS_FILE=PATH     write there instead of stderr
+
+The scripts record:
+
+- timers: ``with metrics.timer('fetch', source='osm'):`` adds the block's
+  wall time to a count/sum/max per name and labels (fetch, convert, clean,
+  decode, encode, write); ``laps`` times consecutive pipeline stages
+- histograms: per-endpoint HTTP request latency (``observe``)
+- counters: requests by status, retries, rate-limit waits, Overpass slot
+  waits and splits, bytes in and out (``count``)
+- peak RSS of the process, read once at exit
+
+When off, timer() returns a shared no-op context manager and the other calls
+return at their first line, so instrumented hot paths cost a function call.
+Metrics recorded in worker processes (--jobs) are not collected; the parent's
+timers still cover the whole step.
+
+Usage:
+    KAMPTRAIL_METRICS=json python3 scripts/fetch_osm_data.py --state CO
+    KAMPTRAIL_METRICS=prometheus KAMPTRAIL_METRICS_FILE=metrics.prom python3 scripts/pipeline.py
+"""
+
+import atexit
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+FORMAT_ENV = 'KAMPTRAIL_METRICS'
+FILE_ENV = 'KAMPTRAIL_METRICS_FILE'
+PREFIX = 'kamptrail'
+
+# Request latency buckets in seconds (Overpass queries can take minutes)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_format = os.environ.get(FORMAT_ENV, '').strip().lower()
+if _format in ('1', 'true', 'yes'):
+    _format = 'json'
+ENABLED = _format in ('json', 'prometheus')
+
+_NULL_TIMER = contextlib.nullcontext()
+_lock = threading.Lock()
+_started = time.time()
+_timers = {}      # (name, labels) -> [count, sum, max]
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count], sum
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _add_time(key, elapsed):
+    with _lock:
+        entry = _timers.setdefault(key, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+
+
+class _Timer:
+    __slots__ = ('key', 'started')
+
+    def __init__(self, key):
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _add_time(self.key, time.perf_counter() - self.started)
+
+
+def timer(name, **labels):
+    """Context manager adding the block's wall time to timer ``name``."""
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(_key(name, labels))
+
+
+class _Laps:
+    __slots__ = ('name', 'labels', 'last')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.last = time.perf_counter()
+
+    def __call__(self, **labels):
+        now = time.perf_counter()
+        elapsed, self.last = now - self.last, now
+        _add_time(_key(self.name, {**self.labels, **labels}), elapsed)
+
+
+def _no_lap(**labels):
+    pass
+
+
+def laps(name, **labels):
+    """A function that adds the time since its previous call (or creation) to timer ``name``.
+
+    For consecutive steps that share one function body: ``lap = metrics.laps('stage')``,
+    then ``lap(stage='load')`` after the first step, ``lap(stage='clean')`` after the next.
+    """
+    if not ENABLED:
+        return _no_lap
+    return _Laps(name, labels)
+
+
+def count(name, value=1, **labels):
+    """Add ``value`` to counter ``name``."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    """Record ``seconds`` in the latency histogram ``name``."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        buckets, total = _histograms.get(key) or ([0] * (len(LATENCY_BUCKETS) + 1), 0.0)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        _histograms[key] = (buckets, total + seconds)
+
+
+def endpoint(url):
+    """Label for a request URL: host and path, without the query."""
+    parts = urlsplit(url)
+    return f'{parts.netloc}{parts.path}'
+
+
+def record_request(url, status, seconds, bytes_in=0):
+    """Latency, status and bytes of one HTTP request (status None for connection errors)."""
+    if not ENABLED:
+        return
+    label = endpoint(url)
+    observe('request_seconds', seconds, endpoint=label)
+    count('requests', endpoint=label, status=status if status is not None else 'error')
+    if bytes_in:
+        count('bytes_in', bytes_in, endpoint=label)
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KB on Linux
+
+
+def snapshot():
+    """Everything recorded so far as a JSON-ready dict."""
+    def labelled(key):
+        return {'name': key[0], **dict(key[1])}
+
+    with _lock:
+        return {
+            'script': os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None,
+            'wall_seconds': round(time.time() - _started, 4),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'timers': [{**labelled(key), 'count': c, 'seconds': round(s, 6), 'max_seconds': round(m, 6)}
+                       for key, (c, s, m) in sorted(_timers.items())],
+            'counters': [{**labelled(key), 'value': round(v, 6) if isinstance(v, float) else v}
+                         for key, v in sorted(_counters.items())],
+            'histograms': [{**labelled(key), 'buckets': dict(zip([*map(str, LATENCY_BUCKETS), '+Inf'], b)),
+                            'count': sum(b), 'sum': round(total, 6)}
+                           for key, (b, total) in sorted(_histograms.items())],
+        }
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in labels.values())
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+
+def to_prometheus(data):
+    """The snapshot ``data`` in Prometheus text exposition format."""
+    script = {'script': data['script']} if data['script'] else {}
+    lines = [f'# TYPE {PREFIX}_wall_seconds gauge', f'{PREFIX}_wall_seconds{_labels(script)} {data["wall_seconds"]}']
+    if data['peak_rss_bytes'] is not None:
+        lines += [f'# TYPE {PREFIX}_peak_rss_bytes gauge',
+                  f'{PREFIX}_peak_rss_bytes{_labels(script)} {data["peak_rss_bytes"]}']
+
+    timer_labels = [{**script, 'timer': entry['name'],
+                     **{k: v for k, v in entry.items() if k not in ('name', 'count', 'seconds', 'max_seconds')}}
+                    for entry in data['timers']]
+    if data['timers']:
+        lines.append(f'# TYPE {PREFIX}_timer_seconds summary')
+        for entry, labels in zip(data['timers'], timer_labels):
+            lines.append(f'{PREFIX}_timer_seconds_sum{_labels(labels)} {entry["seconds"]}')
+            lines.append(f'{PREFIX}_timer_seconds_count{_labels(labels)} {entry["count"]}')
+        lines.append(f'# TYPE {PREFIX}_timer_max_seconds gauge')
+        for entry, labels in zip(data['timers'], timer_labels):
+            lines.append(f'{PREFIX}_timer_max_seconds{_labels(labels)} {entry["max_seconds"]}')
+
+    typed = set()
+    for entry in data['counters']:
+        metric = f'{PREFIX}_{entry["name"]}_total'
+        if metric not in typed:
+            lines.append(f'# TYPE {metric} counter')
+            typed.add(metric)
+        labels = {**script, **{k: v for k, v in entry.items() if k not in ('name', 'value')}}
+        lines.append(f'{metric}{_labels(labels)} {entry["value"]}')
+
+    for entry in data['histograms']:
+        metric = f'{PREFIX}_{entry["name"]}'
+        if metric not in typed:
+            lines.append(f'# TYPE {metric} histogram')
+            typed.add(metric)
+        labels = {**script, **{k: v for k, v in entry.items() if k not in ('name', 'buckets', 'count', 'sum')}}
+        cumulative = 0
+        for bound, n in entry['buckets'].items():
+            cumulative += n
+            lines.append(f'{metric}_bucket{_labels({**labels, "le": bound})} {cumulative}')
+        lines.append(f'{metric}_sum{_labels(labels)} {entry["sum"]}')
+        lines.append(f'{metric}_count{_labels(labels)} {entry["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def emit():
+    """Write the metrics in the configured format to KAMPTRAIL_METRICS_FILE or stderr."""
+    if multiprocessing.parent_process() is not None:
+        return  # A --jobs worker; only the main process reports
+    data = snapshot()
+    if _format == 'prometheus':
+        text = to_prometheus(data)
+    else:
+        text = json.dumps(data, indent=2) + '\n'
+    path = os.environ.get(FILE_ENV)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stderr.write(text)
+
+
+if ENABLED:
+    atexit.register(emit)
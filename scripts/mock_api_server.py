@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Overpass and RIDB APIs, for offline load testing.
+
+Serves both APIs from one port:
+
+    /api/interpreter     Overpass (GET or POST, query in "data")
+    /api/v1/facilities   RIDB facilities, paged with limit/offset like RECDATA
+    /stats               request counts, statuses and latency percentiles
+
+Responses are synthetic and seeded. Overpass queries get campsites
+generated per 1 x 1 degree cell (--density per cell), so a bbox and its
+quadrants always return the same elements. RIDB states get --ridb-sites
+facilities each. With --replay, responses recorded in an HTTP cache
+directory (.cache/http by default, written by the fetch scripts) are
+served instead whenever the same query was recorded.
+
+Latency, throttling and failures are configurable:
+
+    --latency lognormal:0.3,0.8   per-response delay (fixed, uniform, normal,
+                                  lognormal or exp; see parse_latency)
+    --rate-limit 50               requests/minute per API key or client, else 429
+    --overpass-slots 2            concurrent Overpass queries per client, else 429
+    --error-rate 0.05             answer with a random 500/502/503/504
+    --reset-rate 0.01             close the connection without answering
+    --overpass-timeout-rate 0.1   Overpass "Query timed out" remark in a 200
+    --overpass-max-area 16        ...and always for bboxes over 16 square degrees
+
+Point the fetchers at it with:
+
+    export OVERPASS_URL=http://127.0.0.1:8089/api/interpreter
+    export RIDB_BASE_URL=http://127.0.0.1:8089/api/v1
+
+The Overpass stand-in ignores the query's filters and "newer:" clause: every
+query gets the campsites in its bbox, in Overpass's output order (nodes,
+then ways, each by id).
+
+Usage:
+    python3 scripts/mock_api_server.py
+    python3 scripts/mock_api_server.py --latency uniform:0.05,0.5 --rate-limit 50 --error-rate 0.02
+"""
+
+import argparse
+import math
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import geoio
+from benchmark import generate_ridb_facilities, site_name
+from fetch_recreation_gov_data import US_STATES
+from httpcache import DEFAULT_CACHE_DIR, HTTPCache, make_key
+from overpass import element_order
+
+DEFAULT_PORT = 8089
+DEFAULT_SEED = 42
+DEFAULT_DENSITY = 20      # Campsites per 1 x 1 degree cell
+DEFAULT_RIDB_SITES = 120  # Facilities per state
+RIDB_MAX_LIMIT = 50       # RIDB caps page size at 50
+RIDB_RECORDED_URL = 'https://ridb.recreation.gov/api/v1/facilities'  # URL in recorded cache keys
+
+OVERPASS_PATH = '/api/interpreter'
+RIDB_PATH = '/api/v1/facilities'
+STATS_PATH = '/stats'
+
+_BBOX_RE = re.compile(r'\((-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)\)')
+TIMEOUT_REMARK = 'runtime error: Query timed out in "query" at line 3 after 60 seconds.'
+ERROR_STATUSES = [500, 502, 503, 504]
+
+
+def parse_latency(spec):
+    """A function rng -> seconds for a latency spec.
+
+    "0.2" or "fixed:0.2", "uniform:LOW,HIGH", "normal:MEAN,SD",
+    "lognormal:MEDIAN,SIGMA" or "exp:MEAN" (all in seconds).
+    """
+    kind, _, args = spec.partition(':') if ':' in spec else ('fixed', '', spec)
+    values = [float(v) for v in args.split(',') if v]
+    if kind == 'fixed' and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == 'uniform' and len(values) == 2:
+        return lambda rng: rng.uniform(*values)
+    if kind == 'normal' and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(*values))
+    if kind == 'lognormal' and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    if kind == 'exp' and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) if values[0] else 0.0
+    raise ValueError(f'bad latency spec: {spec!r}')
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Throttle:
+    """Non-blocking per-client token buckets: ``per_minute`` requests, bursts of one."""
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, client):
+        """0 if ``client`` may proceed now, else the seconds until it may."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (1.0, now))
+            tokens = min(1.0, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[client] = (tokens - 1, now)
+                return 0
+            self._buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+
+class Stats:
+    """Thread-safe request counts and server-side latencies per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.statuses = defaultdict(Counter)
+        self.latencies = defaultdict(list)
+
+    def record(self, endpoint, status, seconds):
+        with self._lock:
+            self.statuses[endpoint][str(status)] += 1
+            self.latencies[endpoint].append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for endpoint, statuses in self.statuses.items():
+                latencies = sorted(self.latencies[endpoint])
+                result[endpoint] = {
+                    'requests': sum(statuses.values()),
+                    'statuses': dict(sorted(statuses.items())),
+                    'latency': {name: round(percentile(latencies, q), 4)
+                                for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))},
+                }
+            return result
+
+
+class MockAPI:
+    """Configuration, synthetic data and stats shared by every request thread."""
+
+    def __init__(self, seed=DEFAULT_SEED, latency='0', error_rate=0.0, reset_rate=0.0, rate_limit=0,
+                 overpass_slots=0, overpass_timeout_rate=0.0, overpass_max_area=None,
+                 density=DEFAULT_DENSITY, ridb_sites=DEFAULT_RIDB_SITES, replay=None):
+        self.seed = seed
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.throttle = Throttle(rate_limit) if rate_limit else None
+        self.overpass_slots = overpass_slots
+        self.overpass_timeout_rate = overpass_timeout_rate
+        self.overpass_max_area = overpass_max_area
+        self.density = density
+        self.ridb_sites = ridb_sites
+        self.replay = HTTPCache(replay, offline=True) if replay else None
+        self.stats = Stats()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._in_flight = Counter()
+        self._slots_lock = threading.Lock()
+
+    def roll(self, method='random', *args):
+        """Draw from the shared seeded RNG (thread-safe)."""
+        with self._rng_lock:
+            return getattr(self._rng, method)(*args)
+
+    def delay(self):
+        with self._rng_lock:
+            return self.latency(self._rng)
+
+    def take_slot(self, client):
+        with self._slots_lock:
+            if self.overpass_slots and self._in_flight[client] >= self.overpass_slots:
+                return False
+            self._in_flight[client] += 1
+            return True
+
+    def release_slot(self, client):
+        with self._slots_lock:
+            self._in_flight[client] -= 1
+
+    def recorded(self, key):
+        """Path of a recorded response body, or None."""
+        if self.replay is None:
+            return None
+        try:
+            return self.replay.get_fresh(key)
+        except Exception:
+            return None
+
+    def cell_elements(self, x, y):
+        """The synthetic campsites of the 1 x 1 degree cell with south-west corner (x, y)."""
+        rng = random.Random(f'{self.seed}:{x}:{y}')
+        base_id = ((x + 180) * 180 + (y + 90)) * 100_000
+        elements = []
+        for i in range(self.density):
+            lon, lat = round(x + rng.random(), 7), round(y + rng.random(), 7)
+            tags = {'tourism': rng.choice(['camp_site', 'camp_site', 'caravan_site']), 'name': site_name(rng)}
+            if rng.random() < 0.75:
+                elements.append({'type': 'node', 'id': base_id + i, 'lat': lat, 'lon': lon, 'tags': tags})
+            else:
+                elements.append({'type': 'way', 'id': base_id + i, 'center': {'lat': lat, 'lon': lon},
+                                 'tags': tags})
+        return elements
+
+    def overpass_elements(self, south, west, north, east):
+        elements = []
+        for x in range(math.floor(west), math.ceil(east)):
+            for y in range(math.floor(south), math.ceil(north)):
+                for element in self.cell_elements(x, y):
+                    point = element.get('center', element)
+                    if south <= point['lat'] < north and west <= point['lon'] < east:
+                        elements.append(element)
+        return sorted(elements, key=element_order)
+
+    @lru_cache(maxsize=None)
+    def state_facilities(self, state):
+        return generate_ridb_facilities(self.ridb_sites, self.seed + list(US_STATES).index(state), state)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    verbose = False
+
+    @property
+    def api(self):
+        return self.server.api
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def handle_request(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if self.command == 'POST':
+            length = int(self.headers.get('Content-Length') or 0)
+            params.update({k: v[-1] for k, v in parse_qs(self.rfile.read(length).decode('utf-8')).items()})
+
+        if url.path == STATS_PATH:
+            return self.send_json(200, self.api.stats.snapshot())
+        if url.path.endswith(OVERPASS_PATH):
+            endpoint, handler = 'overpass', self.overpass
+        elif url.path.endswith(RIDB_PATH):
+            endpoint, handler = 'ridb', self.ridb
+        else:
+            return self.send_json(404, {'error': f'unknown path {url.path}'})
+
+        status = handler(params)
+        self.api.stats.record(endpoint, status, time.perf_counter() - started)
+
+    def client(self):
+        return self.headers.get('apikey') or self.client_address[0]
+
+    def injected_failure(self):
+        """Sleep the configured latency, then apply throttling and failure injection.
+
+        Returns the status already sent (or 'reset'), or None to answer normally.
+        """
+        time.sleep(self.api.delay())
+        if self.api.throttle:
+            wait = self.api.throttle.take(self.client())
+            if wait:
+                self.send_json(429, {'error': 'rate limit exceeded'}, {'Retry-After': str(math.ceil(wait))})
+                return 429
+        if self.api.reset_rate and self.api.roll() < self.api.reset_rate:
+            self.close_connection = True
+            try:
+                self.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            return 'reset'
+        if self.api.error_rate and self.api.roll() < self.api.error_rate:
+            status = self.api.roll('choice', ERROR_STATUSES)
+            self.send_json(status, {'error': 'injected failure'})
+            return status
+        return None
+
+    def overpass(self, params):
+        query = params.get('data', '')
+        client = self.client_address[0]
+        if not self.api.take_slot(client):
+            self.send_json(429, {'error': 'rate_limited: no free slot for this client'})
+            return 429
+        try:
+            failure = self.injected_failure()
+            if failure:
+                return failure
+
+            recorded = self.api.recorded(make_key('overpass', query))
+            if recorded:
+                return self.send_file(recorded)
+
+            match = _BBOX_RE.search(query)
+            if not match:
+                self.send_json(400, {'error': 'no bbox in query'})
+                return 400
+            south, west, north, east = (float(v) for v in match.groups())
+            area = (north - south) * (east - west)
+            timed_out = (self.api.overpass_max_area is not None and area > self.api.overpass_max_area) or \
+                (self.api.overpass_timeout_rate and self.api.roll() < self.api.overpass_timeout_rate)
+            elements = [] if timed_out else self.api.overpass_elements(south, west, north, east)
+            response = {
+                'version': 0.6,
+                'generator': 'kamptrail mock_api_server',
+                'osm3s': {'timestamp_osm_base': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())},
+                'elements': elements,
+            }
+            if timed_out:
+                response['remark'] = TIMEOUT_REMARK
+            return self.send_json(200, response)
+        finally:
+            self.api.release_slot(client)
+
+    def ridb(self, params):
+        if not self.headers.get('apikey'):
+            self.send_json(401, {'error': 'missing apikey header'})
+            return 401
+        failure = self.injected_failure()
+        if failure:
+            return failure
+
+        state = params.get('state', '').upper()
+        limit = min(int(params.get('limit', RIDB_MAX_LIMIT)), RIDB_MAX_LIMIT)
+        offset = int(params.get('offset', 0))
+        # The fetcher's cache key holds the params with their original types
+        recorded = self.api.recorded(make_key('GET', RIDB_RECORDED_URL, {
+            k: int(v) if v.isdigit() else v for k, v in params.items()}))
+        if recorded:
+            return self.send_file(recorded)
+
+        facilities = self.api.state_facilities(state) if state in US_STATES else []
+        page = facilities[offset:offset + limit]
+        return self.send_json(200, {
+            'RECDATA': page,
+            'METADATA': {
+                'RESULTS': {'CURRENT_COUNT': len(page), 'TOTAL_COUNT': len(facilities)},
+                'SEARCH_PARAMETERS': {'QUERY': '', 'LIMIT': limit, 'OFFSET': offset},
+            },
+        })
+
+    def send_json(self, status, obj, headers=None):
+        return self.send_body(status, geoio.dumps(obj), headers)
+
+    def send_file(self, path):
+        with open(path, 'rb') as f:
+            return self.send_body(200, f.read())
+
+    def send_body(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        return status
+
+
+def make_server(api, host='127.0.0.1', port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.api = api
+    return server
+
+
+def print_stats(stats):
+    for endpoint, entry in sorted(stats.items()):
+        statuses = ', '.join(f'{status}: {count:,}' for status, count in entry['statuses'].items())
+        latency = entry['latency']
+        print(f"  {endpoint:9s} {entry['requests']:7,} requests ({statuses})  "
+              f"p50 {latency['p50']:.3f}s  p95 {latency['p95']:.3f}s  p99 {latency['p99']:.3f}s  "
+              f"max {latency['max']:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve stand-in Overpass and RIDB APIs for offline load testing.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'(default: {DEFAULT_PORT})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'(default: {DEFAULT_SEED})')
+    parser.add_argument('--latency', default='0',
+                        help='Response delay: SECONDS, uniform:LOW,HIGH, normal:MEAN,SD, '
+                             'lognormal:MEDIAN,SIGMA or exp:MEAN (default: 0).')
+    parser.add_argument('--rate-limit', type=int, default=0,
+                        help='Requests per minute per API key (or client IP) before 429s; 0 = unlimited.')
+    parser.add_argument('--overpass-slots', type=int, default=0,
+                        help='Concurrent Overpass queries per client IP before 429s; 0 = unlimited.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction answered with a 5xx error.')
+    parser.add_argument('--reset-rate', type=float, default=0.0, help='Fraction closed without an answer.')
+    parser.add_argument('--overpass-timeout-rate', type=float, default=0.0,
+                        help='Fraction of Overpass queries answered with a "Query timed out" remark.')
+    parser.add_argument('--overpass-max-area', type=float,
+                        help='Square degrees above which an Overpass query always times out.')
+    parser.add_argument('--density', type=int, default=DEFAULT_DENSITY,
+                        help=f'Synthetic campsites per 1 x 1 degree cell (default: {DEFAULT_DENSITY}).')
+    parser.add_argument('--ridb-sites', type=int, default=DEFAULT_RIDB_SITES,
+                        help=f'Synthetic RIDB facilities per state (default: {DEFAULT_RIDB_SITES}).')
+    parser.add_argument('--replay', nargs='?', const=DEFAULT_CACHE_DIR, metavar='CACHE_DIR',
+                        help=f'Serve responses recorded in this HTTP cache when present (default: {DEFAULT_CACHE_DIR}).')
+    parser.add_argument('--verbose', action='store_true', help='Log every request.')
+    args = parser.parse_args()
+
+    try:
+        api = MockAPI(args.seed, args.latency, args.error_rate, args.reset_rate, args.rate_limit,
+                      args.overpass_slots, args.overpass_timeout_rate, args.overpass_max_area,
+                      args.density, args.ridb_sites, args.replay)
+    except ValueError as e:
+        parser.error(str(e))
+    Handler.verbose = args.verbose
+    server = make_server(api, args.host, args.port)
+    base = f'http://{args.host}:{server.server_address[1]}'
+
+    print('=' * 70)
+    print(f'MOCK OVERPASS + RIDB API on {base}')
+    print('=' * 70)
+    print(f'  export OVERPASS_URL={base}{OVERPASS_PATH}')
+    print(f'  export RIDB_BASE_URL={base}{RIDB_PATH.rsplit("/", 1)[0]}')
+    print(f'  Stats: {base}{STATS_PATH}  (Ctrl-C to stop)')
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print()
+        print_stats(api.stats.snapshot())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Precompute the nearest dump stations, water and propane for every campsite.
+
+Reads the POI file built by fetch_osm_poi.py / update_poi_data.py and adds
+a compact "nearby_services" property to every feature in data/campsites and
+data/opencampingmap:
+
+    "nearby_services": {
+      "dump":    [[2.4, -121.51, 38.22, "Name"], ...],   # [km, lon, lat, name]
+      "water":   [...],
+      "propane": [...]
+    }
+
+Each list holds the k nearest POIs of that type (default 3), closest first,
+with great-circle distances in km rounded to 0.1. Types with no POIs are
+left out. A site's own POI (a campground tagged with a dump station or
+water, matched on OSM id, on coordinates within SELF_METRES, or on its
+name within SAME_NAME_METRES) is never listed as its own nearest service. Distances are measured from the site's coordinates as publish.py
+rounds them, so they match the coordinates in the published files.
+
+Sites are handled in blocks (one per 1 x 1 degree cell). Each block gets a
+vectorized haversine matrix against only the POIs in a search box around
+it; the box grows until every site's k-th neighbour is provably closer than
+anything outside it, so results are exact while the national POI set still
+takes seconds rather than a Python double loop. Needs numpy.
+
+Usage:
+    python3 scripts/nearest_services.py
+    python3 scripts/nearest_services.py --k 5
+"""
+
+import argparse
+import glob
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+
+import geoio
+from publish import COORD_DECIMALS
+
+POI_PATH = Path('data/poi_dump_water_propane.geojson')
+SERVICE_TYPES = ['dump', 'water', 'propane']
+PROPERTY = 'nearby_services'
+DEFAULT_K = 3
+EARTH_RADIUS_KM = 6371.0
+BLOCK_DEGREES = 1.0          # Sites are searched together per 1 x 1 degree cell
+START_RADIUS_DEGREES = 0.5   # ~55 km; doubled until every site in the cell has k exact neighbours
+SELF_METRES = 5              # A POI this close to a site is the site itself
+SAME_NAME_METRES = 250       # ... and so is a POI this close that carries the site's name
+SELF_CANDIDATES = 2          # Extra neighbours fetched first to stand in for the site's own POIs
+
+
+def campsite_files():
+    return sorted(Path(p) for p in glob.glob('data/campsites/*.geojson') + glob.glob('data/opencampingmap/*.geojson'))
+
+
+def point_of(feature):
+    coords = (feature.get('geometry') or {}).get('coordinates')
+    if not isinstance(coords, list) or len(coords) < 2:
+        return None
+    lon, lat = coords[0], coords[1]
+    if isinstance(lon, bool) or isinstance(lat, bool) or not isinstance(lon, (int, float)) \
+            or not isinstance(lat, (int, float)):
+        return None
+    return lon, lat
+
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def lon_gap(lons, west, east):
+    """Degrees of longitude between each of ``lons`` and the interval [west, east], across the antimeridian."""
+    gaps = [np.maximum(0.0, np.maximum(west - (lons + shift), (lons + shift) - east)) for shift in (-360, 0, 360)]
+    return np.minimum.reduce(gaps)
+
+
+class ServiceIndex:
+    """The POIs of one type, ready for blockwise nearest-k queries."""
+
+    def __init__(self, pois):
+        self.lons = np.array([p[0] for p in pois], dtype=np.float64)
+        self.lats = np.array([p[1] for p in pois], dtype=np.float64)
+        self.names = [p[2] for p in pois]
+        self.osm_ids = [p[3] for p in pois]
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidates(self, west, south, east, north, radius):
+        """POIs that may be within ``radius`` degrees of arc of the box; every other POI is farther."""
+        max_lat = max(abs(south), abs(north))
+        cos_lat = math.cos(math.radians(min(90.0, max_lat)))
+        sin_r = math.sin(math.radians(min(90.0, radius)))
+        # From latitude <= max_lat, a point dlon away is at least asin(cos(lat) * sin(dlon)) away
+        if radius >= 90 or sin_r >= cos_lat:
+            lon_radius = 180.0
+        else:
+            lon_radius = math.degrees(math.asin(sin_r / cos_lat))
+        mask = (self.lats >= south - radius) & (self.lats <= north + radius)
+        if lon_radius < 180:
+            mask &= lon_gap(self.lons, west, east) <= lon_radius
+        return np.flatnonzero(mask)
+
+    def nearest(self, lons, lats, k):
+        """(indices, distances_km), each shaped (len(lons), min(k, len(self))), closest first."""
+        k = min(k, len(self))
+        indices = np.empty((len(lons), k), dtype=np.int64)
+        distances = np.empty((len(lons), k), dtype=np.float64)
+
+        # Sites in the same BLOCK_DEGREES cell share one candidate search
+        cells = np.floor(lons / BLOCK_DEGREES) * 100_000 + np.floor(lats / BLOCK_DEGREES)
+        order = np.argsort(cells, kind='stable')
+        bounds = np.flatnonzero(np.diff(cells[order])) + 1
+        for block in np.split(order, bounds):
+            block_lons = lons[block]
+            block_lats = lats[block]
+            box = (block_lons.min(), block_lats.min(), block_lons.max(), block_lats.max())
+
+            radius = START_RADIUS_DEGREES
+            while True:
+                found = self.candidates(*box, radius)
+                if len(found) >= k:
+                    d = haversine_km(block_lons[:, None], block_lats[:, None],
+                                     self.lons[found], self.lats[found])
+                    if k < len(found):
+                        top = np.argpartition(d, k - 1, axis=1)[:, :k]
+                    else:
+                        top = np.broadcast_to(np.arange(k), (len(block), k))
+                    top_d = np.take_along_axis(d, top, axis=1)
+                    # Exact once every site's k-th neighbour is closer than anything outside the search box
+                    if len(found) == len(self) or top_d.max() <= math.radians(radius) * EARTH_RADIUS_KM:
+                        break
+                radius *= 2
+
+            rank = np.argsort(top_d, axis=1, kind='stable')
+            indices[block] = found[np.take_along_axis(top, rank, axis=1)]
+            distances[block] = np.take_along_axis(top_d, rank, axis=1)
+        return indices, distances
+
+
+def load_services(poi_doc):
+    """{type: ServiceIndex} for every service type present in the POI document."""
+    pois = {t: [] for t in SERVICE_TYPES}
+    for feature in poi_doc.get('features', []):
+        props = feature.get('properties') or {}
+        point = point_of(feature)
+        if point is not None and props.get('type') in pois:
+            pois[props['type']].append((point[0], point[1], props.get('name'), props.get('osm_id')))
+    return {t: ServiceIndex(p) for t, p in pois.items() if p}
+
+
+def is_own_poi(index, i, metres, site_osm_id, site_name):
+    """True when POI ``i`` of ``index`` is the campsite itself, not a separate service."""
+    if metres < SELF_METRES:
+        return True
+    if site_osm_id is not None and index.osm_ids[i] == site_osm_id:
+        return True
+    return bool(site_name) and metres < SAME_NAME_METRES and index.names[i] == site_name
+
+
+def annotate(docs, services, k=DEFAULT_K):
+    """Set PROPERTY on every located feature of ``docs`` ({path: doc}).
+
+    All files are searched in one batch. Returns {path: features changed}.
+    """
+    located = []
+    for path, doc in docs.items():
+        for feature in doc.get('features', []):
+            point = point_of(feature)
+            if point is not None:
+                located.append((path, feature, point))
+    changed = dict.fromkeys(docs, 0)
+    if not located:
+        return changed
+    lons = np.round(np.array([p[0] for _, _, p in located], dtype=np.float64), COORD_DECIMALS)
+    lats = np.round(np.array([p[1] for _, _, p in located], dtype=np.float64), COORD_DECIMALS)
+
+    site_props = [f.get('properties') or {} for _, f, _ in located]
+
+    results = [{} for _ in located]
+    for service_type, index in services.items():
+        pending = np.arange(len(located))
+        want = k + SELF_CANDIDATES
+        while len(pending):
+            indices, distances = index.nearest(lons[pending], lats[pending], want)
+            short = []
+            for row, site in enumerate(pending.tolist()):
+                props = site_props[site]
+                nearby = [
+                    [round(d, 1), float(index.lons[i]), float(index.lats[i]), index.names[i]]
+                    for i, d in zip(indices[row].tolist(), distances[row].tolist())
+                    if not is_own_poi(index, i, d * 1000, props.get('osm_id'), props.get('name'))
+                ]
+                results[site][service_type] = nearby[:k]
+                # Every fetched neighbour may have been a copy of the site; look further out
+                if len(nearby) < k and want < len(index):
+                    short.append(site)
+            pending = np.array(short, dtype=np.int64)
+            want *= 2
+
+    for (path, feature, _), result in zip(located, results):
+        props = feature.setdefault('properties', {})
+        if props.get(PROPERTY) != result:
+            props[PROPERTY] = result
+            changed[path] += 1
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add the nearest dump/water/propane POIs to every campsite.')
+    parser.add_argument('--k', type=int, default=DEFAULT_K,
+                        help=f'POIs of each type to keep per site (default: {DEFAULT_K}).')
+    args = parser.parse_args()
+
+    print('=' * 70)
+    print(f'NEAREST SERVICES (k={args.k})')
+    print('=' * 70)
+
+    try:
+        services = load_services(geoio.read(POI_PATH))
+    except (OSError, ValueError) as e:
+        print(f'❌ Could not read {POI_PATH}: {e}')
+        return
+    for service_type, index in services.items():
+        print(f'  {service_type}: {len(index):,} POIs')
+    print()
+
+    docs = {}
+    for path in campsite_files():
+        try:
+            docs[path] = geoio.read(path)
+        except (OSError, ValueError) as e:
+            print(f'  ⚠️  Skipping {path}: {e}')
+
+    started = time.perf_counter()
+    changed = annotate(docs, services, args.k)
+    elapsed = time.perf_counter() - started
+
+    for path, count in changed.items():
+        if count:
+            geoio.write(path, docs[path])
+            print(f"  ✓ {path}: {count:,} of {len(docs[path].get('features', [])):,} sites updated")
+
+    sites = sum(len(doc.get('features', [])) for doc in docs.values())
+    files_written = sum(1 for count in changed.values() if count)
+    print()
+    print(f'✅ {sites:,} sites checked in {elapsed:.1f}s, {files_written} files updated')
+    print(f'💾 {geoio.write_summary()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Shared Overpass API client for the OSM fetch scripts.
+
+Spreads queries across a pool of public Overpass mirrors. Each mirror gets
+its own keep-alive session and a cap on how many queries may be in flight
+against it at once, so callers can fan out across threads without hammering
+any single server.
+
+The mirror list can be replaced, e.g. with a local mock_api_server.py, by
+setting OVERPASS_URL (comma-separated URLs) or passing --overpass-url to
+the fetch scripts.
+"""
+
+import heapq
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import geoio
+import metrics
+from httpcache import CacheMiss, HTTPCache, make_key
+from jsonstream import JSONArrayStream
+
+# Public Overpass API mirrors, in order of preference
+OVERPASS_MIRRORS = [
+    "https://overpass-api.de/api/interpreter",
+    "https://overpass.kumi.systems/api/interpreter",
+    "https://overpass.openstreetmap.ru/api/interpreter"
+]
+
+# Comma-separated endpoint URLs that replace OVERPASS_MIRRORS when set
+OVERPASS_URL_ENV = 'OVERPASS_URL'
+
+# Most public mirrors allow about two concurrent slots per client IP
+DEFAULT_PER_MIRROR = 2
+
+# How many times a bbox may be split into quadrants (4**3 = 64 tiles at most)
+DEFAULT_MAX_DEPTH = 3
+
+# Overpass prints the elements of each type in turn, in id order
+ELEMENT_TYPES = ('node', 'way', 'relation')
+
+REMARK_TAIL_BYTES = 4096
+_REMARK_RE = re.compile(r'"remark"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+class Mirror:
+    """A single Overpass endpoint with its own pooled session."""
+
+    def __init__(self, url, max_concurrent):
+        self.url = url
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.failures = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrent)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @property
+    def has_slot(self):
+        return self.in_flight < self.max_concurrent
+
+
+class MirrorPool:
+    """Thread-safe pool of Overpass mirrors with per-mirror concurrency caps.
+
+    ``query`` blocks until some mirror has a free slot, prefers the most
+    reliable (then least loaded) mirror, and falls over to the next mirror
+    when one errors out. ``capacity`` is the total number of queries the
+    pool will run at once and is the natural worker count for callers.
+
+    With an HTTPCache, responses are keyed by query text so every mirror
+    shares one entry, and fresh or offline hits never take a mirror slot.
+    Without one, responses still go to disk, in a scratch directory that is
+    removed along with the pool.
+    """
+
+    def __init__(self, mirrors=None, per_mirror=DEFAULT_PER_MIRROR, timeout=200, cache=None):
+        urls = mirrors or default_mirrors()
+        self.mirrors = [Mirror(url, per_mirror) for url in urls]
+        self.timeout = timeout
+        if cache is None:
+            self._scratch = tempfile.TemporaryDirectory(prefix='overpass-')
+            cache = HTTPCache(self._scratch.name, ttl=0)
+        self.cache = cache
+        self._cond = threading.Condition()
+
+    @property
+    def capacity(self):
+        return sum(m.max_concurrent for m in self.mirrors)
+
+    def _acquire(self, exclude):
+        started = time.perf_counter()
+        with self._cond:
+            while True:
+                candidates = [m for m in self.mirrors if m not in exclude and m.has_slot]
+                if candidates:
+                    mirror = min(candidates, key=lambda m: (m.failures, m.in_flight))
+                    mirror.in_flight += 1
+                    metrics.count('overpass_slot_wait_seconds', time.perf_counter() - started)
+                    return mirror
+                self._cond.wait()
+
+    def _release(self, mirror, failed=False):
+        with self._cond:
+            mirror.in_flight -= 1
+            if failed:
+                mirror.failures += 1
+            self._cond.notify_all()
+
+    def query_path(self, query, label='query', split_on_overload=False):
+        """Run an Overpass QL query, trying each mirror at most once.
+
+        The response body is streamed to disk (the HTTP cache, or a scratch
+        cache when none was given) and its path is returned, so callers can
+        parse it incrementally. Returns None if every mirror failed (or,
+        offline, if the query was never cached).
+
+        With ``split_on_overload``, a server-side timeout or out-of-memory
+        error raises QueryTooLarge immediately instead of retrying the same
+        query elsewhere, and so does an offline cache miss (the area may have
+        been fetched as tiles last time).
+        """
+        key = make_key('overpass', query)
+        try:
+            cached = self.cache.get_fresh(key)
+        except CacheMiss:
+            if split_on_overload:
+                raise QueryTooLarge('not in the HTTP cache (offline)')
+            print(f"❌ {label}: not in the HTTP cache (offline)")
+            return None
+        if cached:
+            return cached
+
+        tried = set()
+        while len(tried) < len(self.mirrors):
+            mirror = self._acquire(tried)
+            failed = True
+            try:
+                path = self.cache.fetch(mirror.session, mirror.url, key=key,
+                                        params={'data': query}, timeout=self.timeout)
+                remark = response_remark(path)
+                if remark and 'error' in remark:
+                    # Overpass reports runtime errors (timeouts, memory) in a 200 response
+                    self.cache.invalidate(key)
+                    if split_on_overload and is_overload(remark):
+                        failed = False  # The mirror is fine; the query is too big
+                        raise QueryTooLarge(remark)
+                    raise ValueError(remark)
+                failed = False
+                return path
+            except requests.exceptions.RequestException as e:
+                # A connect timeout means the mirror is unreachable: fail over rather than split
+                overloaded = isinstance(e, requests.exceptions.ReadTimeout) or (
+                    e.response is not None and e.response.status_code == 504)
+                if split_on_overload and overloaded:
+                    failed = False
+                    raise QueryTooLarge(str(e)) from e
+                print(f"⚠️ {label}: {mirror.url} failed: {e}")
+                tried.add(mirror)
+                metrics.count('retries', endpoint=metrics.endpoint(mirror.url), reason='request')
+            except ValueError as e:
+                print(f"⚠️ {label}: {mirror.url} failed: {e}")
+                tried.add(mirror)
+                metrics.count('retries', endpoint=metrics.endpoint(mirror.url), reason='remark')
+            finally:
+                self._release(mirror, failed)
+
+        print(f"❌ {label}: all mirrors failed")
+        return None
+
+    def query(self, query, label='query'):
+        """Like query_path, but returns the decoded JSON response."""
+        path = self.query_path(query, label)
+        if path is None:
+            return None
+        return geoio.read(path)
+
+    def iter_elements(self, query, label='query'):
+        """Like query_path, but returns a JSONArrayStream over the response's elements.
+
+        Use the stream as a context manager so its file is closed.
+        """
+        path = self.query_path(query, label)
+        if path is None:
+            return None
+        return JSONArrayStream(open(path, 'r', encoding='utf-8'), 'elements')
+
+    def tiled_paths(self, build_query, bbox, label='query', max_depth=DEFAULT_MAX_DEPTH):
+        """Fetch ``build_query(bbox)``, splitting the bbox into quadrants on overload.
+
+        Quadrants are fetched in parallel and split again as needed, up to
+        ``max_depth`` levels. Returns the response paths in quadtree order,
+        or None if any part of the area could not be fetched (a partial
+        result would silently drop sites).
+        """
+        try:
+            path = self.query_path(build_query(bbox), label, split_on_overload=max_depth > 0)
+            return None if path is None else [path]
+        except QueryTooLarge as e:
+            print(f"✂️ {label}: {e}; splitting {bbox} into quadrants")
+            metrics.count('overpass_splits')
+
+        tiles = split_bbox(bbox)
+        with ThreadPoolExecutor(max_workers=len(tiles)) as executor:
+            results = list(executor.map(
+                lambda tile: self.tiled_paths(build_query, tile[1], f'{label}/{tile[0]}', max_depth - 1),
+                enumerate(tiles)
+            ))
+
+        if any(result is None for result in results):
+            return None
+        return [path for result in results for path in result]
+
+    def iter_tiled_elements(self, build_query, bbox, label='query', max_depth=DEFAULT_MAX_DEPTH, ordered=True):
+        """Like tiled_paths, but returns a TiledElements stream (or None).
+
+        Pass ``ordered=False`` for queries with more than one ``out`` statement
+        (see TiledElements).
+        """
+        paths = self.tiled_paths(build_query, bbox, label, max_depth)
+        if paths is None:
+            return None
+        return TiledElements(paths, ordered)
+
+
+def default_mirrors():
+    """The endpoints from OVERPASS_URL when set, else the public mirrors."""
+    urls = [url.strip() for url in os.environ.get(OVERPASS_URL_ENV, '').split(',') if url.strip()]
+    return urls or OVERPASS_MIRRORS
+
+
+def add_mirror_arguments(parser):
+    """Add the shared --overpass-url option to an argparse parser."""
+    parser.add_argument('--overpass-url', action='append', metavar='URL',
+                        help=f'Overpass endpoint to use instead of the public mirrors (repeatable; '
+                             f'default: ${OVERPASS_URL_ENV} or the public mirrors).')
+
+
+class QueryTooLarge(Exception):
+    """An Overpass query hit a server-side timeout or memory limit."""
+
+
+def element_order(element):
+    """Sort key of Overpass's own output order: nodes, then ways, then relations, each by id."""
+    element_type = element.get('type')
+    rank = ELEMENT_TYPES.index(element_type) if element_type in ELEMENT_TYPES else len(ELEMENT_TYPES)
+    return rank, element.get('id') or 0
+
+
+class TiledElements:
+    """Elements from several tile responses, merged in element_order and deduplicated.
+
+    Every response is already in element_order, so the tiles are merged as
+    they are parsed and the result is in the same order as a single query
+    for the whole bbox would give, without holding the elements in memory.
+    Ways and relations that straddle tile edges come back from every tile
+    they touch; in the merged order the copies are adjacent and only the
+    first is yielded. ``extra`` mirrors a single response's top-level
+    members, with ``osm3s.timestamp_osm_base`` set to the oldest tile
+    timestamp so watermarks never skip changes.
+
+    A response with several ``out`` statements (the incremental query's
+    changed bodies, then ``out ids``) is several sorted blocks, not one, so
+    with ``ordered=False`` the tiles are read one after another instead and
+    only the first copy of each (type, id) is yielded. Each tile lists its
+    changed bodies before its ids, so that copy is the full one.
+    """
+
+    def __init__(self, paths, ordered=True):
+        self.paths = paths
+        self.ordered = ordered
+        self.extra = {}
+
+    def __iter__(self):
+        files = [open(path, 'r', encoding='utf-8') for path in self.paths]
+        try:
+            streams = [JSONArrayStream(f, 'elements') for f in files]
+            if self.ordered:
+                yield from self._merged(streams)
+            else:
+                yield from self._concatenated(streams)
+        finally:
+            for f in files:
+                f.close()
+
+        timestamps = []
+        for stream in streams:
+            if not self.extra:
+                self.extra = stream.extra
+            timestamp = stream.extra.get('osm3s', {}).get('timestamp_osm_base')
+            if timestamp:
+                timestamps.append(timestamp)
+        if timestamps:
+            self.extra.setdefault('osm3s', {})['timestamp_osm_base'] = min(timestamps)
+
+    @staticmethod
+    def _merged(streams):
+        last = None
+        for element in heapq.merge(*streams, key=element_order):
+            key = (element.get('type'), element.get('id'))
+            if key == last:
+                continue
+            last = key
+            yield element
+
+    @staticmethod
+    def _concatenated(streams):
+        seen = set()
+        for stream in streams:
+            for element in stream:
+                key = (element.get('type'), element.get('id'))
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield element
+
+    def close(self):
+        # Each tile file is opened and closed during iteration
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def split_bbox(bbox):
+    """Split an Overpass "south,west,north,east" bbox string into four quadrants."""
+    south, west, north, east = (float(v) for v in bbox.split(','))
+    mid_lat = (south + north) / 2
+    mid_lon = (west + east) / 2
+    return [
+        _format_bbox(south, west, mid_lat, mid_lon),
+        _format_bbox(south, mid_lon, mid_lat, east),
+        _format_bbox(mid_lat, west, north, mid_lon),
+        _format_bbox(mid_lat, mid_lon, north, east)
+    ]
+
+
+def _format_bbox(*values):
+    return ','.join(f'{v:.6f}'.rstrip('0').rstrip('.') for v in values)
+
+
+def is_overload(remark):
+    """True if an Overpass remark reports a timeout or memory exhaustion."""
+    remark = remark.lower()
+    return 'timed out' in remark or 'out of memory' in remark
+
+
+def response_remark(path):
+    """Return the ``remark`` of an Overpass JSON response on disk, if any.
+
+    Overpass writes the remark after the elements, so only the tail is read.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - REMARK_TAIL_BYTES))
+        tail = f.read().decode('utf-8', errors='replace')
+    match = _REMARK_RE.search(tail)
+    return json.loads(f'"{match.group(1)}"') if match else None
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Single-pass campsite data pipeline.
+
+Loads each GeoJSON file once and runs the clean/extract/audit steps as stages
+over the in-memory features, writing every output file at most once:
+
+  placeholders  - placeholder/test data removal (rules from clean_placeholders.py)
+  low_quality   - unnamed/generic/unknown-type removal (rules from clean_low_quality.py)
+  water_poi     - water stations from Recreation.gov files into the POI file
+                  (rules from update_poi_data.py; dump/propane POIs are kept),
+                  written with its data/poi/ viewport shards (poi_shards.py)
+  services      - nearest dump/water/propane POIs on every campsite
+                  (nearest_services.py)
+  publish       - minified copies of the merged files in data/published/,
+                  with per-file byte budgets (publish.py)
+  spatial_index - published files reordered by geohash, byte ranges in index.json
+                  (build_spatial_index.py)
+  tiles         - z/x/y map tiles of the published campsite data (build_tiles.py)
+  clusters      - per-zoom cluster pyramid of the published campsite data (build_clusters.py)
+  columnar      - KTC1 exports of the published files and the POI file (export_columnar.py)
+  artifacts     - content-hashed, precompressed copies of the map data under
+                  data/dist/ (build_artifacts.py)
+  audit         - the audit_campsite_data.py report, run on the cleaned data
+
+Usage:
+    python3 scripts/pipeline.py                         # every stage, every file
+    python3 scripts/pipeline.py --stages low_quality,audit
+    python3 scripts/pipeline.py --skip audit            # every stage but the audit
+    python3 scripts/pipeline.py --changed data/opencampingmap/CA.geojson
+    python3 scripts/pipeline.py --since origin/main     # whatever a git diff touched
+
+With --changed/--since only the affected stages run: the cleaning stages
+touch just the changed data files (or every file, if that stage's rules
+changed), and water_poi/audit run only when one of their inputs changed.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+import build_artifacts
+import build_clusters
+import build_spatial_index
+import build_tiles
+import export_columnar
+import geoio
+import metrics
+import nearest_services
+import poi_shards
+import publish
+from audit_campsite_data import run_audit
+from clean_low_quality import is_low_quality
+from clean_placeholders import is_placeholder
+from update_poi_data import water_features, water_source_files
+
+STAGES = ['placeholders', 'low_quality', 'water_poi', 'services', 'publish', 'spatial_index', 'tiles', 'clusters',
+          'columnar', 'artifacts', 'audit']
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+POI_PATH = Path('data/poi_dump_water_propane.geojson')
+
+# Scripts whose rules each stage reuses; editing one re-runs that stage over all its inputs
+STAGE_SOURCES = {
+    'placeholders': {'scripts/clean_placeholders.py'},
+    'low_quality': {'scripts/clean_low_quality.py'},
+    'water_poi': {'scripts/update_poi_data.py', 'scripts/poi_shards.py'},
+    'services': {'scripts/nearest_services.py'},
+    'publish': {'scripts/publish.py', 'scripts/columnar.py'},
+    'spatial_index': {'scripts/build_spatial_index.py'},
+    'tiles': {'scripts/build_tiles.py'},
+    'clusters': {'scripts/build_clusters.py'},
+    'columnar': {'scripts/export_columnar.py', 'scripts/columnar.py'},
+    'artifacts': {'scripts/build_artifacts.py'},
+    'audit': {'scripts/audit_campsite_data.py'},
+}
+PIPELINE_SOURCES = {'scripts/pipeline.py', 'scripts/geoio.py', 'scripts/jsonstream.py'}
+
+# Per-feature filters for the cleaning stages
+FILTERS = {
+    'placeholders': is_placeholder,
+    'low_quality': is_low_quality,
+}
+
+# Stages that read their inputs from disk after the other stages have written them
+FILE_STAGES = {'columnar', 'artifacts'}
+
+
+def all_data_files():
+    """Every GeoJSON file the cleaning scripts scan"""
+    return [Path(p) for p in geoio.source_files()]
+
+
+def audit_files():
+    """Files the audit may read (it picks per-state files from these two directories)"""
+    return sorted(Path('data/campsites').glob('*.geojson')) + sorted(Path('data/opencampingmap').glob('*.geojson'))
+
+
+def stage_inputs(stage):
+    if stage in FILTERS:
+        return all_data_files()
+    if stage == 'water_poi':
+        return water_source_files()
+    if stage == 'services':
+        return nearest_services.campsite_files()
+    if stage == 'artifacts':
+        return build_artifacts.artifact_files()
+    if stage == 'publish':
+        return publish.merged_files()
+    if stage == 'columnar':
+        return [publish.published_path(path) for path in publish.merged_files()] + [POI_PATH]
+    if stage in ('spatial_index', 'tiles', 'clusters'):
+        return [publish.published_path(path) for path in publish.merged_files()]
+    return audit_files()
+
+
+def git_changed_files(rev):
+    """Paths changed between ``rev`` and the working tree"""
+    output = subprocess.run(['git', 'diff', '--name-only', rev, '--'],
+                            check=True, capture_output=True, text=True).stdout
+    return output.split()
+
+
+def plan(stages, changed):
+    """Decide which files each selected stage runs over.
+
+    Returns {stage: [paths]}; stages with nothing to do are left out.
+    ``changed`` is None for a full run.
+    """
+    if changed is None or PIPELINE_SOURCES & set(changed):
+        return {stage: stage_inputs(stage) for stage in stages}
+
+    changed = set(changed)
+    changed_data = {Path(p) for p in changed if p.endswith('.geojson')}
+    rules_changed = {stage for stage in STAGES if STAGE_SOURCES[stage] & changed}
+
+    work = {}
+    for stage in stages:
+        inputs = stage_inputs(stage)
+        if stage in rules_changed:
+            work[stage] = inputs
+        elif stage == 'services' and (POI_PATH in changed_data or 'water_poi' in work):
+            # New POIs can move every site's nearest services
+            work[stage] = inputs
+        elif stage in FILTERS or stage in ('services', 'publish'):
+            # Cleaning, nearest services and publishing are per file, so only the changed files need them;
+            # publish also re-minifies whatever the cleaning and services stages may have rewritten
+            touched = changed_data
+            if stage == 'publish':
+                touched = touched.union(*(work.get(s, ()) for s in (*FILTERS, 'services')))
+            targets = [p for p in inputs if p in touched]
+            if targets:
+                work[stage] = targets
+        elif changed_data & set(inputs) or rules_changed & set(FILTERS):
+            # Aggregate stages read all their inputs once any of them (or the cleaning rules) changed
+            work[stage] = inputs
+        elif stage in ('spatial_index', 'tiles', 'clusters', 'columnar') and 'publish' in work:
+            # The publish stage rewrites published files, so their byte offsets, tiles and exports are stale
+            work[stage] = inputs
+        elif stage == 'columnar' and 'water_poi' in work:
+            work[stage] = inputs
+        elif stage == 'artifacts' and work:
+            # Whatever the earlier stages rewrote needs new hashed copies
+            work[stage] = inputs
+    return work
+
+
+def run_pipeline(stages, changed=None):
+    work = plan(stages, changed)
+    if not work:
+        print('✅ Nothing to do - no selected stage is affected by the changes')
+        return 0
+
+    lap = metrics.laps('stage')
+
+    # 1. Load every file any stage needs, exactly once (the publish stage makes its own outputs,
+    #    and the columnar and artifacts stages read the written files themselves)
+    publishing = {publish.published_path(path) for path in work.get('publish', ())}
+    needed = sorted({path for stage, paths in work.items() if stage not in FILE_STAGES for path in paths}
+                    - publishing)
+    docs = {}
+    load_errors = {}
+    for path in needed:
+        try:
+            docs[path] = geoio.read(path)
+        except Exception as e:
+            load_errors[path] = e
+            print(f"Error processing {path}: {e}")
+
+    lap(stage='load')
+
+    dirty = set()
+    removed = {}
+
+    # 2. Cleaning stages filter features in memory
+    for stage in [s for s in STAGES if s in FILTERS and s in work]:
+        is_bad = FILTERS[stage]
+        for path in work[stage]:
+            data = docs.get(path)
+            if not isinstance(data, dict):
+                continue
+            features = data.get('features', [])
+            kept = [f for f in features if not is_bad(f)]
+            if len(kept) < len(features):
+                data['features'] = kept
+                dirty.add(path)
+                removed.setdefault(stage, []).append((path, len(features) - len(kept), len(features)))
+        lap(stage=stage)
+
+    # 3. Water POIs from the (already cleaned) Recreation.gov files
+    if 'water_poi' in work:
+        water = []
+        for path in work['water_poi']:
+            if path in docs:
+                water.extend(water_features(docs[path], path.stem.upper()))
+
+        if POI_PATH not in docs:
+            try:
+                docs[POI_PATH] = geoio.read(POI_PATH)
+            except (OSError, ValueError):
+                docs[POI_PATH] = {'type': 'FeatureCollection', 'features': []}
+        others = [f for f in docs[POI_PATH].get('features', [])
+                  if f.get('properties', {}).get('type') != 'water']
+        docs[POI_PATH]['features'] = poi_shards.quantize(water + others)
+        dirty.add(POI_PATH)
+        print(f"💧 water_poi: {len(water)} water stations, {len(others)} other POIs kept")
+        lap(stage='water_poi')
+
+    # 4. Nearest services for the (already cleaned) campsite files
+    if 'services' in work:
+        try:
+            poi_doc = docs[POI_PATH] if POI_PATH in docs else geoio.read(POI_PATH)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  services: could not read {POI_PATH}: {e}")
+        else:
+            targets = {path: docs[path] for path in work['services'] if isinstance(docs.get(path), dict)}
+            changed = nearest_services.annotate(targets, nearest_services.load_services(poi_doc))
+            updated = [path for path, count in changed.items() if count]
+            dirty.update(updated)
+            if updated:
+                print(f"📍 services: {sum(changed.values())} sites updated in {len(updated)} files")
+            else:
+                print(f"📍 services: {len(targets)} files already up to date")
+        lap(stage='services')
+
+    # 5. Minified copies of the merged files, with their byte budgets checked
+    over_budget = []
+    if 'publish' in work:
+        print('📦 publish:')
+        report = publish.publish(work['publish'], load=lambda path: docs[path] if path in docs else geoio.read(path),
+                                 write=False, published=docs)
+        over_budget = publish.print_report(report)
+        dirty.update(path for path, *_ in report)
+        lap(stage='publish')
+
+    # 6. Spatial index: writes the published files itself, in geohash order
+    indexed = set()
+    if 'spatial_index' in work:
+        spatial = build_spatial_index.build_index(
+            load=lambda path: docs[path] if path in docs else geoio.read(path), paths=work['spatial_index'])
+        build_spatial_index.write_index(spatial)
+        indexed = set(work['spatial_index'])
+        print(f"🧭 spatial_index: {len(spatial['states'])} states")
+        lap(stage='spatial_index')
+
+    # 7. Write each other modified file once
+    for path in sorted(dirty - indexed):
+        if path == POI_PATH:
+            poi_shards.write_poi(docs[path]['features'], path)
+        else:
+            geoio.write(path, docs[path])
+    lap(stage='write')
+
+    # 8. Map tiles from the in-memory published campsite documents
+    if 'tiles' in work:
+        print('🧩 tiles:')
+        build_tiles.build_tiles(load=lambda path: docs[path] if path in docs else geoio.read(path))
+        lap(stage='tiles')
+
+    # 9. Cluster pyramid from the same in-memory published campsite documents
+    if 'clusters' in work:
+        print('🧩 clusters:')
+        build_clusters.build_clusters(load=lambda path: docs[path] if path in docs else geoio.read(path))
+        lap(stage='clusters')
+
+    # 10. KTC1 exports of the published files as written above
+    if 'columnar' in work:
+        print('🗜️  columnar:')
+        export_columnar.export(work['columnar'])
+        lap(stage='columnar')
+
+    # 11. Hashed, precompressed copies of everything written above
+    if 'artifacts' in work:
+        manifest, stats = build_artifacts.build_artifacts()
+        print(f"🔒 artifacts: {len(manifest['files'])} files, {stats['written']} written, "
+              f"{stats['removed']} stale removed")
+        lap(stage='artifacts')
+
+    print()
+    print('=' * 70)
+    print('PIPELINE SUMMARY')
+    print('=' * 70)
+    for stage in STAGES:
+        if stage not in work:
+            print(f'  {stage:13s} skipped')
+            continue
+        line = f'  {stage:13s} {len(work[stage])} files'
+        if stage in FILTERS:
+            entries = removed.get(stage, [])
+            line += f', removed {sum(r for _, r, _ in entries)} entries from {len(entries)} files'
+        print(line)
+        for path, count, original in removed.get(stage, []):
+            pct = (count / original * 100) if original > 0 else 0
+            print(f'    - {path} ({count} removed, {pct:.1f}%)')
+    print(f'  Files: {geoio.write_summary()}')
+    if over_budget:
+        print(f"❌ {len(over_budget)} published file(s) over budget: {', '.join(p.name for p in over_budget)}")
+    print('=' * 70)
+    status = 1 if over_budget else 0
+
+    # 12. Audit the in-memory result; only files no stage loaded are read from disk
+    if 'audit' in work:
+        def load(filepath):
+            path = Path(filepath).relative_to(REPO_ROOT)
+            if path in load_errors:
+                raise load_errors[path]
+            if path in docs:
+                return docs[path]
+            return geoio.read(filepath)
+
+        with metrics.timer('stage', stage='audit'):
+            return run_audit(REPO_ROOT, load) or status
+
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the campsite data clean/extract/audit stages in one pass.')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f'Comma-separated stages to run (default: {",".join(STAGES)}).')
+    parser.add_argument('--skip', default='',
+                        help='Comma-separated stages to leave out of --stages.')
+    changes = parser.add_mutually_exclusive_group()
+    changes.add_argument('--changed', nargs='+', metavar='PATH',
+                         help='Only run the stages affected by these changed paths (relative to the repo root).')
+    changes.add_argument('--since', metavar='REV',
+                         help='Only run the stages affected by changes since this git revision.')
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    skip = [s.strip() for s in args.skip.split(',') if s.strip()]
+    unknown = [s for s in stages + skip if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+    stages = [s for s in stages if s not in skip]
+
+    changed = args.changed
+    if args.since:
+        changed = git_changed_files(args.since)
+
+    return run_pipeline(stages, changed)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
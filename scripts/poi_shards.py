@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Write the dump/water/propane POIs as a compact national file plus tile shards.
+
+The POI builders (fetch_osm_poi.py, update_poi_data.py, pipeline.py) all
+write through write_poi(), which:
+
+- rounds coordinates to COORD_DECIMALS places (~1 m) and drops empty
+  properties (OSM POIs often have "state": "")
+- orders the POIs by osm_id (geoio.sort_features), so the same POIs always
+  give the same bytes
+- writes data/poi_dump_water_propane.geojson compactly
+- slices the POIs into z/x/y shards under data/poi/ with a manifest:
+
+    data/poi/manifest.json
+    data/poi/{z}/{x}/{y}.geojson
+
+The manifest has the same shape as data/tiles/manifest.json, so the map's
+POI overlay fetches only the shards in view. Shards use a coarser zoom than
+the campsite tiles because POIs are much sparser.
+
+Usage (re-shard the existing POI file without refetching):
+    python3 scripts/poi_shards.py
+"""
+
+import argparse
+from pathlib import Path
+
+import geoio
+from build_tiles import feature_point, write_layer
+
+POI_PATH = Path('data/poi_dump_water_propane.geojson')
+SHARDS_DIR = Path('data/poi')
+SHARD_ZOOM = 6        # ~600 km shards: a few per state, ~100 POIs each
+COORD_DECIMALS = 5    # ~1.1 m
+
+
+def quantize(features, decimals=COORD_DECIMALS):
+    """Round point coordinates and drop empty properties, in place."""
+    for feature in features:
+        point = feature_point(feature)
+        if point is not None:
+            feature['geometry']['coordinates'] = [round(point[0], decimals), round(point[1], decimals)]
+        props = feature.get('properties')
+        if props:
+            feature['properties'] = {k: v for k, v in props.items() if v not in ('', None)}
+    return features
+
+
+def write_shards(features, out_dir=SHARDS_DIR, zoom=SHARD_ZOOM):
+    """Write the tile shards and manifest.json; returns the manifest."""
+    entry = write_layer(out_dir.name, features, out_dir.parent, zoom)
+    entry['url'] = f'{{z}}/{{x}}/{{y}}.geojson'  # Relative to the manifest
+    manifest = {
+        'format': 'geojson',
+        'scheme': 'xyz',
+        'zoom': zoom,
+        'precision': COORD_DECIMALS,
+        'layers': {'poi': entry}
+    }
+    geoio.write(out_dir / 'manifest.json', manifest)
+    return manifest
+
+
+def write_poi(features, path=POI_PATH, shards_dir=SHARDS_DIR):
+    """Quantize ``features`` (in place), write the national file and its shards; returns the manifest."""
+    features[:] = geoio.sort_features(quantize(features))
+    geoio.write_features(path, features)
+    return write_shards(features, shards_dir)
+
+
+def main():
+    argparse.ArgumentParser(description='Re-shard the POI file into data/poi/ tiles.').parse_args()
+
+    print('=' * 70)
+    print(f'SHARDING POIS (zoom {SHARD_ZOOM}, {COORD_DECIMALS} decimal places)')
+    print('=' * 70)
+
+    size_before = POI_PATH.stat().st_size
+    features = geoio.read(POI_PATH).get('features', [])
+    manifest = write_poi(features)
+    layer = manifest['layers']['poi']
+
+    print(f"  ✓ {POI_PATH}: {size_before / 1024:,.1f} KB → {POI_PATH.stat().st_size / 1024:,.1f} KB")
+    print(f"  ✓ {SHARDS_DIR}: {layer['features']:,} POIs in {len(layer['tiles'])} shards")
+    print()
+    print(f"✅ Wrote {SHARDS_DIR / 'manifest.json'}")
+    print(f"💾 {geoio.write_summary()}")
+
+
+if __name__ == '__main__':
+    main()
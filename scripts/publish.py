@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Publish stage: minify the merged campsite files the map downloads.
+
+The merged files carry data the map never shows: raw OSM tags copied
+wholesale by osm_to_geojson (addr:*, website, openfire, ...), long HTML
+descriptions from Recreation.gov and full-precision coordinates. This
+writes a copy of every data/campsites/{ST}_merged.geojson to
+data/published/{ST}_merged.geojson in which each feature:
+
+- keeps only PUBLISHED_FIELDS (what the popup, filters, compare table and
+  data-quality scoring read)
+- always has an "id": its own, else one derived from its upstream id
+  (ridb:<facility_id>, osm:<type>/<osm_id>), so the map can tell whether a
+  site from a tile, an index cell or a whole file is already loaded
+- has its name and description reduced to plain text, the description cut
+  to DESCRIPTION_CHARS (the map only checks that one exists)
+- keeps only the PUBLISHED_SERVICES closest POIs of each nearby_services
+  type (the popup shows the closest; the source files keep all k)
+- has its coordinates rounded to COORD_DECIMALS places (~1 m)
+
+Each file is then checked against its byte budget (BUDGETS_KB, else
+--budget-kb) and a before/after size report is printed. The script exits
+with status 1 if any file is over budget, which fails the build.
+
+The merged files themselves are left as they are, so OSM ids, facility
+ids and tags survive for the next run. Run this after the
+merge/cleaning/nearest-services steps and before build_spatial_index.py,
+which records byte offsets into the published files.
+
+Usage:
+    python3 scripts/publish.py
+    python3 scripts/publish.py --budget-kb 512 --dry-run
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import geoio
+from columnar import plain_text
+
+CAMPSITES_DIR = Path('data/campsites')
+PUBLISHED_DIR = Path('data/published')
+COORD_DECIMALS = 5       # ~1.1 m
+DESCRIPTION_CHARS = 200  # data-quality.js only scores whether a description exists
+PUBLISHED_SERVICES = 1   # The popup's "Nearest:" line uses the closest POI of each type
+DEFAULT_BUDGET_KB = 512
+
+# Larger states get their own budgets
+BUDGETS_KB = {
+    'CA': 768,
+}
+
+# Properties the frontend reads (data-loader.js, filters.js, campsite-compare.js, data-quality.js)
+PUBLISHED_FIELDS = ['id', 'name', 'type', 'cost', 'rating', 'reviews_count', 'amenities',
+                    'rig_friendly', 'road_difficulty', 'state', 'source', 'sources',
+                    'description', 'phone', 'website', 'url', 'nearby_services']
+TEXT_FIELDS = {'name', 'description'}
+
+
+def merged_files():
+    return sorted(CAMPSITES_DIR.glob('*_merged.geojson'))
+
+
+def published_files():
+    return sorted(PUBLISHED_DIR.glob('*_merged.geojson'))
+
+
+def published_path(path):
+    """data/campsites/CA_merged.geojson -> data/published/CA_merged.geojson"""
+    return PUBLISHED_DIR / path.name
+
+
+def state_of(path):
+    return path.name[:-len('_merged.geojson')]
+
+
+def budget_for(path, default_kb=DEFAULT_BUDGET_KB):
+    return BUDGETS_KB.get(state_of(path), default_kb) * 1024
+
+
+def shorten(text, limit=DESCRIPTION_CHARS):
+    """Cut ``text`` at a word boundary so it is at most ``limit`` characters."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,.;:') + '…'
+
+
+def site_id(props, geometry=None):
+    """The feature's id, else a stable one from its Recreation.gov/OSM id (or, lacking both, its point)."""
+    if props.get('id') not in (None, ''):
+        return props['id']
+    if props.get('facility_id') not in (None, ''):
+        return f"ridb:{props['facility_id']}"
+    if props.get('osm_id') not in (None, ''):
+        osm_type = props.get('osm_type')
+        return f"osm:{osm_type}/{props['osm_id']}" if osm_type else f"osm:{props['osm_id']}"
+    coords = (geometry or {}).get('coordinates') if isinstance(geometry, dict) else None
+    if isinstance(coords, list) and len(coords) >= 2 and all(isinstance(c, (int, float)) for c in coords[:2]):
+        return f"pt:{round(coords[0], COORD_DECIMALS)},{round(coords[1], COORD_DECIMALS)}"
+    return None
+
+
+def minify_feature(feature):
+    props = feature.get('properties') or {}
+    published = {}
+    feature_id = site_id(props, feature.get('geometry'))
+    if feature_id is not None:
+        published['id'] = feature_id
+    for key in PUBLISHED_FIELDS:
+        if key not in props or key == 'id':
+            continue
+        value = props[key]
+        if key in TEXT_FIELDS and isinstance(value, str):
+            value = plain_text(value)
+            if key == 'description':
+                value = shorten(value)
+        elif key == 'nearby_services' and isinstance(value, dict):
+            value = {t: pois[:PUBLISHED_SERVICES] for t, pois in value.items()}
+        published[key] = value
+
+    geometry = feature.get('geometry')
+    if isinstance(geometry, dict) and geometry.get('type') == 'Point':
+        coords = geometry.get('coordinates')
+        if isinstance(coords, list):
+            geometry = {'type': 'Point', 'coordinates': [
+                round(c, COORD_DECIMALS) if isinstance(c, float) else c for c in coords[:2]]}
+    return {'type': 'Feature', 'geometry': geometry, 'properties': published}
+
+
+def minify(doc):
+    """A copy of ``doc`` with every feature minified."""
+    return {**doc, 'features': [minify_feature(f) for f in doc.get('features', [])]}
+
+
+def publish(paths=None, load=geoio.read, default_kb=DEFAULT_BUDGET_KB, write=True, published=None):
+    """Minify ``paths`` into PUBLISHED_DIR (if ``write``); returns [(path, bytes_before, bytes_after, budget)].
+
+    ``path`` in the report is the published file. The minified documents are
+    also stored in ``published`` by that path, when a dict is given.
+    """
+    paths = merged_files() if paths is None else paths
+    report = []
+    for path in paths:
+        try:
+            before = path.stat().st_size
+            doc = minify(load(path))
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  Skipping {path}: {e}")
+            continue
+        out = published_path(path)
+        payload = geoio.dumps(doc)
+        if write:
+            with geoio.atomic_open(out) as f:
+                f.write(payload)
+        if published is not None:
+            published[out] = doc
+        report.append((out, before, len(payload), budget_for(path, default_kb)))
+    return report
+
+
+def print_report(report):
+    """Print the per-file size table; returns the files over budget."""
+    print(f"  {'file':28s} {'before':>10s} {'after':>10s} {'saved':>6s} {'budget':>10s}")
+    over = []
+    for path, before, after, budget in report:
+        saved = (1 - after / before) * 100 if before else 0
+        flag = '✓'
+        if after > budget:
+            flag = '❌ over budget'
+            over.append(path)
+        print(f"  {path.name:28s} {before / 1024:8,.1f}KB {after / 1024:8,.1f}KB {saved:5.1f}% "
+              f"{budget / 1024:8,.0f}KB {flag}")
+    total_before = sum(r[1] for r in report)
+    total_after = sum(r[2] for r in report)
+    print(f"  {'total':28s} {total_before / 1024:8,.1f}KB {total_after / 1024:8,.1f}KB")
+    return over
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minify the published merged campsite files and enforce size budgets.')
+    parser.add_argument('--budget-kb', type=int, default=DEFAULT_BUDGET_KB,
+                        help=f'Per-file budget for states without their own (default: {DEFAULT_BUDGET_KB}).')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report sizes without writing any file.')
+    args = parser.parse_args()
+
+    print('=' * 70)
+    print(f'PUBLISHING MERGED FILES ({COORD_DECIMALS} decimal places, {args.budget_kb} KB default budget)')
+    print('=' * 70)
+
+    report = publish(default_kb=args.budget_kb, write=not args.dry_run)
+    over = print_report(report)
+    print(f"  💾 {geoio.write_summary()}")
+
+    print()
+    if over:
+        print(f"❌ {len(over)} file(s) over budget: {', '.join(p.name for p in over)}")
+        return 1
+    print(f"✅ {len(report)} files within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Thread-safe token-bucket rate limiter shared by the API fetch scripts.
+"""
+
+import threading
+import time
+
+import metrics
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, holding at most ``capacity``.
+
+    ``acquire`` blocks only as long as needed for the next token, so time spent
+    waiting on the network counts toward the quota instead of being added on
+    top of a fixed sleep. With ``capacity=1`` no sliding window can ever see
+    more than ``rate * window + 1`` requests, which keeps strict per-minute
+    quotas from being exceeded by an initial burst.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute, capacity=1):
+        return cls(requests_per_minute / 60.0, capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Take ``tokens`` from the bucket, sleeping until they are available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            metrics.count('rate_limit_wait_seconds', wait)
+            time.sleep(wait)
+
+    def penalize(self, seconds):
+        """Push the next available token ``seconds`` into the future (e.g. after a 429)."""
+        metrics.count('rate_limit_penalties')
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
@@ -3,18 +3,50 @@
 Update POI data by extracting water stations from all state campsite files
 """
 
-import json
-import os
 from pathlib import Path
 
+import geoio
+from poi_shards import SHARDS_DIR, write_poi
+
+def water_source_files(campsites_dir=Path('data/campsites')):
+    """Recreation.gov state files that water stations are extracted from"""
+    state_files = sorted(campsites_dir.glob('*.geojson'))
+    return [f for f in state_files if f.name != 'index.json' and not f.name.endswith('_merged.geojson')]
+
+def water_features(data, state_code):
+    """Water station POIs for one state's loaded GeoJSON"""
+    poi_features = []
+    for feature in data.get('features', []):
+        coords = feature.get('geometry', {}).get('coordinates', [])
+        props = feature.get('properties', {})
+        amenities = props.get('amenities', [])
+        name = props.get('name', 'Unknown')
+
+        if not coords or len(coords) < 2:
+            continue
+
+        # Check for water amenities
+        if 'water' in amenities:
+            poi_features.append({
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'Point',
+                    'coordinates': coords
+                },
+                'properties': {
+                    'name': name,
+                    'type': 'water',
+                    'state': state_code
+                }
+            })
+    return poi_features
+
 def extract_water_stations():
     """Extract water stations from all state geojson files"""
-    campsites_dir = Path('data/campsites')
     poi_features = []
 
     # Get all state geojson files
-    state_files = sorted(campsites_dir.glob('*.geojson'))
-    state_files = [f for f in state_files if f.name != 'index.json' and not f.name.endswith('_merged.geojson')]
+    state_files = water_source_files()
 
     print(f"Processing {len(state_files)} state files...")
 
@@ -24,34 +56,11 @@ def extract_water_stations():
         state_code = state_file.stem.upper()
 
         try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            water_count = 0
-            for feature in data.get('features', []):
-                coords = feature.get('geometry', {}).get('coordinates', [])
-                props = feature.get('properties', {})
-                amenities = props.get('amenities', [])
-                name = props.get('name', 'Unknown')
-
-                if not coords or len(coords) < 2:
-                    continue
-
-                # Check for water amenities
-                if 'water' in amenities:
-                    poi_features.append({
-                        'type': 'Feature',
-                        'geometry': {
-                            'type': 'Point',
-                            'coordinates': coords
-                        },
-                        'properties': {
-                            'name': name,
-                            'type': 'water',
-                            'state': state_code
-                        }
-                    })
-                    water_count += 1
+            data = geoio.read(state_file)
+
+            water = water_features(data, state_code)
+            poi_features.extend(water)
+            water_count = len(water)
 
             if water_count > 0:
                 states_with_water[state_code] = water_count
@@ -60,16 +69,9 @@ def extract_water_stations():
         except Exception as e:
             print(f"  ✗ {state_code}: Error - {e}")
 
-    # Create GeoJSON output
-    output = {
-        'type': 'FeatureCollection',
-        'features': poi_features
-    }
-
-    # Write to file
+    # Write GeoJSON output (compact, ~1 m coordinates) plus the viewport shards
     output_file = Path('data/poi_dump_water_propane.geojson')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2)
+    write_poi(poi_features, output_file)
 
     print(f"\n{'='*60}")
     print(f"✅ SUCCESS!")
@@ -79,7 +81,8 @@ def extract_water_stations():
     print(f"\nTop 10 states by water station count:")
     for state, count in sorted(states_with_water.items(), key=lambda x: x[1], reverse=True)[:10]:
         print(f"  {state}: {count}")
-    print(f"\nOutput: {output_file}")
+    print(f"\nOutput: {output_file} (+ shards in {SHARDS_DIR})")
+    print(f"💾 {geoio.write_summary()}")
     print(f"{'='*60}")
 
     return len(poi_features), len(states_with_water)
@@ -1,7 +1,11 @@
 // service-worker.js — KampTrail SW (SAFE MODE)
 // Goal: never break map tiles or cross-origin requests.
 // Bump VERSION any time you change cached files.
-const VERSION = 'kt-v18-safe';
+const VERSION = 'kt-v21-safe';
+
+// Content-hashed data files from scripts/build_artifacts.py (HASH_LENGTH hex digits before the extension)
+const ARTIFACTS_MANIFEST = 'data/dist/manifest.json';
+const HASHED_ARTIFACT = /\/data\/dist\/.+\.[0-9a-f]{12}\.\w+$/;
 
 const SHELL = [
   'index.html',
@@ -13,6 +17,7 @@ const SHELL = [
   'overlays/overlays-advanced.js',
   'overlays/overlays.css',
   'overlays/overlays.js',
+  'ktc-reader.js',
   'data-loader.js',
   'data-quality.js',
   'filters.js',
@@ -59,14 +64,31 @@ self.addEventListener('fetch', (event) => {
     return; // browser handles it (prevents ORB, tile failures, etc.)
   }
 
-  // 3) Same-origin static assets: stale-while-revalidate
-  const isStatic = /\.(?:js|css|png|svg|webp|jpg|jpeg|ico|json|geojson)$/.test(url.pathname);
+  // 3) Byte-range requests (spatial index cells): straight to the network,
+  //    the cache only holds whole 200 responses
+  if (request.headers.has('range')) {
+    return;
+  }
+
+  // 4) Artifact manifest: network-first, so new data is noticed on the next load;
+  //    hashed files never change, so they are served from cache once fetched
+  if (url.pathname.endsWith('/' + ARTIFACTS_MANIFEST)) {
+    event.respondWith(networkFirstManifest(request));
+    return;
+  }
+  if (HASHED_ARTIFACT.test(url.pathname)) {
+    event.respondWith(cacheFirst(request));
+    return;
+  }
+
+  // 5) Same-origin static assets: stale-while-revalidate
+  const isStatic = /\.(?:js|css|png|svg|webp|jpg|jpeg|ico|json|geojson|ktc)$/.test(url.pathname);
   if (isStatic) {
     event.respondWith(staleWhileRevalidate(request));
     return;
   }
 
-  // 4) Everything else same-origin: just pass through
+  // 6) Everything else same-origin: just pass through
   // (No respondWith = no chance to break anything)
 });
 
@@ -86,6 +108,45 @@ async function networkFirstHTML(request) {
   }
 }
 
+async function networkFirstManifest(request) {
+  const cache = await caches.open(VERSION);
+
+  try {
+    const net = await fetch(request);
+    if (net && net.ok) {
+      await cache.put(request, net.clone());
+      pruneArtifacts(cache, await net.clone().json()).catch(() => {});
+    }
+    return net;
+  } catch (err) {
+    const cached = await cache.match(request, { ignoreSearch: true });
+    return cached || new Response('Offline', { status: 503, statusText: 'Offline' });
+  }
+}
+
+async function cacheFirst(request) {
+  const cache = await caches.open(VERSION);
+  const cached = await cache.match(request);
+  if (cached) return cached;
+
+  const res = await fetch(request);
+  if (res && res.ok) cache.put(request, res.clone());
+  return res;
+}
+
+// Drop cached hashed files the current manifest no longer lists
+async function pruneArtifacts(cache, manifest) {
+  const current = new Set(Object.entries(manifest.files || {}).map(([path, digest]) => {
+    const dot = path.lastIndexOf('.');
+    const hashed = manifest.base + path.slice('data/'.length, dot) + '.' + digest + path.slice(dot);
+    return new URL(hashed, self.registration.scope).href;
+  }));
+  const keys = await cache.keys();
+  await Promise.all(keys
+    .filter((req) => HASHED_ARTIFACT.test(new URL(req.url).pathname) && !current.has(req.url))
+    .map((req) => cache.delete(req)));
+}
+
 async function staleWhileRevalidate(request) {
   const cache = await caches.open(VERSION);
   const cached = await cache.match(request, { ignoreSearch: true });
@@ -0,0 +1,63 @@
+"""Tests for the placeholder checks and run history in scripts/audit_campsite_data.py."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from audit_campsite_data import append_history, check_features, history_tail, last_history_entry  # noqa: E402
+
+
+def collection(name, description):
+    return {'type': 'FeatureCollection', 'features': [{
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [-74.5, 40.5]},
+        'properties': {'name': name, 'description': description},
+    }]}
+
+
+def test_description_with_common_words_is_not_a_placeholder():
+    data = collection('Stephens State Park',
+                      'Open seasonally, for example april 1 to october 31. A good place to test your rig.')
+    issues, _ = check_features(data, 'NJ.geojson', 'NJ')
+    assert issues == []
+
+
+def test_placeholder_phrase_in_description_is_an_issue():
+    issues, _ = check_features(collection('Pine Flat', 'Lorem ipsum dolor sit amet'), 'NJ.geojson', 'NJ')
+    assert len(issues) == 1
+    assert 'PLACEHOLDER DETECTED' in issues[0]
+
+
+def test_placeholder_name_is_an_issue():
+    issues, _ = check_features(collection('Test Campground', ''), 'NJ.geojson', 'NJ')
+    assert len(issues) == 1
+    assert "matched 'test'" in issues[0]
+
+
+def test_history_keeps_only_the_last_runs(tmp_path):
+    path = tmp_path / 'audit_history.jsonl'
+    for run in range(5):
+        append_history(path, {'generated': run}, keep=3)
+
+    assert path.read_text().splitlines() == ['{"generated":2}', '{"generated":3}', '{"generated":4}']
+    assert last_history_entry(path) == {'generated': 4}
+
+
+def test_default_history_holds_just_the_previous_run(tmp_path):
+    path = tmp_path / 'audit_history.jsonl'
+    append_history(path, {'generated': 'first'})
+    append_history(path, {'generated': 'second'})
+
+    assert path.read_text().splitlines() == ['{"generated":"second"}']
+
+
+def test_history_tail_reads_lines_longer_than_a_chunk(tmp_path):
+    path = tmp_path / 'audit_history.jsonl'
+    lines = [('{"pad":"' + str(i) * 70000 + '"}').encode() for i in range(3)]
+    path.write_bytes(b'\n'.join(lines) + b'\n')
+
+    assert history_tail(path, 2) == lines[1:]
+    assert history_tail(path, 5) == lines
+    assert history_tail(tmp_path / 'missing.jsonl', 1) == []
+    assert last_history_entry(tmp_path / 'missing.jsonl') is None
@@ -0,0 +1,116 @@
+"""Tests for the KTC1 encoder and reference reader in scripts/columnar.py."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from columnar import MAGIC, decode, encode  # noqa: E402
+
+
+def point(lon, lat, **props):
+    return {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon, lat]}, 'properties': props}
+
+
+def header_of(data):
+    length = int.from_bytes(data[4:8], 'little')
+    return json.loads(data[8:8 + length])
+
+
+def test_round_trip_keeps_every_exported_property():
+    features = [
+        point(-121.512345, 38.223456, id='ridb:1', name='Pine Flat', type='campground', state='CA',
+              source='recreation.gov', cost=25, rating=4.5, reviews_count=12,
+              amenities=['water', 'toilets'], rig_friendly=['big-rig'], sources=['ridb', 'osm']),
+        point(-74.5, 40.5, id='osm:node/7', name='Café ☃', type='dispersed', state='NJ', source='osm',
+              cost=0, rating=3, reviews_count=0, amenities=[], rig_friendly=[], sources=['osm']),
+    ]
+    decoded = decode(encode(features))
+
+    assert decoded == features
+
+
+def test_missing_properties_stay_missing_and_nulls_stay_null():
+    features = [point(0.5, 0.5, name='A', cost=10)]
+    features += [point(i, i, name=None) for i in range(1, 10)]  # Bitmap spans two bytes
+    features.append(point(10, 10, id='x', cost=None, amenities=None, type=None))
+    decoded = decode(encode(features))
+
+    assert [f['properties'] for f in decoded[:10]] == [f['properties'] for f in features[:10]]
+    assert 'cost' not in decoded[1]['properties']
+    # A null list is stored as an empty one
+    assert decoded[10]['properties'] == {'id': 'x', 'cost': None, 'amenities': [], 'type': None}
+
+
+def test_columns_every_feature_has_need_no_bitmap():
+    data = encode([point(1, 1, name='A', cost=1), point(2, 2, name='B')])
+    columns = {c['name']: c for c in header_of(data)['columns']}
+
+    assert columns['name']['present'] is None
+    assert columns['cost']['present'] is not None
+    assert columns['lon']['present'] is None
+
+
+def test_float32_values_are_rounded_back():
+    costs = [12.34, 0.1, 19.99, 1234567, 4.0, 1e-3]
+    decoded = decode(encode([point(i, i, cost=c) for i, c in enumerate(costs)]))
+
+    assert [f['properties']['cost'] for f in decoded] == [12.34, 0.1, 19.99, 1234567, 4, 0.001]
+    assert isinstance(decoded[4]['properties']['cost'], int)
+
+
+def test_invalid_numbers_are_written_as_null():
+    features = [point(0, 0, cost='free', rating=True, reviews_count=-1),
+                point(1, 1, cost=None, rating='4', reviews_count=2 ** 32)]
+    decoded = decode(encode(features))
+
+    for feature in decoded:
+        assert feature['properties'] == {'cost': None, 'rating': None, 'reviews_count': None}
+
+
+def test_coordinates_keep_six_decimals():
+    decoded = decode(encode([point(-179.9999994, 89.1234567), point(12.3456786, -0.0000004)]))
+
+    assert decoded[0]['geometry']['coordinates'] == [-179.999999, 89.123457]
+    assert decoded[1]['geometry']['coordinates'] == [12.345679, 0.0]
+
+
+def test_non_points_and_unexported_properties_are_dropped():
+    line = {'type': 'Feature', 'geometry': {'type': 'LineString', 'coordinates': [[0, 0], [1, 1]]},
+            'properties': {'name': 'Trail'}}
+    no_geometry = {'type': 'Feature', 'geometry': None, 'properties': {'name': 'Nowhere'}}
+    decoded = decode(encode([line, point(1, 2, name='Site', osm_id=5), no_geometry]))
+
+    assert decoded == [point(1, 2, name='Site')]
+
+
+def test_descriptions_are_optional_plain_text():
+    feature = point(1, 2, description='<p>Shady&nbsp;sites,\n  <b>no</b> hookups</p>')
+
+    assert decode(encode([feature]))[0]['properties'] == {}
+    assert decode(encode([feature], descriptions=True))[0]['properties'] == {
+        'description': 'Shady sites, no hookups'}
+
+
+def test_sections_are_aligned():
+    data = encode([point(1, 2, name='odd', type='a', amenities=['x'])])
+    header = header_of(data)
+
+    assert data[:4] == MAGIC
+    assert int.from_bytes(data[4:8], 'little') % 4 == 0
+    assert header['strings']['offset'] % 4 == 0
+    for column in header['columns']:
+        assert column['offset'] % 4 == 0
+        assert column['present'] is None or column['present'] % 4 == 0
+
+
+def test_empty_input_round_trips():
+    assert decode(encode([])) == []
+
+
+def test_rejects_other_formats():
+    with pytest.raises(ValueError):
+        decode(b'{"type": "FeatureCollection"}')
@@ -0,0 +1,95 @@
+"""Tests for incremental fetches in scripts/fetch_osm_data.py."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from fetch_osm_data import merge_changes  # noqa: E402
+from overpass import TiledElements  # noqa: E402
+
+
+def node(osm_id, tags=None):
+    element = {'type': 'node', 'id': osm_id, 'lat': 40.5, 'lon': -74.5}
+    if tags is not None:
+        element['tags'] = tags
+    return element
+
+
+def way(osm_id, tags=None):
+    element = {'type': 'way', 'id': osm_id, 'center': {'lat': 40.6, 'lon': -74.6}}
+    if tags is not None:
+        element['tags'] = tags
+    return element
+
+
+def bare(element_type, osm_id):
+    return {'type': element_type, 'id': osm_id}
+
+
+def feature(osm_type, osm_id, name):
+    props = {'name': name, 'osm_id': osm_id}
+    if osm_type is not None:
+        props['osm_type'] = osm_type
+    return {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [-74.5, 40.5]}, 'properties': props}
+
+
+def write_tile(path, changed, ids, timestamp):
+    # Two out statements: the changed bodies, then the ids of everything still matching
+    path.write_text(json.dumps({
+        'version': 0.6,
+        'osm3s': {'timestamp_osm_base': timestamp},
+        'elements': changed + ids,
+    }))
+    return path
+
+
+def split_incremental_response(tmp_path):
+    west = write_tile(tmp_path / 'west.json',
+                      [node(3, {'name': 'Renamed'}), way(10, {'name': 'Straddling'})],
+                      [bare('node', 1), bare('node', 3), bare('way', 10)],
+                      '2026-10-01T00:00:00Z')
+    east = write_tile(tmp_path / 'east.json',
+                      [way(10, {'name': 'Straddling'})],
+                      [bare('node', 2), bare('way', 10), bare('relation', 7)],
+                      '2026-09-30T00:00:00Z')
+    return TiledElements([west, east], ordered=False)
+
+
+def test_split_incremental_tiles_yield_each_element_once_with_its_body(tmp_path):
+    stream = split_incremental_response(tmp_path)
+    elements = list(stream)
+
+    keys = [(e['type'], e['id']) for e in elements]
+    assert sorted(keys) == sorted(set(keys))
+    assert set(keys) == {('node', 1), ('node', 2), ('node', 3), ('way', 10), ('relation', 7)}
+    by_key = {(e['type'], e['id']): e for e in elements}
+    assert by_key[('node', 3)]['tags'] == {'name': 'Renamed'}
+    assert by_key[('way', 10)]['tags'] == {'name': 'Straddling'}
+    assert stream.extra['osm3s']['timestamp_osm_base'] == '2026-09-30T00:00:00Z'
+
+
+def test_merge_changes_applies_split_incremental_response(tmp_path):
+    existing = {'type': 'FeatureCollection', 'features': [
+        feature('node', 1, 'Unchanged'),
+        feature('node', 3, 'Old name'),
+        feature('node', 5, 'Deleted'),
+        feature('way', 10, 'Old way'),
+        feature(None, 7, 'Written before osm_type'),
+    ]}
+    merged, upserted, removed = merge_changes(existing, {'elements': list(split_incremental_response(tmp_path))})
+
+    assert (upserted, removed) == (2, 1)
+    assert [f['properties']['name'] for f in merged['features']] == \
+        ['Unchanged', 'Renamed', 'Straddling', 'Written before osm_type']
+
+
+def test_merge_changes_appends_new_elements_in_element_order():
+    existing = {'type': 'FeatureCollection', 'features': [feature('way', 4, 'Way')]}
+    response = {'elements': [node(9, {'name': 'New node'}), bare('node', 9), bare('way', 4)]}
+    merged, upserted, removed = merge_changes(existing, response)
+
+    assert (upserted, removed) == (1, 0)
+    assert [(f['properties'].get('osm_type'), f['properties']['osm_id']) for f in merged['features']] == \
+        [('node', 9), ('way', 4)]
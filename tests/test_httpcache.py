@@ -0,0 +1,123 @@
+"""Tests for revalidation, eviction and offline mode in scripts/httpcache.py."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from httpcache import CacheMiss, HTTPCache  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.ok = 200 <= status_code < 300
+        self.body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    """Answers requests from a queue and records the headers each one was sent with."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.sent.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_fresh_entry_is_served_without_a_request(tmp_path):
+    cache = HTTPCache(tmp_path, ttl=3600)
+    session = FakeSession(FakeResponse(200, b'{"a": 1}'))
+    first = cache.fetch(session, 'https://example.test/a')
+    second = cache.fetch(session, 'https://example.test/a')
+
+    assert first == second
+    assert read(second) == b'{"a": 1}'
+    assert len(session.sent) == 1
+
+
+def test_stale_entry_is_revalidated_with_etag_and_last_modified(tmp_path):
+    cache = HTTPCache(tmp_path, ttl=0)
+    session = FakeSession(
+        FakeResponse(200, b'first', {'ETag': '"v1"', 'Last-Modified': 'Thu, 01 Oct 2026 00:00:00 GMT'}),
+        FakeResponse(304),
+    )
+    cache.fetch(session, 'https://example.test/a')
+    path = cache.fetch(session, 'https://example.test/a')
+
+    assert session.sent[0] == {}
+    assert session.sent[1] == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Thu, 01 Oct 2026 00:00:00 GMT'}
+    assert read(path) == b'first'
+
+
+def test_changed_upstream_replaces_the_body(tmp_path):
+    cache = HTTPCache(tmp_path, ttl=0)
+    session = FakeSession(FakeResponse(200, b'first', {'ETag': '"v1"'}),
+                          FakeResponse(200, b'second', {'ETag': '"v2"'}),
+                          FakeResponse(304))
+    cache.fetch(session, 'https://example.test/a')
+    assert read(cache.fetch(session, 'https://example.test/a')) == b'second'
+    cache.fetch(session, 'https://example.test/a')
+
+    assert session.sent[2] == {'If-None-Match': '"v2"'}
+
+
+def test_error_responses_are_not_cached(tmp_path):
+    cache = HTTPCache(tmp_path, ttl=3600)
+    session = FakeSession(FakeResponse(500, b'oops'), FakeResponse(200, b'ok'))
+    with pytest.raises(RuntimeError):
+        cache.fetch(session, 'https://example.test/a')
+
+    assert read(cache.fetch(session, 'https://example.test/a')) == b'ok'
+    assert len(session.sent) == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = HTTPCache(tmp_path, ttl=3600, max_bytes=250)
+    session = FakeSession(*(FakeResponse(200, bytes([i]) * 100) for i in range(3)))
+    a = cache.fetch(session, 'https://example.test/a', key='a')
+    b = cache.fetch(session, 'https://example.test/b', key='b')
+    os.utime(a, (1, 1))
+    os.utime(b, (2, 2))
+    cache.get_fresh('a')  # Touching a makes b the least recently used
+    c = cache.fetch(session, 'https://example.test/c', key='c')
+
+    assert os.path.exists(a)
+    assert not os.path.exists(b)
+    assert os.path.exists(c)
+
+
+def test_offline_serves_stale_entries_and_raises_on_a_miss(tmp_path):
+    HTTPCache(tmp_path, ttl=0).fetch(FakeSession(FakeResponse(200, b'cached')), 'https://example.test/a')
+    offline = HTTPCache(tmp_path, ttl=0, offline=True)
+    session = FakeSession()
+
+    assert read(offline.fetch(session, 'https://example.test/a')) == b'cached'
+    with pytest.raises(CacheMiss):
+        offline.fetch(session, 'https://example.test/b')
+    assert session.sent == []
@@ -0,0 +1,69 @@
+"""Tests for chunked parsing in scripts/jsonstream.py."""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from jsonstream import JSONArrayStream  # noqa: E402
+
+DOCUMENT = {
+    'version': 0.6,
+    'osm3s': {'timestamp_osm_base': '2026-10-01T00:00:00Z'},
+    'elements': [
+        {'type': 'node', 'id': 123456789, 'lat': 40.5123456, 'lon': -74.5e0, 'tags': {'name': 'Quote " and \\ slash'}},
+        1.5e10,
+        -0.25,
+        'café ☃',
+        [True, False, None, []],
+        {},
+        12345678901234567890,
+    ],
+    'remark': 'runtime error: Query timed out',
+}
+
+
+class ChunkedReader:
+    """A text file that returns at most ``size`` characters per read."""
+
+    def __init__(self, text, size):
+        self.text = text
+        self.size = size
+        self.pos = 0
+
+    def read(self, _):
+        chunk = self.text[self.pos:self.pos + self.size]
+        self.pos += len(chunk)
+        return chunk
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_values_split_at_every_chunk_boundary(indent):
+    text = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False)
+    for size in range(1, 40):
+        stream = JSONArrayStream(ChunkedReader(text, size), 'elements')
+        assert list(stream) == DOCUMENT['elements'], f'chunk size {size}'
+        assert stream.extra == {k: v for k, v in DOCUMENT.items() if k != 'elements'}
+
+
+def test_number_cut_at_chunk_edge_is_not_truncated():
+    text = '{"elements": [1.5e10, 25]}'
+    # The first chunk ends right after "1.5", which would decode on its own
+    stream = JSONArrayStream(ChunkedReader(text, text.index('e10')), 'elements')
+    assert list(stream) == [1.5e10, 25]
+
+
+def test_empty_array_and_missing_key():
+    assert list(JSONArrayStream(io.StringIO('{"elements": [], "x": 1}'), 'elements')) == []
+    stream = JSONArrayStream(io.StringIO('{"x": {"elements": [1]}}'), 'elements')
+    assert list(stream) == []
+    assert stream.extra == {'x': {'elements': [1]}}
+
+
+def test_truncated_document_raises():
+    with pytest.raises(ValueError):
+        list(JSONArrayStream(io.StringIO('{"elements": [1, 2'), 'elements'))
@@ -0,0 +1,92 @@
+"""Tests that scripts/matchers.py agrees with the linear scans it replaced."""
+
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from clean_placeholders import PLACEHOLDER_COORDS, PLACEHOLDER_KEYWORDS  # noqa: E402
+from matchers import CoordinateGrid, KeywordMatcher  # noqa: E402
+
+
+def linear_search(keywords, text):
+    return any(keyword.lower() in text for keyword in keywords if keyword)
+
+
+def linear_whole_words(keywords, text):
+    return any(re.search(r'\b' + re.escape(keyword.lower()) + r'\b', text) for keyword in keywords if keyword)
+
+
+def linear_contains(points, lon, lat, tolerance):
+    return any(abs(lon - p_lon) < tolerance and abs(lat - p_lat) < tolerance for p_lon, p_lat in points)
+
+
+def random_words(rng, alphabet, count, max_length):
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, max_length))) for _ in range(count)]
+
+
+def test_keyword_search_matches_linear_scan():
+    rng = random.Random(10)
+    for _ in range(200):
+        keywords = random_words(rng, 'abc', rng.randint(1, 8), 4)
+        matcher = KeywordMatcher(keywords)
+        for text in random_words(rng, 'abc -', 30, 12):
+            assert matcher.search(text) == linear_search(keywords, text), (keywords, text)
+            found = matcher.find(text)
+            assert (found is not None) == linear_search(keywords, text)
+            if found is not None:
+                assert found in keywords and found in text
+
+
+def test_whole_word_search_matches_linear_scan():
+    rng = random.Random(11)
+    for _ in range(200):
+        keywords = random_words(rng, 'ab c', rng.randint(1, 6), 5)
+        matcher = KeywordMatcher(keywords, whole_words=True)
+        for text in random_words(rng, 'ab c-', 30, 14):
+            assert matcher.search(text) == linear_whole_words(keywords, text), (keywords, text)
+
+
+def test_whole_words_skip_substrings():
+    matcher = KeywordMatcher(['test', 'testing'], whole_words=True)
+    assert matcher.search('test site')
+    assert matcher.find('a testing ground') == 'testing'
+    assert not matcher.search('greatest campground')
+
+
+def test_placeholder_keywords_match_linear_scan():
+    matcher = KeywordMatcher(PLACEHOLDER_KEYWORDS)
+    names = ['test campground', 'pine flat', 'sample site', 'lorem ipsum', 'greatest park', 'tbd', '']
+    for name in names:
+        assert matcher.search(name) == linear_search(PLACEHOLDER_KEYWORDS, name), name
+
+
+def test_empty_keyword_list_matches_nothing():
+    matcher = KeywordMatcher(['', ''])
+    assert not matcher.search('anything')
+    assert matcher.find('anything') is None
+
+
+def test_coordinate_grid_matches_linear_scan():
+    rng = random.Random(12)
+    tolerance = 0.0001
+    points = [(rng.uniform(-1, 1) * 0.001, rng.uniform(-1, 1) * 0.001) for _ in range(50)]
+    points += [(0.0, 0.0), (-0.0003, 0.0002)]
+    grid = CoordinateGrid(points, tolerance)
+    for _ in range(5000):
+        lon, lat = rng.uniform(-1, 1) * 0.0012, rng.uniform(-1, 1) * 0.0012
+        assert grid.contains(lon, lat) == linear_contains(points, lon, lat, tolerance), (lon, lat)
+    # Edges of a cell and of the tolerance
+    for lon, lat in [(tolerance, 0.0), (tolerance * 0.999, 0.0), (-tolerance * 0.999, -tolerance * 0.999),
+                     (-0.0003 - tolerance, 0.0002), (-0.0003 + tolerance / 2, 0.0002 - tolerance / 2)]:
+        assert grid.contains(lon, lat) == linear_contains(points, lon, lat, tolerance), (lon, lat)
+
+
+def test_placeholder_coords_match_linear_scan():
+    grid = CoordinateGrid(PLACEHOLDER_COORDS, tolerance=0.0001)
+    for p_lon, p_lat in PLACEHOLDER_COORDS:
+        for dlon, dlat in [(0, 0), (0.00005, -0.00005), (0.0002, 0), (0, -0.00015)]:
+            lon, lat = p_lon + dlon, p_lat + dlat
+            assert grid.contains(lon, lat) == linear_contains(PLACEHOLDER_COORDS, lon, lat, 0.0001)
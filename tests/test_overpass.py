@@ -0,0 +1,70 @@
+"""Tests for merging tiled responses in scripts/overpass.py."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from overpass import TiledElements, element_order, split_bbox  # noqa: E402
+
+
+def write_tile(path, elements, timestamp=None, remark=None):
+    doc = {'version': 0.6, 'osm3s': {'copyright': 'OpenStreetMap contributors'}}
+    if timestamp:
+        doc['osm3s']['timestamp_osm_base'] = timestamp
+    doc['elements'] = sorted(elements, key=element_order)
+    if remark:
+        doc['remark'] = remark
+    path.write_text(json.dumps(doc))
+    return path
+
+
+def element(element_type, osm_id):
+    return {'type': element_type, 'id': osm_id}
+
+
+def test_tiles_merge_in_element_order_without_duplicates(tmp_path):
+    tiles = [
+        write_tile(tmp_path / 'sw.json', [element('node', 5), element('way', 7), element('relation', 2)]),
+        write_tile(tmp_path / 'se.json', [element('node', 1), element('way', 7), element('way', 9)]),
+        write_tile(tmp_path / 'nw.json', [element('node', 8), element('relation', 2)]),
+        write_tile(tmp_path / 'ne.json', []),
+    ]
+    merged = [(e['type'], e['id']) for e in TiledElements(tiles)]
+
+    assert merged == [('node', 1), ('node', 5), ('node', 8), ('way', 7), ('way', 9), ('relation', 2)]
+
+
+def test_same_id_of_different_types_is_kept(tmp_path):
+    tiles = [write_tile(tmp_path / 'a.json', [element('node', 7)]),
+             write_tile(tmp_path / 'b.json', [element('way', 7), element('relation', 7)])]
+
+    assert [e['type'] for e in TiledElements(tiles)] == ['node', 'way', 'relation']
+
+
+def test_extra_keeps_the_oldest_tile_timestamp(tmp_path):
+    tiles = [write_tile(tmp_path / 'a.json', [element('node', 1)], '2026-10-02T00:00:00Z'),
+             write_tile(tmp_path / 'b.json', [element('node', 2)], '2026-10-01T12:00:00Z', remark='ok'),
+             write_tile(tmp_path / 'c.json', [element('node', 3)])]
+    stream = TiledElements(tiles)
+    list(stream)
+
+    assert stream.extra['version'] == 0.6
+    assert stream.extra['osm3s'] == {'copyright': 'OpenStreetMap contributors',
+                                     'timestamp_osm_base': '2026-10-01T12:00:00Z'}
+
+
+def test_split_bbox_quadrants_tile_the_bbox():
+    quadrants = [tuple(float(v) for v in q.split(',')) for q in split_bbox('37,-109.1,41,-102')]
+
+    assert quadrants == [
+        (37.0, -109.1, 39.0, -105.55),
+        (37.0, -105.55, 39.0, -102.0),
+        (39.0, -109.1, 41.0, -105.55),
+        (39.0, -105.55, 41.0, -102.0),
+    ]
+
+
+def test_split_bbox_formats_without_trailing_zeros():
+    assert split_bbox('0,0,1,1') == ['0,0,0.5,0.5', '0,0.5,0.5,1', '0.5,0,1,0.5', '0.5,0.5,1,1']
@@ -0,0 +1,125 @@
+"""Tests for --changed/--since stage selection in scripts/pipeline.py."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from pipeline import STAGES, git_changed_files, plan  # noqa: E402
+
+FILES = [
+    'data/campsites/index.json',
+    'data/campsites/CA.geojson',
+    'data/campsites/CA_merged.geojson',
+    'data/campsites/OR.geojson',
+    'data/campsites/OR_merged.geojson',
+    'data/opencampingmap/CA.geojson',
+    'data/opencampingmap/OR.geojson',
+    'data/published/CA_merged.geojson',
+    'data/published/OR_merged.geojson',
+    'data/poi_dump_water_propane.geojson',
+]
+AGGREGATE_STAGES = ['spatial_index', 'tiles', 'clusters', 'columnar']
+
+
+@pytest.fixture
+def data_tree(tmp_path, monkeypatch):
+    for name in FILES:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('{}')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def names(paths):
+    return sorted(str(p) for p in paths)
+
+
+def test_full_run_selects_every_stage(data_tree):
+    work = plan(STAGES, None)
+    assert list(work) == STAGES
+    assert names(work['publish']) == ['data/campsites/CA_merged.geojson', 'data/campsites/OR_merged.geojson']
+
+
+def test_unrelated_change_selects_nothing(data_tree):
+    assert plan(STAGES, ['README.md', 'js/map.js']) == {}
+
+
+def test_pipeline_source_change_selects_every_stage(data_tree):
+    assert list(plan(STAGES, ['scripts/geoio.py'])) == STAGES
+
+
+def test_changed_merged_file_runs_per_file_stages_on_it_only(data_tree):
+    work = plan(STAGES, ['data/campsites/CA_merged.geojson'])
+
+    for stage in ('placeholders', 'low_quality', 'services', 'publish'):
+        assert names(work[stage]) == ['data/campsites/CA_merged.geojson'], stage
+    assert 'water_poi' not in work
+    # Republishing one state still rebuilds everything derived from all the published files
+    for stage in AGGREGATE_STAGES + ['artifacts', 'audit']:
+        assert stage in work, stage
+    assert names(work['tiles']) == ['data/published/CA_merged.geojson', 'data/published/OR_merged.geojson']
+
+
+def test_changed_source_file_is_cleaned_but_not_published(data_tree):
+    work = plan(STAGES, ['data/opencampingmap/OR.geojson'])
+
+    assert names(work['placeholders']) == ['data/opencampingmap/OR.geojson']
+    assert names(work['services']) == ['data/opencampingmap/OR.geojson']
+    assert 'publish' not in work
+    assert not set(AGGREGATE_STAGES) & set(work)
+    assert 'audit' in work and 'artifacts' in work
+
+
+def test_changed_rules_rerun_their_stage_over_every_input(data_tree):
+    work = plan(STAGES, ['scripts/build_tiles.py'])
+    assert list(work) == ['tiles', 'artifacts']
+    assert len(work['tiles']) == 2
+
+
+def test_changed_cleaning_rules_republish_everything(data_tree):
+    work = plan(STAGES, ['scripts/clean_placeholders.py'])
+
+    # Every GeoJSON file except the generated published copies
+    assert len(work['placeholders']) == len([f for f in FILES if f.endswith('.geojson')]) - 2
+    assert 'low_quality' not in work
+    assert len(work['publish']) == 2
+    for stage in AGGREGATE_STAGES:
+        assert stage in work, stage
+
+
+def test_new_pois_rerun_services_for_every_site(data_tree):
+    work = plan(STAGES, ['data/poi_dump_water_propane.geojson'])
+
+    assert len(work['services']) == 6
+    assert 'columnar' in work
+
+
+def test_changed_water_sources_rerun_services_for_every_site(data_tree):
+    work = plan(STAGES, ['data/campsites/OR.geojson'])
+
+    assert names(work['water_poi']) == ['data/campsites/CA.geojson', 'data/campsites/OR.geojson']
+    assert len(work['services']) == 6
+
+
+def test_only_selected_stages_are_planned(data_tree):
+    work = plan(['placeholders', 'audit'], ['data/campsites/CA_merged.geojson'])
+    assert list(work) == ['placeholders', 'audit']
+
+
+def test_since_plans_the_files_changed_after_a_revision(data_tree):
+    def git(*args):
+        subprocess.run(['git', *args], check=True, capture_output=True)
+
+    git('init', '-q')
+    git('add', '.')
+    git('-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', 'data')
+    (data_tree / 'data/campsites/OR_merged.geojson').write_text('{"type": "FeatureCollection", "features": []}')
+
+    changed = git_changed_files('HEAD')
+    assert changed == ['data/campsites/OR_merged.geojson']
+    assert names(plan(STAGES, changed)['publish']) == ['data/campsites/OR_merged.geojson']